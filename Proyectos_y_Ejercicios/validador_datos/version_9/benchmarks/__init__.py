@@ -0,0 +1,16 @@
+"""
+Benchmarks del validador con datos sintéticos.
+
+Uso (desde version_9):
+    python -m benchmarks --tamanos 1e3 1e4 1e5
+"""
+from benchmarks.generador import escribir_csv, generar_datos
+from benchmarks.suite import comparar_resultados, ejecutar_benchmark, medir_archivo
+
+__all__ = [
+    "comparar_resultados",
+    "ejecutar_benchmark",
+    "escribir_csv",
+    "generar_datos",
+    "medir_archivo",
+]
@@ -0,0 +1,100 @@
+"""
+Ejecuta la suite de benchmarks y guarda los resultados en JSON.
+
+Uso (desde version_9):
+    python -m benchmarks --tamanos 1e3 1e4 1e5 --salida resultados.json
+    python -m benchmarks --comparar resultados_anteriores.json
+"""
+import argparse
+import json
+import logging
+import sys
+
+from benchmarks.suite import comparar_resultados, ejecutar_benchmark
+
+TAMANOS_PREDETERMINADOS = [10 ** exponente for exponente in range(3, 8)]
+
+
+def _entero(texto: str) -> int:
+    """Convierte "1000" o "1e3" a entero."""
+    return int(float(texto))
+
+
+def parsear_argumentos(argv=None) -> argparse.Namespace:
+    """
+    Lee las opciones de línea de comandos.
+
+    Args:
+        argv: Argumentos a interpretar (por defecto, los de sys.argv)
+
+    Returns:
+        argparse.Namespace: Opciones interpretadas
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.strip().splitlines()[0]
+    )
+    parser.add_argument(
+        "--tamanos", type=_entero, nargs="+", default=TAMANOS_PREDETERMINADOS,
+        help="Filas por medición (por defecto, de 1e3 a 1e7)",
+    )
+    parser.add_argument("--proporcion-invalidos", type=float, default=0.3)
+    parser.add_argument(
+        "--cardinalidad", type=_entero, default=None,
+        help="Valores distintos por columna (por defecto, uno por fila)",
+    )
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument(
+        "--modo", choices=("vectorizado", "fila"), default="vectorizado"
+    )
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--salida", default="resultados_benchmark.json")
+    parser.add_argument(
+        "--comparar", default=None,
+        help="Resultados anteriores; termina con código 1 si hay regresiones",
+    )
+    parser.add_argument(
+        "--tolerancia", type=float, default=0.2,
+        help="Aumento relativo de tiempo aceptado al comparar (0.2 = 20 %%)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parsear_argumentos(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("procesador").setLevel(logging.WARNING)
+
+    resultados = ejecutar_benchmark(
+        args.tamanos,
+        args.proporcion_invalidos,
+        args.cardinalidad,
+        args.semilla,
+        args.modo,
+        args.config,
+    )
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en '{args.salida}'")
+
+    for resultado in resultados["resultados"]:
+        print(f"\n{resultado['filas']} filas (pico {resultado['rss_pico_mb']} MB)")
+        for nombre, etapa in resultado["etapas"].items():
+            print(
+                f"  {nombre:<20} {etapa['segundos']:10.3f} s "
+                f"{etapa['filas_por_segundo'] or 0:14,.0f} filas/s"
+            )
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            anterior = json.load(archivo)
+        regresiones = comparar_resultados(anterior, resultados, args.tolerancia)
+        if regresiones:
+            print("\nRegresiones:")
+            for regresion in regresiones:
+                print(f"  {regresion}")
+            sys.exit(1)
+        print("\nSin regresiones")
+
+
+if __name__ == "__main__":
+    main()
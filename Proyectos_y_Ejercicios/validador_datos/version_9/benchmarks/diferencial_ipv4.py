@@ -0,0 +1,148 @@
+"""
+Compara `ipv4_a_entero` e `ipv4_a_uint32` con `ipaddress.IPv4Address`.
+
+Genera un corpus aleatorio de direcciones válidas, mutaciones de ellas
+(ceros a la izquierda, dígitos no ASCII, separadores, espacios, prefijos
+CIDR...) y valores de otros tipos, y comprueba que la validación rápida
+acepte exactamente lo mismo que la biblioteca estándar. También mide
+ambas.
+
+Uso (desde version_9):
+    python -m benchmarks.diferencial_ipv4 --muestras 1000000
+"""
+import argparse
+import ipaddress
+import random
+import sys
+import time
+from typing import Any, List, Optional
+
+import pandas as pd
+
+from validadores import ipv4_a_entero, ipv4_a_uint32
+
+CARACTERES_RUIDO = "0123456789.  /:-+xabcf\t\n٣० "
+FRAGMENTOS = ["0", "00", "01", "255", "256", "999", "1000", "", "-1", "0x1", "1e2", "٣"]
+
+
+def referencia(valor: Any) -> Optional[int]:
+    """Resultado de la biblioteca estándar (entero o None)."""
+    if isinstance(valor, bool):
+        # IPv4Address(True) funciona, pero int() avisa de que devuelve un bool
+        valor = int(valor)
+    try:
+        return int(ipaddress.IPv4Address(valor))
+    except (ipaddress.AddressValueError, ValueError, TypeError):
+        return None
+
+
+def _direccion(rng: random.Random) -> str:
+    return ".".join(str(rng.randrange(256)) for _ in range(4))
+
+
+def _mutar(rng: random.Random, texto: str) -> str:
+    opcion = rng.randrange(8)
+    if opcion == 0:
+        partes = texto.split(".")
+        partes[rng.randrange(len(partes))] = rng.choice(FRAGMENTOS)
+        return ".".join(partes)
+    if opcion == 1:
+        posicion = rng.randrange(len(texto) + 1)
+        return texto[:posicion] + rng.choice(CARACTERES_RUIDO) + texto[posicion:]
+    if opcion == 2 and texto:
+        posicion = rng.randrange(len(texto))
+        return texto[:posicion] + texto[posicion + 1:]
+    if opcion == 3:
+        return texto + rng.choice(["/24", "/32", ".", "..1", " ", "\n", "%eth0"])
+    if opcion == 4:
+        return rng.choice(["", " ", "."]) + texto
+    if opcion == 5:
+        partes = texto.split(".")
+        return ".".join(partes[: rng.randrange(1, 6)] + partes[:1])
+    if opcion == 6:
+        return "".join(rng.choice(CARACTERES_RUIDO) for _ in range(rng.randrange(16)))
+    return texto
+
+
+def generar_corpus(muestras: int, semilla: int = 0) -> List[Any]:
+    """
+    Genera valores válidos, mutados y de otros tipos.
+
+    Args:
+        muestras: Número de valores
+        semilla: Semilla del generador
+
+    Returns:
+        List[Any]: Corpus (en su mayoría cadenas)
+    """
+    rng = random.Random(semilla)
+    corpus: List[Any] = [
+        "0.0.0.0", "255.255.255.255", "256.0.0.0", "1.2.3", "1.2.3.4.5",
+        "01.2.3.4", "1.2.3.04", "1.2.3.4 ", " 1.2.3.4", "1.2.3.٤", "",
+        0, -1, 2 ** 32 - 1, 2 ** 32, True, False, 3.0, float("nan"), None,
+        b"\x01\x02\x03\x04", b"\x01\x02\x03", ipaddress.IPv4Address("10.0.0.1"),
+    ]
+    while len(corpus) < muestras:
+        texto = _direccion(rng)
+        for _ in range(rng.randrange(4)):
+            texto = _mutar(rng, texto)
+        corpus.append(texto)
+    return corpus[:muestras]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--muestras", type=lambda x: int(float(x)), default=200_000)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = generar_corpus(args.muestras, args.semilla)
+    validos = sum(referencia(valor) is not None for valor in corpus)
+    print(f"Corpus: {len(corpus)} valores ({validos} válidos)")
+
+    inicio = time.perf_counter()
+    esperados = [referencia(valor) for valor in corpus]
+    tiempo_stdlib = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtenidos = [ipv4_a_entero(valor) for valor in corpus]
+    tiempo_rapido = time.perf_counter() - inicio
+
+    diferencias = [
+        (valor, esperado, obtenido)
+        for valor, esperado, obtenido in zip(corpus, esperados, obtenidos)
+        if esperado != obtenido
+    ]
+
+    # Versión vectorizada: solo las cadenas, como columna de texto (la que
+    # produce pd.read_csv) y como columna object
+    textos = [(valor, esperado) for valor, esperado in zip(corpus, esperados)
+              if isinstance(valor, str)]
+    tiempos_vectorizados = {}
+    for tipo in ("str", "object"):
+        serie = pd.Series([valor for valor, _ in textos], dtype=tipo)
+        inicio = time.perf_counter()
+        direcciones, mascara = ipv4_a_uint32(serie)
+        tiempos_vectorizados[tipo] = time.perf_counter() - inicio
+        for (valor, esperado), direccion, valida in zip(textos, direcciones, mascara):
+            obtenido = int(direccion) if valida else None
+            if esperado != obtenido:
+                diferencias.append((valor, esperado, f"vectorizado ({tipo}): {obtenido}"))
+
+    print(f"ipaddress.IPv4Address: {tiempo_stdlib:8.3f} s")
+    print(f"ipv4_a_entero:         {tiempo_rapido:8.3f} s "
+          f"({tiempo_stdlib / tiempo_rapido:.1f}x)")
+    for tipo, segundos in tiempos_vectorizados.items():
+        print(f"{f'ipv4_a_uint32 ({tipo}):':<22}{segundos:9.3f} s "
+              f"({len(textos)} cadenas)")
+
+    if diferencias:
+        print(f"\n{len(diferencias)} diferencias; primeras:")
+        for valor, esperado, obtenido in diferencias[:20]:
+            print(f"  {valor!r}: ipaddress={esperado} rápido={obtenido}")
+        sys.exit(1)
+    print("Sin diferencias")
+
+
+if __name__ == "__main__":
+    main()
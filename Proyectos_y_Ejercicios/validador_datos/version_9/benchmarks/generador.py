@@ -0,0 +1,206 @@
+"""
+Generador de datos sintéticos con el esquema de `datos_simulados.csv`.
+
+Cada fila se deriva de un identificador entero (también si es inválida y
+cómo), así que la cardinalidad (número de valores distintos por columna) se
+controla eligiendo los identificadores en `[0, cardinalidad)`, y no hace
+falta guardar en memoria un catálogo de valores aunque se generen millones
+de filas. Sin cardinalidad, cada fila tiene su propio identificador.
+
+Uso:
+    python -m benchmarks.generador --filas 1000000 --salida datos.csv
+"""
+import argparse
+import os
+import string
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS = ("subdominio", "ip", "ruta_script")
+DOMINIO = ".curso.pythoncdmx.org"
+PREFIJOS = (
+    "quesadilla", "tamalito", "pambazo", "chido", "guajolocombo",
+    "bug", "chambitas", "tlayuda", "nopalito",
+)
+DIRECTORIOS = (
+    "/root/", "/usr/local/bin/", "/tmp/scripts/", "/opt/", "/home/user/",
+)
+NOMBRES_SCRIPT = (
+    "script", "monitorea", "verifica", "inicia", "deploy", "run123",
+    "explota_gatito",
+)
+OCTETOS_INVALIDOS = ("999", "300", "-5", "abc", "1a2", "5000", "")
+TERMINACIONES_INVALIDAS = (".sh.org.mx", " sh", "@sh", ".scrpt", ".sh#", ".sh/inicio")
+TAMANO_BLOQUE_GENERACION = 1_000_000
+
+_LETRAS = np.array(list(string.ascii_lowercase), dtype=object)
+_MULTIPLICADOR = np.uint64(2_654_435_761)
+_MULTIPLICADOR_ESTADO = np.uint64(2_246_822_519)
+_MASCARA_32 = np.uint64(0xFFFFFFFF)
+
+
+def _dispersar(ids: np.ndarray, multiplicador: np.uint64 = _MULTIPLICADOR) -> np.ndarray:
+    """Mezcla los identificadores en 32 bits (biyección en [0, 2**32))."""
+    return (ids.astype(np.uint64) * multiplicador) & _MASCARA_32
+
+
+def _tomar(opciones: tuple, indices: np.ndarray) -> pd.Series:
+    return pd.Series(np.array(opciones, dtype=object)[indices % len(opciones)])
+
+
+def _letras(huellas: np.ndarray, cantidad: int) -> pd.Series:
+    texto = pd.Series("", index=range(len(huellas)), dtype=object)
+    restante = huellas.copy()
+    for _ in range(cantidad):
+        texto = texto + _LETRAS[(restante % np.uint64(26)).astype(np.int64)]
+        restante //= np.uint64(26)
+    return texto
+
+
+def _generar_bloque(
+    rng: np.random.Generator,
+    filas: int,
+    proporcion_invalidos: float,
+    cardinalidad: Optional[int],
+    inicio: int = 0,
+) -> pd.DataFrame:
+    if cardinalidad is None:
+        ids = np.arange(inicio, inicio + filas, dtype=np.int64)
+    else:
+        ids = rng.integers(0, cardinalidad, size=filas)
+    huellas = _dispersar(ids)
+    indices = huellas.astype(np.int64)
+    sufijo = _letras(huellas, 7)
+
+    subdominio = _tomar(PREFIJOS, indices) + "-" + sufijo + DOMINIO
+
+    octetos = [
+        pd.Series(((huellas >> np.uint64(desplazamiento)) & np.uint64(0xFF)).astype(str))
+        for desplazamiento in (24, 16, 8, 0)
+    ]
+
+    ruta = _tomar(DIRECTORIOS, indices) + _tomar(NOMBRES_SCRIPT, indices // 5)
+    ruta = ruta + "_" + sufijo
+
+    # Filas inválidas: IP mala, ruta mala o ambas, decidido por el mismo id
+    # para que la cardinalidad se mantenga
+    estado = _dispersar(ids, _MULTIPLICADOR_ESTADO)
+    invalida = estado < np.uint64(round(proporcion_invalidos * 2**32))
+    tipo = (estado % np.uint64(3)).astype(np.int64)
+    ip_mala = invalida & (tipo != 1)
+    ruta_mala = invalida & (tipo != 0)
+
+    posicion = indices % 4
+    malo = _tomar(OCTETOS_INVALIDOS, indices // 4)
+    for i, octeto in enumerate(octetos):
+        cambiar = ip_mala & (posicion == i)
+        octetos[i] = octeto.where(~cambiar, malo)
+    ip = octetos[0] + "." + octetos[1] + "." + octetos[2] + "." + octetos[3]
+
+    terminacion = _tomar(TERMINACIONES_INVALIDAS, indices // 7).where(ruta_mala, ".sh")
+    ruta = ruta + terminacion
+
+    return pd.DataFrame(
+        {"subdominio": subdominio, "ip": ip, "ruta_script": ruta},
+        columns=list(COLUMNAS),
+    )
+
+
+def generar_datos(
+    filas: int,
+    proporcion_invalidos: float = 0.3,
+    cardinalidad: Optional[int] = None,
+    semilla: int = 0,
+) -> pd.DataFrame:
+    """
+    Genera un DataFrame sintético con columnas subdominio, ip y ruta_script.
+
+    Args:
+        filas: Número de filas
+        proporcion_invalidos: Fracción aproximada de filas inválidas (0 a 1)
+        cardinalidad: Valores distintos por columna (por defecto, uno por fila)
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        pd.DataFrame: Datos generados
+
+    Raises:
+        ValueError: Si algún parámetro está fuera de rango
+    """
+    _verificar_parametros(filas, proporcion_invalidos, cardinalidad)
+    rng = np.random.default_rng(semilla)
+    return _generar_bloque(rng, filas, proporcion_invalidos, cardinalidad)
+
+
+def escribir_csv(
+    archivo_salida: str,
+    filas: int,
+    proporcion_invalidos: float = 0.3,
+    cardinalidad: Optional[int] = None,
+    semilla: int = 0,
+) -> None:
+    """
+    Escribe un CSV sintético por bloques, sin tener todas las filas en memoria.
+
+    Args:
+        archivo_salida: Ruta del archivo CSV
+        filas: Número de filas
+        proporcion_invalidos: Fracción aproximada de filas inválidas (0 a 1)
+        cardinalidad: Valores distintos por columna (por defecto, uno por fila)
+        semilla: Semilla del generador aleatorio
+
+    Raises:
+        ValueError: Si algún parámetro está fuera de rango
+    """
+    _verificar_parametros(filas, proporcion_invalidos, cardinalidad)
+    rng = np.random.default_rng(semilla)
+    with open(archivo_salida, "w", newline="", encoding="utf-8") as archivo:
+        archivo.write(",".join(COLUMNAS) + "\n")
+        for inicio in range(0, filas, TAMANO_BLOQUE_GENERACION):
+            bloque = _generar_bloque(
+                rng,
+                min(TAMANO_BLOQUE_GENERACION, filas - inicio),
+                proporcion_invalidos,
+                cardinalidad,
+                inicio,
+            )
+            bloque.to_csv(archivo, header=False, index=False)
+
+
+def _verificar_parametros(
+    filas: int, proporcion_invalidos: float, cardinalidad: Optional[int]
+) -> None:
+    if filas < 0:
+        raise ValueError(f"El número de filas no puede ser negativo: {filas}")
+    if not 0 <= proporcion_invalidos <= 1:
+        raise ValueError(
+            f"La proporción de inválidos debe estar entre 0 y 1: "
+            f"{proporcion_invalidos}"
+        )
+    if cardinalidad is not None and cardinalidad < 1:
+        raise ValueError(f"La cardinalidad debe ser positiva: {cardinalidad}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=lambda x: int(float(x)), required=True)
+    parser.add_argument("--salida", required=True, help="Archivo CSV de salida")
+    parser.add_argument("--proporcion-invalidos", type=float, default=0.3)
+    parser.add_argument(
+        "--cardinalidad", type=lambda x: int(float(x)), default=None,
+        help="Valores distintos por columna (por defecto, uno por fila)",
+    )
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    escribir_csv(
+        args.salida, args.filas, args.proporcion_invalidos,
+        args.cardinalidad, args.semilla,
+    )
+    print(f"{args.filas} filas escritas en {os.path.abspath(args.salida)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compara el rendimiento de los motores JSON de `exportador_json`.
+
+Escala `datos_simulados.csv` repitiendo sus filas y mide cuánto tarda cada
+motor instalado en exportarlas con `exportar_a_json`.
+
+Uso (desde version_9):
+    python -m benchmarks.motores_json --factor 200 --repeticiones 3
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from exportador_json import MOTORES_JSON, exportar_a_json
+
+
+def medir_motor(
+    df: pd.DataFrame, motor: str, formato: str, repeticiones: int
+) -> float:
+    """
+    Mide el mejor tiempo de exportación de un motor.
+
+    Args:
+        df: Datos a exportar
+        motor: Nombre del motor JSON
+        formato: "json" o "ndjson"
+        repeticiones: Número de mediciones
+
+    Returns:
+        float: Mejor tiempo en segundos
+    """
+    config = {"motor": motor, "formato": formato, "indentacion": 2}
+    tiempos = []
+    with tempfile.TemporaryDirectory() as directorio:
+        archivo = os.path.join(directorio, f"salida.{formato}")
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            exportar_a_json(df, archivo, config)
+            tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--entrada", default="../datos_simulados.csv")
+    parser.add_argument(
+        "--factor", type=int, default=100, help="Veces que se repiten las filas"
+    )
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    df = pd.read_csv(args.entrada)
+    df = pd.concat([df] * args.factor, ignore_index=True)
+    print(f"Filas: {len(df)}")
+
+    for nombre, (_, modulo) in MOTORES_JSON.items():
+        if modulo is None:
+            print(f"{nombre:>8}: no instalado")
+            continue
+        for formato in ("json", "ndjson"):
+            segundos = medir_motor(df, nombre, formato, args.repeticiones)
+            print(
+                f"{nombre:>8} {formato:>6}: {segundos:8.3f} s "
+                f"({len(df) / segundos:12,.0f} filas/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
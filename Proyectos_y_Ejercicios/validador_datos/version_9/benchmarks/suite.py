@@ -0,0 +1,243 @@
+"""
+Mide cada etapa del validador con datos sintéticos de varios tamaños.
+
+Para cada tamaño se genera un CSV con `generador.escribir_csv` y se mide, en
+un proceso nuevo (para que el pico de memoria sea el de ese tamaño):
+
+- lectura: `leer_csv` con el motor de `procesamiento.lectura`, igual que
+  `procesar_archivo`
+- validación: `validar_dataframe` con las validaciones de config.yaml
+- exportación: cada formato (CSV, XML, JSON y, con pyarrow, Parquet y
+  Feather), sumando el archivo de válidos y el de inválidos
+- rss_pico_mb: memoria residente máxima del proceso
+"""
+import dataclasses
+import importlib.util
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from benchmarks.generador import escribir_csv
+from compresion import ruta_sin_compresion
+from config import Configuracion, cargar_configuracion
+from lectura import leer_csv
+from procesador import exportar_resultados, validar_dataframe
+
+VERSION_FORMATO = 1
+FORMATOS_EXPORTACION = ("csv", "xml", "json", "parquet", "feather")
+
+
+def _rss_pico_mb() -> Optional[float]:
+    """Memoria residente máxima del proceso actual, en MB."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    divisor = 1024 ** 2 if sys.platform == "darwin" else 1024
+    return round(pico / divisor, 1)
+
+
+def _etapa(segundos: float, filas: int) -> Dict[str, float]:
+    return {
+        "segundos": round(segundos, 6),
+        "filas_por_segundo": round(filas / segundos, 1) if segundos > 0 else None,
+    }
+
+
+def _config_benchmark(
+    config: Configuracion, directorio: str, modo: str
+) -> Configuracion:
+    """
+    Copia la configuración escribiendo todas las salidas en `directorio` y
+    habilitando todos los formatos disponibles, uno tras otro.
+    """
+    archivos = {
+        f"archivo_{formato}_{tipo}": os.path.join(directorio, f"{tipo}.{formato}")
+        for formato in ("xml", "json", "parquet", "feather")
+        for tipo in ("validos", "invalidos")
+    }
+    exportacion = dict(config.exportacion)
+    exportacion["workers"] = 1
+    exportacion["xml"] = {**exportacion.get("xml", {}), "habilitada": True}
+    exportacion["json"] = {**exportacion.get("json", {}), "habilitada": True}
+    exportacion["parquet"] = {
+        **exportacion.get("parquet", {}),
+        "habilitada": importlib.util.find_spec("pyarrow") is not None,
+        "feather": True,
+    }
+    return dataclasses.replace(
+        config,
+        archivo_validos=os.path.join(directorio, "validos.csv"),
+        archivo_invalidos=os.path.join(directorio, "invalidos.csv"),
+        exportacion=exportacion,
+        procesamiento={**config.procesamiento, "modo_validacion": modo},
+        **archivos,
+    )
+
+
+def medir_archivo(
+    archivo_entrada: str, config: Configuracion, modo: str = "vectorizado"
+) -> Dict[str, Any]:
+    """
+    Mide lectura, validación y exportación de un archivo CSV.
+
+    Args:
+        archivo_entrada: CSV a procesar
+        config: Configuración de la aplicación (validaciones y exportación)
+        modo: Modo de validación ("vectorizado" o "fila")
+
+    Returns:
+        Dict[str, Any]: Filas, tiempos por etapa y pico de memoria
+    """
+    logging.basicConfig(level=logging.WARNING)
+
+    inicio = time.perf_counter()
+    df = leer_csv(archivo_entrada, config.procesamiento.get("lectura"))
+    lectura = time.perf_counter() - inicio
+    filas = len(df)
+
+    inicio = time.perf_counter()
+    df_validos, df_invalidos, errores = validar_dataframe(
+        df, config.validaciones, modo
+    )
+    validacion = time.perf_counter() - inicio
+
+    etapas = {
+        "lectura": _etapa(lectura, filas),
+        "validacion": _etapa(validacion, filas),
+    }
+    with tempfile.TemporaryDirectory() as directorio:
+        config_salidas = _config_benchmark(config, directorio, modo)
+        tiempos = exportar_resultados(df_validos, df_invalidos, config_salidas)
+        for formato in FORMATOS_EXPORTACION:
+            segundos = [
+                tiempo for archivo, tiempo in tiempos.items()
+                if ruta_sin_compresion(archivo).endswith(f".{formato}")
+            ]
+            if segundos:
+                etapas[f"exportacion_{formato}"] = _etapa(sum(segundos), filas)
+
+    return {
+        "filas": filas,
+        "filas_validas": len(df_validos),
+        "filas_invalidas": len(df_invalidos),
+        "errores": len(errores),
+        "etapas": etapas,
+        "total_segundos": round(
+            sum(etapa["segundos"] for etapa in etapas.values()), 6
+        ),
+        "rss_pico_mb": _rss_pico_mb(),
+    }
+
+
+def ejecutar_benchmark(
+    tamanos: Iterable[int],
+    proporcion_invalidos: float = 0.3,
+    cardinalidad: Optional[int] = None,
+    semilla: int = 0,
+    modo: str = "vectorizado",
+    archivo_config: str = "config.yaml",
+) -> Dict[str, Any]:
+    """
+    Genera datos de cada tamaño y mide todas las etapas.
+
+    Cada tamaño se mide en un proceso nuevo para que `rss_pico_mb` no
+    arrastre el pico de los tamaños anteriores.
+
+    Args:
+        tamanos: Números de filas a medir
+        proporcion_invalidos: Fracción aproximada de filas inválidas
+        cardinalidad: Valores distintos por columna (por defecto, uno por fila)
+        semilla: Semilla del generador
+        modo: Modo de validación ("vectorizado" o "fila")
+        archivo_config: Configuración con las validaciones a medir
+
+    Returns:
+        Dict[str, Any]: Entorno, parámetros y resultados por tamaño
+    """
+    logger = logging.getLogger(__name__)
+    config = cargar_configuracion(archivo_config)
+    contexto = multiprocessing.get_context("spawn")
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as directorio:
+        for filas in tamanos:
+            archivo = os.path.join(directorio, f"datos_{filas}.csv")
+            logger.info(f"Generando {filas} filas")
+            escribir_csv(archivo, filas, proporcion_invalidos, cardinalidad, semilla)
+
+            logger.info(f"Midiendo {filas} filas")
+            with contexto.Pool(1) as pool:
+                resultado = pool.apply(medir_archivo, (archivo, config, modo))
+            os.remove(archivo)
+
+            resultados.append(resultado)
+            logger.info(
+                f"{filas} filas: {resultado['total_segundos']:.3f} s, "
+                f"pico {resultado['rss_pico_mb']} MB"
+            )
+
+    return {
+        "version_formato": VERSION_FORMATO,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {
+            "proporcion_invalidos": proporcion_invalidos,
+            "cardinalidad": cardinalidad,
+            "semilla": semilla,
+            "modo_validacion": modo,
+        },
+        "resultados": resultados,
+    }
+
+
+def comparar_resultados(
+    anterior: Dict[str, Any], actual: Dict[str, Any], tolerancia: float = 0.2
+) -> List[str]:
+    """
+    Busca etapas que se volvieron más lentas entre dos ejecuciones.
+
+    Args:
+        anterior: Resultados de referencia
+        actual: Resultados nuevos
+        tolerancia: Aumento relativo de tiempo que se acepta (0.2 = 20 %)
+
+    Returns:
+        List[str]: Una descripción por regresión encontrada
+    """
+    referencia = {r["filas"]: r for r in anterior.get("resultados", [])}
+    regresiones = []
+    for resultado in actual.get("resultados", []):
+        previo = referencia.get(resultado["filas"])
+        if previo is None:
+            continue
+        for nombre, etapa in resultado["etapas"].items():
+            etapa_previa = previo["etapas"].get(nombre)
+            if not etapa_previa or etapa_previa["segundos"] <= 0:
+                continue
+            cambio = etapa["segundos"] / etapa_previa["segundos"] - 1
+            if cambio > tolerancia:
+                regresiones.append(
+                    f"{resultado['filas']} filas, {nombre}: "
+                    f"{etapa_previa['segundos']:.3f} s -> "
+                    f"{etapa['segundos']:.3f} s (+{cambio:.0%})"
+                )
+    return regresiones
@@ -0,0 +1,295 @@
+"""
+Lectura y escritura de archivos comprimidos por extensión.
+
+Formatos: gzip (.gz), bz2 (.bz2), xz (.xz) y zstd (.zst). La entrada se
+descomprime al leerla y las salidas de texto (CSV, XML, JSON y el reporte
+de errores) se comprimen mientras se escriben, sin archivos intermedios.
+
+`exportacion.compresion` configura las salidas:
+
+- formato: agrega la extensión del formato a las rutas de salida de
+  texto que no la tengan (ver `ruta_comprimida`). Una ruta que ya
+  termina en .gz, .bz2, .xz o .zst se comprime siempre, sin importar el
+  formato configurado.
+- nivel: nivel de compresión del formato (por omisión, el de
+  `NIVELES_PREDETERMINADOS`).
+- hilos: hilos que comprimen a la vez.
+
+gzip, bz2 y xz se comprimen en bloques independientes de
+`TAMANO_BLOQUE_COMPRESION` bytes, uno tras otro en el archivo. Cada
+bloque es un miembro o flujo completo del formato. gzip, bzip2, xz y los
+módulos de Python leen el archivo como uno solo. Como zlib, bz2 y lzma
+liberan el GIL, los bloques se comprimen en paralelo en un
+`ThreadPoolExecutor`. zstd usa los hilos propios de `zstandard` si está
+instalado; si no, se comprime por bloques con el códec de pyarrow.
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import IO, Any, Callable, Deque, Dict, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+EXTENSIONES_COMPRESION = {
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+
+NIVELES_PREDETERMINADOS = {"gzip": 6, "bz2": 9, "xz": 6, "zstd": 3}
+
+TAMANO_BLOQUE_COMPRESION = 4 * 1024 * 1024
+
+
+def formato_de_ruta(ruta: str) -> Optional[str]:
+    """
+    Formato de compresión según la extensión de la ruta.
+
+    Args:
+        ruta: Ruta del archivo
+
+    Returns:
+        Optional[str]: "gzip", "bz2", "xz", "zstd" o None si no está comprimido
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    for formato, extension_formato in EXTENSIONES_COMPRESION.items():
+        if extension == extension_formato:
+            return formato
+    return None
+
+
+def ruta_sin_compresion(ruta: str) -> str:
+    """Quita la extensión de compresión ("datos.csv.gz" -> "datos.csv")."""
+    return os.path.splitext(ruta)[0] if formato_de_ruta(ruta) else ruta
+
+
+def _formato_configurado(config_compresion: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Formato de `exportacion.compresion`, comprobado.
+
+    Raises:
+        ValueError: Si el formato no existe
+    """
+    formato = (config_compresion or {}).get("formato")
+    if formato and formato not in EXTENSIONES_COMPRESION:
+        raise ValueError(
+            f"Formato de compresión desconocido: {formato!r} "
+            f"(opciones: {', '.join(EXTENSIONES_COMPRESION)})"
+        )
+    return formato or None
+
+
+def ruta_comprimida(ruta: str, config_compresion: Optional[Dict[str, Any]]) -> str:
+    """
+    Agrega la extensión del formato configurado a una ruta de salida.
+
+    Args:
+        ruta: Ruta configurada
+        config_compresion: Sección `exportacion.compresion`
+
+    Returns:
+        str: La ruta con la extensión, o sin cambios si no hay formato
+            configurado o la ruta ya indica una compresión
+
+    Raises:
+        ValueError: Si el formato no existe
+    """
+    formato = _formato_configurado(config_compresion)
+    if formato is None or formato_de_ruta(ruta) is not None:
+        return ruta
+    return ruta + EXTENSIONES_COMPRESION[formato]
+
+
+def _verificar_zstd() -> None:
+    """
+    Verifica que haya una biblioteca para zstd.
+
+    Raises:
+        ImportError: Si no están ni zstandard ni pyarrow
+    """
+    if zstandard is None and pa is None:
+        raise ImportError(
+            "La compresión zstd requiere zstandard (pip install zstandard) "
+            "o pyarrow"
+        )
+
+
+def abrir_entrada(ruta: str, texto: bool = False) -> IO:
+    """
+    Abre un archivo para lectura, descomprimiéndolo según su extensión.
+
+    Args:
+        ruta: Ruta del archivo
+        texto: Si es True, devuelve texto UTF-8 (con `newline=""`, como
+            espera el módulo csv); si no, bytes
+
+    Returns:
+        IO: Archivo abierto
+
+    Raises:
+        ImportError: Si el archivo es .zst y no hay biblioteca para zstd
+    """
+    formato = formato_de_ruta(ruta)
+    if formato == "gzip":
+        binario = gzip.open(ruta, "rb")
+    elif formato == "bz2":
+        binario = bz2.open(ruta, "rb")
+    elif formato == "xz":
+        binario = lzma.open(ruta, "rb")
+    elif formato == "zstd":
+        _verificar_zstd()
+        if zstandard is not None:
+            binario = zstandard.ZstdDecompressor().stream_reader(
+                open(ruta, "rb"), read_across_frames=True, closefd=True
+            )
+        else:
+            binario = pa.input_stream(ruta, compression="zstd")
+    else:
+        binario = open(ruta, "rb")
+
+    if texto:
+        return io.TextIOWrapper(binario, encoding="utf-8", newline="")
+    return binario
+
+
+class EscrituraPorBloques(io.BufferedIOBase):
+    """
+    Archivo binario que comprime lo escrito en bloques independientes.
+
+    Los bloques se escriben en orden. Con `hilos` mayor que 1 se comprimen
+    en paralelo, con a lo sumo `2 * hilos` bloques en vuelo para que la
+    memoria no dependa del tamaño del archivo.
+    """
+
+    def __init__(
+        self,
+        ruta: str,
+        comprimir: Callable[[bytes], bytes],
+        hilos: int = 1,
+        tamano_bloque: int = TAMANO_BLOQUE_COMPRESION,
+    ):
+        """
+        Args:
+            ruta: Ruta del archivo de salida
+            comprimir: Función que comprime un bloque completo
+            hilos: Hilos que comprimen a la vez
+            tamano_bloque: Bytes sin comprimir por bloque
+        """
+        super().__init__()
+        self._destino = open(ruta, "wb")
+        self._comprimir = comprimir
+        self._hilos = max(1, hilos)
+        self._tamano_bloque = tamano_bloque
+        self._bufer = bytearray()
+        self._pendientes: Deque[Future] = deque()
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self._hilos) if self._hilos > 1 else None
+        )
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, datos) -> int:
+        self._bufer += datos
+        while len(self._bufer) >= self._tamano_bloque:
+            bloque = bytes(self._bufer[:self._tamano_bloque])
+            del self._bufer[:self._tamano_bloque]
+            self._enviar(bloque)
+        return len(datos)
+
+    def _enviar(self, bloque: bytes) -> None:
+        """Comprime un bloque (o lo encola) y escribe los ya terminados."""
+        if self._executor is None:
+            self._destino.write(self._comprimir(bloque))
+            return
+        self._pendientes.append(self._executor.submit(self._comprimir, bloque))
+        while len(self._pendientes) > 2 * self._hilos:
+            self._destino.write(self._pendientes.popleft().result())
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            if self._bufer:
+                self._enviar(bytes(self._bufer))
+                self._bufer.clear()
+            while self._pendientes:
+                self._destino.write(self._pendientes.popleft().result())
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+            self._destino.close()
+            super().close()
+
+
+def _comprimir_zstd_pyarrow(nivel: int, bloque: bytes) -> bytes:
+    return pa.Codec("zstd", compression_level=nivel).compress(bloque, asbytes=True)
+
+
+def _salida_binaria(ruta: str, formato: str, nivel: int, hilos: int) -> IO:
+    """Abre la salida comprimida de `formato` en modo binario."""
+    if formato == "zstd" and zstandard is not None:
+        compresor = zstandard.ZstdCompressor(
+            level=nivel, threads=hilos if hilos > 1 else 0
+        )
+        return compresor.stream_writer(open(ruta, "wb"), closefd=True)
+
+    if formato == "gzip":
+        comprimir = partial(gzip.compress, compresslevel=nivel, mtime=0)
+    elif formato == "bz2":
+        comprimir = partial(bz2.compress, compresslevel=nivel)
+    elif formato == "xz":
+        comprimir = partial(lzma.compress, preset=nivel)
+    else:
+        comprimir = partial(_comprimir_zstd_pyarrow, nivel)
+    return EscrituraPorBloques(ruta, comprimir, hilos)
+
+
+def abrir_salida(
+    ruta: str,
+    config_compresion: Optional[Dict[str, Any]] = None,
+    **opciones_texto: Any,
+) -> IO:
+    """
+    Abre un archivo de texto para escritura, comprimido según su extensión.
+
+    Args:
+        ruta: Ruta del archivo de salida
+        config_compresion: Sección `exportacion.compresion` (nivel e hilos)
+        **opciones_texto: `encoding`, `errors` y `newline`, como en `open`
+
+    Returns:
+        IO: Archivo de texto abierto
+
+    Raises:
+        ImportError: Si la ruta es .zst y no hay biblioteca para zstd
+    """
+    opciones_texto.setdefault("encoding", "utf-8")
+    formato = formato_de_ruta(ruta)
+    if formato is None:
+        return open(ruta, "w", **opciones_texto)
+
+    if formato == "zstd":
+        _verificar_zstd()
+    config_compresion = config_compresion or {}
+    nivel = config_compresion.get("nivel")
+    nivel = NIVELES_PREDETERMINADOS[formato] if nivel is None else int(nivel)
+    hilos = int(config_compresion.get("hilos") or 1)
+    return io.TextIOWrapper(
+        _salida_binaria(ruta, formato, nivel, hilos), **opciones_texto
+    )
@@ -1,8 +1,10 @@
 import yaml
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Any
 import logging
 
+from compresion import ruta_comprimida
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,6 +21,16 @@ class Configuracion:
     nivel_log: str
     validaciones: Dict[str, Any]
     exportacion: Dict[str, Any]
+    procesamiento: Dict[str, Any] = field(default_factory=dict)
+    archivo_parquet_validos: str = "datos_validos.parquet"
+    archivo_parquet_invalidos: str = "datos_invalidos.parquet"
+    archivo_feather_validos: str = "datos_validos.feather"
+    archivo_feather_invalidos: str = "datos_invalidos.feather"
+    archivo_errores: str = "errores_validacion.csv"
+    config_logging: Dict[str, Any] = field(default_factory=dict)
+    unicidad: Dict[str, Any] = field(default_factory=dict)
+    lote: Dict[str, Any] = field(default_factory=dict)
+    servicio: Dict[str, Any] = field(default_factory=dict)
 
 
 def cargar_configuracion(archivo_config: str = "config.yaml") -> Configuracion:
@@ -39,17 +51,44 @@ def cargar_configuracion(archivo_config: str = "config.yaml") -> Configuracion:
         with open(archivo_config, 'r', encoding='utf-8') as archivo:
             datos = yaml.safe_load(archivo)
 
+        # Las salidas de texto llevan la extensión de la compresión
+        # configurada (p. ej. datos_validos.csv.gz)
+        compresion = datos['exportacion'].get('compresion')
+
+        def salida(ruta: str) -> str:
+            return ruta_comprimida(ruta, compresion)
+
         return Configuracion(
             archivo_entrada=datos['archivos']['entrada'],
-            archivo_validos=datos['archivos']['validos'],
-            archivo_invalidos=datos['archivos']['invalidos'],
-            archivo_xml_validos=datos['archivos']['xml_validos'],
-            archivo_xml_invalidos=datos['archivos']['xml_invalidos'],
-            archivo_json_validos=datos['archivos']['json_validos'],
-            archivo_json_invalidos=datos['archivos']['json_invalidos'],
+            archivo_validos=salida(datos['archivos']['validos']),
+            archivo_invalidos=salida(datos['archivos']['invalidos']),
+            archivo_xml_validos=salida(datos['archivos']['xml_validos']),
+            archivo_xml_invalidos=salida(datos['archivos']['xml_invalidos']),
+            archivo_json_validos=salida(datos['archivos']['json_validos']),
+            archivo_json_invalidos=salida(datos['archivos']['json_invalidos']),
             nivel_log=datos['logging']['nivel'],
             validaciones=datos['validaciones'],
-            exportacion=datos['exportacion']
+            exportacion=datos['exportacion'],
+            procesamiento=datos.get('procesamiento') or {},
+            archivo_parquet_validos=datos['archivos'].get(
+                'parquet_validos', 'datos_validos.parquet'
+            ),
+            archivo_parquet_invalidos=datos['archivos'].get(
+                'parquet_invalidos', 'datos_invalidos.parquet'
+            ),
+            archivo_feather_validos=datos['archivos'].get(
+                'feather_validos', 'datos_validos.feather'
+            ),
+            archivo_feather_invalidos=datos['archivos'].get(
+                'feather_invalidos', 'datos_invalidos.feather'
+            ),
+            archivo_errores=salida(datos['archivos'].get(
+                'errores', 'errores_validacion.csv'
+            )),
+            config_logging=datos['logging'],
+            unicidad=datos.get('unicidad') or {},
+            lote=datos.get('lote') or {},
+            servicio=datos.get('servicio') or {},
         )
     except FileNotFoundError:
         logger.error(
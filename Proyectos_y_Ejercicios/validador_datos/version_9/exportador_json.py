@@ -1,12 +1,156 @@
 import json
+import math
 import pandas as pd
 import logging
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional, TextIO
 from datetime import datetime
 
+from compresion import abrir_salida
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
 
 logger = logging.getLogger(__name__)
 
+FORMATOS_JSON = ("json", "ndjson")
+
+# Filas que se serializan y se escriben de una sola vez
+TAMANO_LOTE_JSON = 10_000
+
+
+def _sin_no_finitos(valor: Any) -> Any:
+    """Copia de `valor` con los flotantes NaN e infinitos cambiados por None."""
+    if isinstance(valor, float):
+        return valor if math.isfinite(valor) else None
+    if isinstance(valor, dict):
+        return {clave: _sin_no_finitos(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_sin_no_finitos(v) for v in valor]
+    return valor
+
+
+def _dumps_stdlib(valor: Any, indentacion: Optional[int]) -> str:
+    """`json.dumps` que escribe NaN e infinitos como `null`, igual que orjson."""
+    try:
+        return json.dumps(
+            valor, indent=indentacion, ensure_ascii=False, allow_nan=False
+        )
+    except ValueError:
+        # Solo los datos con NaN o infinitos pagan la copia
+        return json.dumps(
+            _sin_no_finitos(valor), indent=indentacion, ensure_ascii=False
+        )
+
+
+class MotorJSON:
+    """
+    Motor de serialización JSON basado en la biblioteca estándar.
+
+    Es el motor por defecto y el único que reproduce exactamente el texto de
+    `json.dump`; los demás motores usan otra distribución de espacios. Todos
+    los motores escriben los mismos datos: los flotantes NaN e infinitos se
+    escriben como `null` (`json.dump` escribiría `NaN` e `Infinity`, que no
+    son JSON estándar).
+    """
+
+    nombre = "stdlib"
+
+    def dumps(self, valor: Any, indentacion: Optional[int]) -> str:
+        """
+        Serializa un valor a texto JSON.
+
+        Args:
+            valor: Valor a serializar
+            indentacion: Espacios de indentación o None para texto compacto
+
+        Returns:
+            str: Texto JSON
+        """
+        return _dumps_stdlib(valor, indentacion)
+
+
+class MotorOrjson(MotorJSON):
+    """
+    Motor basado en `orjson` (solo admite indentación de 2 espacios).
+
+    orjson ya escribe `NaN` e infinitos como `null`.
+    """
+
+    nombre = "orjson"
+
+    def dumps(self, valor: Any, indentacion: Optional[int]) -> str:
+        opciones = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indentacion:
+            opciones |= orjson.OPT_INDENT_2
+        return orjson.dumps(valor, option=opciones).decode("utf-8")
+
+
+class MotorUjson(MotorJSON):
+    """Motor basado en `ujson`."""
+
+    nombre = "ujson"
+
+    def dumps(self, valor: Any, indentacion: Optional[int]) -> str:
+        try:
+            return self._dumps(valor, indentacion)
+        except OverflowError:
+            # ujson rechaza NaN e infinitos con allow_nan=False
+            return self._dumps(_sin_no_finitos(valor), indentacion)
+
+    def _dumps(self, valor: Any, indentacion: Optional[int]) -> str:
+        return ujson.dumps(
+            valor,
+            indent=indentacion or 0,
+            ensure_ascii=False,
+            escape_forward_slashes=False,
+            allow_nan=False,
+        )
+
+
+MOTORES_JSON = {
+    "stdlib": (MotorJSON, json),
+    "orjson": (MotorOrjson, orjson),
+    "ujson": (MotorUjson, ujson),
+}
+
+
+def obtener_motor_json(nombre: str = "stdlib") -> MotorJSON:
+    """
+    Devuelve el motor JSON solicitado o el de la biblioteca estándar.
+
+    Args:
+        nombre: "stdlib", "orjson" o "ujson"
+
+    Returns:
+        MotorJSON: El motor pedido, o `MotorJSON` si su biblioteca no está
+            instalada
+
+    Raises:
+        ValueError: Si el motor no existe
+    """
+    if nombre not in MOTORES_JSON:
+        raise ValueError(
+            f"Motor JSON desconocido: {nombre!r} "
+            f"(opciones: {', '.join(MOTORES_JSON)})"
+        )
+
+    clase, modulo = MOTORES_JSON[nombre]
+    if modulo is None:
+        logger.warning(
+            f"El motor JSON '{nombre}' no está instalado; se usa 'stdlib'"
+        )
+        return MotorJSON()
+    return clase()
+
 
 def dataframe_a_json(
     df: pd.DataFrame,
@@ -36,34 +180,56 @@ def dataframe_a_json(
 
     # Agregar metadatos si está habilitado
     if config.get('incluir_metadatos', True):
-        estructura["metadatos"] = {
-            "fecha_exportacion": datetime.now().strftime(
-                config.get('formato_fecha', '%Y-%m-%d %H:%M:%S')
-            ),
-            "columnas": list(df.columns),
-            "configuracion": {
-                "indentacion": config.get('indentacion', 2),
-                "formato_fecha": config.get('formato_fecha', '%Y-%m-%d %H:%M:%S')
-            }
-        }
+        estructura["metadatos"] = crear_metadatos(list(df.columns), config)
 
     return estructura
 
 
+def crear_metadatos(columnas: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Crea la sección de metadatos de la exportación JSON.
+
+    Args:
+        columnas: Nombres de las columnas exportadas
+        config: Configuración de exportación JSON
+
+    Returns:
+        Dict[str, Any]: Metadatos de la exportación
+    """
+    return {
+        "fecha_exportacion": datetime.now().strftime(
+            config.get('formato_fecha', '%Y-%m-%d %H:%M:%S')
+        ),
+        "columnas": columnas,
+        "configuracion": {
+            "indentacion": config.get('indentacion', 2),
+            "formato_fecha": config.get('formato_fecha', '%Y-%m-%d %H:%M:%S')
+        }
+    }
+
+
 def exportar_a_json(
     df: pd.DataFrame,
     archivo_salida: str,
     config: Dict[str, Any],
-    tipo_datos: str = "validos"
+    tipo_datos: str = "validos",
+    compresion: Optional[Dict[str, Any]] = None,
 ) -> None:
     """
     Exporta un DataFrame a archivo JSON.
 
+    El archivo se escribe fila por fila con `EscritorJSON`; con el formato
+    "json" el texto es idéntico al de `json.dump` sobre la estructura de
+    `dataframe_a_json`, sin construirla en memoria (salvo NaN e infinitos,
+    que se escriben como `null`).
+
     Args:
         df: DataFrame a exportar
-        archivo_salida: Ruta del archivo de salida
+        archivo_salida: Ruta del archivo de salida (.gz, .bz2, .xz o .zst
+            para comprimirlo)
         config: Configuración de exportación JSON
         tipo_datos: Tipo de datos ("validos" o "invalidos")
+        compresion: Nivel e hilos de compresión (`exportacion.compresion`)
 
     Raises:
         Exception: Si hay error al escribir el archivo
@@ -73,23 +239,204 @@ def exportar_a_json(
             logger.warning(f"No hay datos para exportar a {archivo_salida}")
             return
 
-        # Crear estructura JSON
-        estructura = dataframe_a_json(df, config, tipo_datos)
+        with EscritorJSON(
+            archivo_salida, config, tipo_datos, compresion
+        ) as escritor:
+            escritor.escribir(df)
+
+    except Exception as e:
+        logger.error(f"Error al exportar a JSON: {e}")
+        raise
+
+
+class EscritorJSON:
+    """
+    Escribe la exportación JSON de forma incremental.
+
+    Con `formato: "json"` abre el arreglo `datos`, agrega cada registro en
+    cuanto llega y, al cerrar, escribe `total_registros`, `tipo` y
+    `metadatos` después del arreglo. Con `formato: "ndjson"` escribe un
+    registro compacto por línea, sin encabezado ni cierre, para lectores
+    línea por línea. Los registros se serializan directamente desde los
+    valores de cada fila, sin crear un diccionario por fila, así que la
+    memoria no depende del número de registros. El archivo se crea con el
+    primer bloque no vacío.
+    """
 
-        # Configurar indentación
-        indentacion = config.get('indentacion', 2)
+    def __init__(
+        self,
+        archivo_salida: str,
+        config: Dict[str, Any],
+        tipo_datos: str = "validos",
+        compresion: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            archivo_salida: Ruta del archivo de salida (.gz, .bz2, .xz o
+                .zst para comprimirlo)
+            config: Configuración de exportación JSON
+            tipo_datos: Tipo de datos ("validos" o "invalidos")
+            compresion: Nivel e hilos de compresión (`exportacion.compresion`)
 
-        # Escribir archivo
-        with open(archivo_salida, 'w', encoding='utf-8') as archivo:
-            json.dump(
-                estructura,
-                archivo,
-                indent=indentacion,
-                ensure_ascii=False
+        Raises:
+            ValueError: Si el formato configurado no existe
+        """
+        self.archivo_salida = archivo_salida
+        self.config = config
+        self.tipo_datos = tipo_datos
+        self.compresion = compresion
+        self.formato = config.get('formato', 'json')
+        if self.formato not in FORMATOS_JSON:
+            raise ValueError(
+                f"Formato JSON desconocido: {self.formato!r} "
+                f"(opciones: {', '.join(FORMATOS_JSON)})"
             )
+        self.motor = obtener_motor_json(config.get('motor', 'stdlib'))
+        self.indentacion = (
+            config.get('indentacion', 2) if self.formato == "json" else None
+        )
+        if isinstance(self.motor, MotorOrjson) and self.indentacion:
+            self.indentacion = 2
+        self.total_registros = 0
+        self._columnas: List[str] = []
+        self._claves: List[str] = []
+        self._archivo: Optional[TextIO] = None
 
-        logger.info(f"Datos exportados a JSON: {archivo_salida}")
+        # Mismos separadores que usa json.dump según la indentación
+        if self.indentacion is None:
+            self._nivel_1 = self._nivel_2 = self._nivel_3 = ""
+            self._separador = ", "
+        else:
+            self._nivel_1 = "\n" + " " * self.indentacion
+            self._nivel_2 = "\n" + " " * (2 * self.indentacion)
+            self._nivel_3 = "\n" + " " * (3 * self.indentacion)
+            self._separador = ","
 
-    except Exception as e:
-        logger.error(f"Error al exportar a JSON: {e}")
-        raise
+    def __enter__(self) -> "EscritorJSON":
+        return self
+
+    def __exit__(self, tipo_excepcion, *exc_info) -> None:
+        if tipo_excepcion is None:
+            self.cerrar()
+        elif self._archivo is not None:
+            # Ante un error solo se libera el archivo, sin completar el documento
+            self._archivo.close()
+            self._archivo = None
+
+    def _serializar(self, valor: Any, nivel: str) -> str:
+        """Serializa un valor anidado en el nivel de indentación indicado."""
+        if isinstance(valor, str):
+            return json.encoder.encode_basestring(valor)
+        texto = _dumps_stdlib(valor, self.indentacion)
+        return texto.replace("\n", nivel) if nivel else texto
+
+    def _registro(self, valores) -> str:
+        """Serializa un registro (una fila) como objeto JSON."""
+        if not self._claves:
+            return "{}"
+        campos = (self._separador + self._nivel_3).join(
+            clave + self._serializar(valor, self._nivel_3)
+            for clave, valor in zip(self._claves, valores)
+        )
+        return "{" + self._nivel_3 + campos + self._nivel_2 + "}"
+
+    def _abrir(self, columnas: List[str]) -> None:
+        """Crea el archivo y escribe el inicio del documento."""
+        self._archivo = abrir_salida(
+            self.archivo_salida, self.compresion, encoding='utf-8'
+        )
+        self._columnas = columnas
+        self._claves = [
+            self._serializar(str(columna), "") + ": " for columna in columnas
+        ]
+        if self.formato == "json":
+            self._archivo.write('{' + self._nivel_1 + '"datos": [')
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        """
+        Agrega los registros de un bloque.
+
+        Args:
+            df: Bloque de filas a escribir
+        """
+        if df.empty:
+            return
+
+        if self._archivo is None:
+            self._abrir(list(df.columns))
+
+        for inicio in range(0, len(df), TAMANO_LOTE_JSON):
+            lote = df.iloc[inicio:inicio + TAMANO_LOTE_JSON]
+            if self.motor.nombre != "stdlib":
+                texto = self._lote_con_motor(lote)
+            elif self.formato == "ndjson":
+                texto = "".join(
+                    self._registro(valores) + "\n"
+                    for valores in lote.itertuples(index=False, name=None)
+                )
+            else:
+                separador = self._separador + self._nivel_2
+                texto = separador.join(
+                    self._registro(valores)
+                    for valores in lote.itertuples(index=False, name=None)
+                )
+                texto = (separador if self.total_registros else self._nivel_2) + texto
+            self._archivo.write(texto)
+            self.total_registros += len(lote)
+
+    def _lote_con_motor(self, lote: pd.DataFrame) -> str:
+        """
+        Serializa un lote completo con un motor externo (orjson, ujson).
+
+        El motor recibe la lista de registros del lote y la serializa en una
+        sola llamada (en ndjson, una llamada por registro); del arreglo
+        resultante se quitan los corchetes y se ajusta la indentación para
+        insertarlo dentro de `datos`.
+        """
+        # Equivale a `lote.to_dict('records')`, pero convierte cada columna de
+        # una sola vez con `tolist`
+        columnas = [lote.iloc[:, i].tolist() for i in range(lote.shape[1])]
+        registros = [
+            dict(zip(self._columnas, valores)) for valores in zip(*columnas)
+        ] if columnas else [{} for _ in range(len(lote))]
+        if self.formato == "ndjson":
+            return "".join(
+                self.motor.dumps(registro, None) + "\n" for registro in registros
+            )
+
+        elementos = self.motor.dumps(registros, self.indentacion).strip()
+        elementos = elementos[1:-1].rstrip()
+        if self.indentacion is not None:
+            elementos = elementos.replace("\n", "\n" + " " * self.indentacion)
+        return ("," if self.total_registros else "") + elementos
+
+    def cerrar(self) -> None:
+        """Escribe el cierre del arreglo, el resumen y los metadatos."""
+        if self._archivo is None:
+            if self.total_registros == 0:
+                logger.warning(
+                    f"No hay datos para exportar a {self.archivo_salida}"
+                )
+            return
+
+        if self.formato == "json":
+            campos = [
+                ("total_registros", self.total_registros),
+                ("tipo", self.tipo_datos),
+            ]
+            if self.config.get('incluir_metadatos', True):
+                campos.append(
+                    ("metadatos", crear_metadatos(self._columnas, self.config))
+                )
+
+            self._archivo.write(self._nivel_1 + "]")
+            for clave, valor in campos:
+                self._archivo.write(
+                    self._separador + self._nivel_1 + json.dumps(clave) + ": "
+                    + self._serializar(valor, self._nivel_1)
+                )
+            self._archivo.write("\n}" if self.indentacion is not None else "}")
+
+        self._archivo.close()
+        self._archivo = None
+        logger.info(f"Datos exportados a JSON: {self.archivo_salida}")
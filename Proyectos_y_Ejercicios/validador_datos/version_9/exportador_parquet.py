@@ -0,0 +1,231 @@
+import logging
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _verificar_pyarrow() -> None:
+    """
+    Verifica que pyarrow esté instalado.
+
+    Raises:
+        ImportError: Si pyarrow no está disponible
+    """
+    if pa is None:
+        raise ImportError(
+            "La exportación a Parquet/Feather requiere pyarrow "
+            "(pip install pyarrow)"
+        )
+
+
+def exportar_a_parquet(
+    df: pd.DataFrame, archivo_salida: str, config: Dict[str, Any]
+) -> None:
+    """
+    Exporta un DataFrame a archivo Parquet.
+
+    Args:
+        df: DataFrame a exportar
+        archivo_salida: Ruta del archivo de salida
+        config: Configuración de exportación Parquet
+
+    Raises:
+        ImportError: Si pyarrow no está instalado
+        Exception: Si hay error al escribir el archivo
+    """
+    try:
+        if df.empty:
+            logger.warning(f"No hay datos para exportar a {archivo_salida}")
+            return
+
+        with EscritorParquet(archivo_salida, config) as escritor:
+            escritor.escribir(df)
+
+    except Exception as e:
+        logger.error(f"Error al exportar a Parquet: {e}")
+        raise
+
+
+def exportar_a_feather(
+    df: pd.DataFrame, archivo_salida: str, config: Dict[str, Any]
+) -> None:
+    """
+    Exporta un DataFrame a archivo Feather (formato de archivo Arrow IPC).
+
+    Args:
+        df: DataFrame a exportar
+        archivo_salida: Ruta del archivo de salida
+        config: Configuración de exportación Parquet/Feather
+
+    Raises:
+        ImportError: Si pyarrow no está instalado
+        Exception: Si hay error al escribir el archivo
+    """
+    try:
+        if df.empty:
+            logger.warning(f"No hay datos para exportar a {archivo_salida}")
+            return
+
+        with EscritorFeather(archivo_salida, config) as escritor:
+            escritor.escribir(df)
+
+    except Exception as e:
+        logger.error(f"Error al exportar a Feather: {e}")
+        raise
+
+
+class EscritorParquet:
+    """
+    Escribe un archivo Parquet por bloques de filas.
+
+    Cada bloque se agrega con `pyarrow.parquet.ParquetWriter` en grupos de
+    `tamano_grupo_filas` filas, así que no hace falta tener todo el resultado
+    en memoria. El esquema lo fija el primer bloque no vacío.
+    """
+
+    def __init__(self, archivo_salida: str, config: Dict[str, Any]):
+        """
+        Args:
+            archivo_salida: Ruta del archivo de salida
+            config: Configuración de exportación Parquet
+
+        Raises:
+            ImportError: Si pyarrow no está instalado
+        """
+        _verificar_pyarrow()
+        self.archivo_salida = archivo_salida
+        self.compresion = config.get("compresion", "snappy")
+        self.tamano_grupo_filas = config.get("tamano_grupo_filas", 100_000)
+        self.total_filas = 0
+        self._esquema: Optional["pa.Schema"] = None
+        self._escritor: Optional["pq.ParquetWriter"] = None
+
+    def __enter__(self) -> "EscritorParquet":
+        return self
+
+    def __exit__(self, tipo_excepcion, *exc_info) -> None:
+        if tipo_excepcion is None:
+            self.cerrar()
+        elif self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        """
+        Agrega las filas de un bloque al archivo.
+
+        Args:
+            df: Bloque de filas a escribir
+        """
+        if df.empty:
+            return
+
+        if self._escritor is None:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            self._esquema = tabla.schema
+            self._escritor = pq.ParquetWriter(
+                self.archivo_salida, tabla.schema, compression=self.compresion
+            )
+        else:
+            tabla = pa.Table.from_pandas(
+                df, schema=self._esquema, preserve_index=False
+            )
+
+        self._escritor.write_table(tabla, row_group_size=self.tamano_grupo_filas)
+        self.total_filas += len(df)
+
+    def cerrar(self) -> None:
+        """Escribe el pie del archivo y lo cierra."""
+        if self._escritor is None:
+            if self.total_filas == 0:
+                logger.warning(
+                    f"No hay datos para exportar a {self.archivo_salida}"
+                )
+            return
+
+        self._escritor.close()
+        self._escritor = None
+        logger.info(f"Datos exportados a Parquet: {self.archivo_salida}")
+
+
+class EscritorFeather:
+    """
+    Escribe un archivo Feather (Arrow IPC) por bloques de filas.
+
+    Cada bloque se agrega como uno o varios lotes de registros de
+    `tamano_grupo_filas` filas. El esquema lo fija el primer bloque no vacío.
+    """
+
+    def __init__(self, archivo_salida: str, config: Dict[str, Any]):
+        """
+        Args:
+            archivo_salida: Ruta del archivo de salida
+            config: Configuración de exportación Parquet/Feather
+
+        Raises:
+            ImportError: Si pyarrow no está instalado
+        """
+        _verificar_pyarrow()
+        self.archivo_salida = archivo_salida
+        self.compresion = config.get("compresion_feather", "lz4")
+        self.tamano_grupo_filas = config.get("tamano_grupo_filas", 100_000)
+        self.total_filas = 0
+        self._esquema: Optional["pa.Schema"] = None
+        self._escritor: Optional["pa.ipc.RecordBatchFileWriter"] = None
+
+    def __enter__(self) -> "EscritorFeather":
+        return self
+
+    def __exit__(self, tipo_excepcion, *exc_info) -> None:
+        if tipo_excepcion is None:
+            self.cerrar()
+        elif self._escritor is not None:
+            self._escritor.close()
+            self._escritor = None
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        """
+        Agrega las filas de un bloque al archivo.
+
+        Args:
+            df: Bloque de filas a escribir
+        """
+        if df.empty:
+            return
+
+        if self._escritor is None:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            self._esquema = tabla.schema
+            opciones = pa.ipc.IpcWriteOptions(compression=self.compresion)
+            self._escritor = pa.ipc.new_file(
+                self.archivo_salida, tabla.schema, options=opciones
+            )
+        else:
+            tabla = pa.Table.from_pandas(
+                df, schema=self._esquema, preserve_index=False
+            )
+
+        self._escritor.write_table(tabla, max_chunksize=self.tamano_grupo_filas)
+        self.total_filas += len(df)
+
+    def cerrar(self) -> None:
+        """Escribe el pie del archivo y lo cierra."""
+        if self._escritor is None:
+            if self.total_filas == 0:
+                logger.warning(
+                    f"No hay datos para exportar a {self.archivo_salida}"
+                )
+            return
+
+        self._escritor.close()
+        self._escritor = None
+        logger.info(f"Datos exportados a Feather: {self.archivo_salida}")
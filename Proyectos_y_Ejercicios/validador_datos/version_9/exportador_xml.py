@@ -1,11 +1,41 @@
 import logging
 import xml.etree.ElementTree as ET
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, TextIO
 
 import pandas as pd
 
+from compresion import abrir_salida
+
 logger = logging.getLogger(__name__)
 
+# Filas que se convierten a texto y se escriben de una sola vez
+TAMANO_LOTE_XML = 10_000
+
+
+def _escapar_texto(texto: str) -> str:
+    """Escapa el contenido de un elemento igual que ElementTree."""
+    if "&" in texto:
+        texto = texto.replace("&", "&amp;")
+    if "<" in texto:
+        texto = texto.replace("<", "&lt;")
+    if ">" in texto:
+        texto = texto.replace(">", "&gt;")
+    return texto
+
+
+def _escapar_atributo(texto: str) -> str:
+    """Escapa el valor de un atributo igual que ElementTree."""
+    texto = _escapar_texto(texto)
+    if "\"" in texto:
+        texto = texto.replace("\"", "&quot;")
+    if "\r" in texto:
+        texto = texto.replace("\r", "&#13;")
+    if "\n" in texto:
+        texto = texto.replace("\n", "&#10;")
+    if "\t" in texto:
+        texto = texto.replace("\t", "&#09;")
+    return texto
+
 
 def dataframe_a_xml(df: pd.DataFrame, config: Dict[str, Any]) -> ET.Element:
     """
@@ -41,15 +71,24 @@ def dataframe_a_xml(df: pd.DataFrame, config: Dict[str, Any]) -> ET.Element:
 
 
 def exportar_a_xml(
-    df: pd.DataFrame, archivo_salida: str, config: Dict[str, Any]
+    df: pd.DataFrame,
+    archivo_salida: str,
+    config: Dict[str, Any],
+    compresion: Optional[Dict[str, Any]] = None,
 ) -> None:
     """
     Exporta un DataFrame a archivo XML.
 
+    El documento se escribe fila por fila con `EscritorXML`, sin construir un
+    árbol de ElementTree en memoria; el resultado es idéntico byte a byte al
+    de `ET.indent` + `ElementTree.write`.
+
     Args:
         df: DataFrame a exportar
-        archivo_salida: Ruta del archivo de salida
+        archivo_salida: Ruta del archivo de salida (.gz, .bz2, .xz o .zst
+            para comprimirlo)
         config: Configuración de exportación XML
+        compresion: Nivel e hilos de compresión (`exportacion.compresion`)
 
     Raises:
         Exception: Si hay error al escribir el archivo
@@ -59,21 +98,130 @@ def exportar_a_xml(
             logger.warning(f"No hay datos para exportar a {archivo_salida}")
             return
 
-        # Crear estructura XML
-        root = dataframe_a_xml(df, config)
+        with EscritorXML(archivo_salida, config, compresion) as escritor:
+            escritor.escribir(df)
 
-        # Crear árbol XML
-        tree = ET.ElementTree(root)
+    except Exception as e:
+        logger.error(f"Error al exportar a XML: {e}")
+        raise
 
-        # Configurar indentación
-        indentacion = config.get("indentacion", 2)
-        ET.indent(tree, space=" " * indentacion)
 
-        # Escribir archivo
-        tree.write(archivo_salida, encoding="utf-8", xml_declaration=True)
+class EscritorXML:
+    """
+    Escribe un documento XML de forma incremental.
+
+    Cada `<fila>` se genera como texto y se escribe directamente en el
+    archivo, en lotes de `TAMANO_LOTE_XML` filas, así que la memoria usada no
+    depende del número de filas. Admite la disposición con atributos y con
+    subelementos, y respeta `indentacion`. El archivo se crea con el primer
+    bloque no vacío; si nunca llega ninguno, no se escribe nada (igual que
+    `exportar_a_xml` con un DataFrame vacío).
+    """
 
-        logger.info(f"Datos exportados a XML: {archivo_salida}")
+    def __init__(
+        self,
+        archivo_salida: str,
+        config: Dict[str, Any],
+        compresion: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            archivo_salida: Ruta del archivo de salida (.gz, .bz2, .xz o
+                .zst para comprimirlo)
+            config: Configuración de exportación XML
+            compresion: Nivel e hilos de compresión (`exportacion.compresion`)
+        """
+        self.archivo_salida = archivo_salida
+        self.compresion = compresion
+        self.elemento_raiz = config.get("elemento_raiz", "datos")
+        self.elemento_fila = config.get("elemento_fila", "fila")
+        self.usar_atributos = config.get("atributos", True)
+        self.espacio = " " * config.get("indentacion", 2)
+        self.total_filas = 0
+        self._archivo: Optional[TextIO] = None
+
+    def __enter__(self) -> "EscritorXML":
+        return self
+
+    def __exit__(self, tipo_excepcion, *exc_info) -> None:
+        if tipo_excepcion is None:
+            self.cerrar()
+        elif self._archivo is not None:
+            # Ante un error solo se libera el archivo, sin completar el documento
+            self._archivo.close()
+            self._archivo = None
+
+    def _fila_con_atributos(self, columnas: List[str], valores) -> str:
+        """Genera `<fila col="valor" ... />`."""
+        atributos = "".join(
+            f' {columna}="{_escapar_atributo(str(valor))}"'
+            for columna, valor in zip(columnas, valores)
+        )
+        return f"\n{self.espacio}<{self.elemento_fila}{atributos} />"
+
+    def _fila_con_subelementos(self, columnas: List[str], valores) -> str:
+        """Genera `<fila><col>valor</col>...</fila>` con indentación."""
+        if not columnas:
+            return f"\n{self.espacio}<{self.elemento_fila} />"
+
+        sangria_campo = "\n" + self.espacio * 2
+        partes = [f"\n{self.espacio}<{self.elemento_fila}>"]
+        for columna, valor in zip(columnas, valores):
+            texto = _escapar_texto(str(valor))
+            if texto:
+                partes.append(f"{sangria_campo}<{columna}>{texto}</{columna}>")
+            else:
+                partes.append(f"{sangria_campo}<{columna} />")
+        partes.append(f"\n{self.espacio}</{self.elemento_fila}>")
+        return "".join(partes)
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        """
+        Agrega las filas de un bloque al documento.
+
+        Args:
+            df: Bloque de filas a escribir
+        """
+        if df.empty:
+            return
 
-    except Exception as e:
-        logger.error(f"Error al exportar a XML: {e}")
-        raise
+        if self._archivo is None:
+            # Mismas opciones que usa ElementTree.write con encoding="utf-8"
+            self._archivo = abrir_salida(
+                self.archivo_salida,
+                self.compresion,
+                encoding="utf-8",
+                errors="xmlcharrefreplace",
+                newline="\n",
+            )
+            self._archivo.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            self._archivo.write(f"<{self.elemento_raiz}>")
+
+        columnas = [str(columna) for columna in df.columns]
+        generar_fila = (
+            self._fila_con_atributos
+            if self.usar_atributos
+            else self._fila_con_subelementos
+        )
+        for inicio in range(0, len(df), TAMANO_LOTE_XML):
+            # `to_numpy` convierte los valores igual que `iterrows` (mismo tipo
+            # común por fila), así el texto coincide con `dataframe_a_xml`.
+            lote = df.iloc[inicio:inicio + TAMANO_LOTE_XML].to_numpy()
+            self._archivo.write(
+                "".join(generar_fila(columnas, valores) for valores in lote)
+            )
+        self.total_filas += len(df)
+
+    def cerrar(self) -> None:
+        """Cierra el elemento raíz y el archivo."""
+        if self._archivo is None:
+            if self.total_filas == 0:
+                logger.warning(
+                    f"No hay datos para exportar a {self.archivo_salida}"
+                )
+            return
+
+        self._archivo.write(f"\n</{self.elemento_raiz}>")
+        self._archivo.close()
+        self._archivo = None
+        logger.info(f"Datos exportados a XML: {self.archivo_salida}")
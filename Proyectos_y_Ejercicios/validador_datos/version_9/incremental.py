@@ -0,0 +1,237 @@
+"""
+Validación incremental con una caché de resultados en disco.
+
+Cada fila se resume en un hash de 64 bits de las columnas que tienen reglas
+y su resultado en un entero con un bit por regla incumplida
+(`ValidadorCompilado.fallos_por_regla`). La caché guarda los pares
+(hash, fallos) bajo una huella de las validaciones, así que un cambio en
+config.yaml, en los archivos que cargan las reglas o en los tipos de las
+columnas invalida los resultados anteriores. En la siguiente ejecución
+solo se validan las filas nuevas o cambiadas; las demás se reconstruyen
+desde la caché con los valores actuales de la fila.
+
+La caché es un directorio con un archivo `<huella>.npy`: un arreglo
+ordenado por hash que se abre con `mmap` (no se lee entero) y se consulta
+con `np.searchsorted`. Al terminar la ejecución se reescribe con las filas
+consultadas y las nuevas, así que las filas que ya no están en el archivo
+desaparecen y la caché no crece con cada ejecución; los archivos de otras
+huellas se borran.
+"""
+import glob
+import hashlib
+import logging
+import os
+import tempfile
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from validadores import TablaErrores, ValidadorCompilado
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_CACHE = ".cache_validacion"
+TIPO_ENTRADA = np.dtype([("hash", "<u8"), ("fallos", "<u8")])
+
+# Súbela si cambia la lógica de alguna regla sin cambiar su configuración,
+# para que no se reutilicen resultados calculados con la lógica anterior
+VERSION_CACHE = 1
+
+
+def huella_incremental(validador: ValidadorCompilado, df: pd.DataFrame) -> str:
+    """
+    Huella de todo lo que determina el resultado de una fila, salvo sus valores.
+
+    Args:
+        validador: Reglas compiladas
+        df: Datos a validar (se usan los tipos de las columnas con reglas)
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    tipos = [str(df[campo].dtype) for campo in validador.campos]
+    resumen = hashlib.blake2b(digest_size=16)
+    resumen.update(repr((VERSION_CACHE, validador.huella(), tipos)).encode())
+    return resumen.hexdigest()
+
+
+def hash_filas(df: pd.DataFrame, campos: Sequence[str]) -> np.ndarray:
+    """
+    Hash de 64 bits de los valores de cada fila en `campos`.
+
+    Args:
+        df: Datos
+        campos: Columnas que intervienen en la validación
+
+    Returns:
+        np.ndarray: Un `uint64` por fila
+    """
+    if not len(campos):
+        return np.zeros(len(df), dtype=np.uint64)
+    # Sin categorize: con valores casi todos distintos, factorizar antes de
+    # calcular el hash cuesta más de lo que ahorra
+    return pd.util.hash_pandas_object(
+        df[list(campos)], index=False, categorize=False
+    ).to_numpy(dtype=np.uint64)
+
+
+class CacheResultados:
+    """
+    Resultados de validación por fila guardados en un arreglo en disco.
+
+    Se usa como gestor de contexto: al salir se reescribe el archivo de la
+    huella en uso con las entradas consultadas y las nuevas (si la
+    ejecución terminó con una excepción, se conservan también las no
+    consultadas).
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_CACHE):
+        """
+        Args:
+            directorio: Directorio de la caché (se crea si no existe)
+        """
+        self.directorio = directorio
+        self.huella: Optional[str] = None
+        self.reutilizadas = 0
+        self.validadas = 0
+        self.eliminadas = 0
+        self._entradas = np.empty(0, dtype=TIPO_ENTRADA)
+        self._usadas = np.empty(0, dtype=bool)
+        self._nuevas: List[np.ndarray] = []
+        os.makedirs(directorio, exist_ok=True)
+
+    def __enter__(self) -> "CacheResultados":
+        return self
+
+    def __exit__(self, tipo, *_) -> None:
+        self.cerrar(podar=tipo is None)
+
+    def _archivo(self, huella: str) -> str:
+        return os.path.join(self.directorio, f"{huella}.npy")
+
+    def _cargar(self, huella: str) -> None:
+        """Abre los resultados de `huella` y borra los de otras huellas."""
+        archivo = self._archivo(huella)
+        obsoletos = [
+            otro for otro in glob.glob(os.path.join(self.directorio, "*.npy"))
+            if os.path.abspath(otro) != os.path.abspath(archivo)
+        ]
+        for otro in obsoletos:
+            os.remove(otro)
+        if obsoletos:
+            logger.info("Caché incremental: configuración nueva, resultados anteriores descartados")
+
+        if os.path.exists(archivo):
+            self._entradas = np.load(archivo, mmap_mode="r")
+        else:
+            self._entradas = np.empty(0, dtype=TIPO_ENTRADA)
+        self._usadas = np.zeros(len(self._entradas), dtype=bool)
+        self._nuevas = []
+        self.huella = huella
+
+    def buscar(self, huella: str, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca los resultados guardados de varias filas.
+
+        Args:
+            huella: Huella de las validaciones (ver `huella_incremental`)
+            hashes: Hashes de las filas (ver `hash_filas`)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (máscara de filas encontradas,
+                fallos de cada fila; 0 en las no encontradas)
+        """
+        if huella != self.huella:
+            self._cargar(huella)
+        fallos = np.zeros(len(hashes), dtype=np.uint64)
+        if not len(self._entradas):
+            return np.zeros(len(hashes), dtype=bool), fallos
+
+        guardados = self._entradas["hash"]
+        posiciones = np.searchsorted(guardados, hashes)
+        posiciones[posiciones == len(guardados)] = 0
+        encontradas = guardados[posiciones] == hashes
+        posiciones = posiciones[encontradas]
+        fallos[encontradas] = self._entradas["fallos"][posiciones]
+        self._usadas[posiciones] = True
+        return encontradas, fallos
+
+    def guardar(self, hashes: np.ndarray, fallos: np.ndarray) -> None:
+        """
+        Agrega los resultados de filas recién validadas.
+
+        Se escriben en disco al cerrar la caché.
+
+        Args:
+            hashes: Hashes de las filas
+            fallos: Fallos de cada fila (ver `fallos_por_regla`)
+        """
+        nuevas = np.empty(len(hashes), dtype=TIPO_ENTRADA)
+        nuevas["hash"] = hashes
+        nuevas["fallos"] = fallos
+        self._nuevas.append(nuevas)
+
+    def cerrar(self, podar: bool = True) -> None:
+        """
+        Escribe la caché actualizada.
+
+        Args:
+            podar: Si es True, descarta los resultados de filas que no se
+                consultaron en esta ejecución (ya no están en el archivo)
+        """
+        if self.huella is None:
+            return
+        conservadas = self._entradas[self._usadas] if podar else self._entradas
+        self.eliminadas = len(self._entradas) - len(conservadas)
+        if self._nuevas or self.eliminadas:
+            entradas = np.concatenate([np.asarray(conservadas), *self._nuevas])
+            # Ordenadas por hash y sin repetidos (filas iguales en el archivo)
+            _, unicas = np.unique(entradas["hash"], return_index=True)
+            entradas = entradas[unicas]
+
+            # Se escribe en un archivo temporal y se reemplaza el anterior,
+            # que puede estar abierto con mmap
+            descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+            with os.fdopen(descriptor, "wb") as archivo:
+                np.save(archivo, entradas)
+            self._entradas = np.empty(0, dtype=TIPO_ENTRADA)
+            os.replace(temporal, self._archivo(self.huella))
+
+        logger.info(
+            f"Caché incremental: {self.reutilizadas} filas reutilizadas, "
+            f"{self.validadas} validadas, {self.eliminadas} eliminadas"
+        )
+        self.huella = None
+
+
+def validar_incremental(
+    df: pd.DataFrame, validador: ValidadorCompilado, cache: CacheResultados
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+    """
+    Valida solo las filas que no están en la caché y reutiliza las demás.
+
+    Las filas nuevas se validan por columnas; el resultado es el mismo que
+    el de `validar_dataframe` en cualquier modo.
+
+    Args:
+        df: DataFrame a validar
+        validador: Reglas compiladas
+        cache: Caché de resultados abierta
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores)
+    """
+    hashes = hash_filas(df, validador.campos)
+    encontradas, fallos = cache.buscar(huella_incremental(validador, df), hashes)
+    pendientes = np.flatnonzero(~encontradas)
+    if len(pendientes):
+        nuevos = validador.fallos_por_regla(df.iloc[pendientes])
+        fallos[pendientes] = nuevos
+        cache.guardar(hashes[pendientes], nuevos)
+    cache.reutilizadas += len(df) - len(pendientes)
+    cache.validadas += len(pendientes)
+
+    mascara, errores = validador.resultado_desde_fallos(df, fallos)
+    return df[mascara], df[~mascara], errores
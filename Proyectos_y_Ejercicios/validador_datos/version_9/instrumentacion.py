@@ -0,0 +1,300 @@
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, TypeVar
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Las pilas más profundas se truncan y los tramos de menos de 1 µs se omiten
+# para que el archivo de pilas no crezca sin límite
+PROFUNDIDAD_MAXIMA_PILA = 64
+MICROSEGUNDOS_MINIMOS_PILA = 1
+
+
+def memoria_actual_mb() -> Optional[float]:
+    """
+    Memoria residente (RSS) actual del proceso, en MB.
+
+    Usa psutil si está instalado y, si no, /proc/self/statm (Linux).
+
+    Returns:
+        Optional[float]: MB en uso, o None si no se puede medir
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    try:
+        with open("/proc/self/statm") as archivo:
+            paginas = int(archivo.read().split()[1])
+        return paginas * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def memoria_pico_mb() -> Optional[float]:
+    """
+    Memoria residente máxima que ha alcanzado el proceso, en MB.
+
+    Returns:
+        Optional[float]: MB, o None si no se puede medir
+    """
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa en KB y macOS en bytes
+    return pico / (1024 ** 2 if sys.platform == "darwin" else 1024)
+
+
+class Metricas:
+    """
+    Acumula, por etapa, segundos, filas procesadas y variación de memoria.
+
+    Una etapa puede medirse varias veces (por ejemplo, una vez por bloque);
+    los valores se suman. Con exportaciones en hilos la variación de memoria
+    es la del proceso completo y solo es aproximada.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """Descarta las mediciones anteriores y reinicia el reloj total."""
+        with self._lock:
+            self._etapas: Dict[str, Dict[str, Any]] = {}
+            self._inicio = time.perf_counter()
+
+    def registrar(
+        self,
+        etapa: str,
+        segundos: float,
+        filas: int = 0,
+        memoria_delta_mb: Optional[float] = None,
+    ) -> None:
+        """
+        Suma una medición a una etapa.
+
+        Args:
+            etapa: Nombre de la etapa ("lectura", "validacion", ...)
+            segundos: Duración de la medición
+            filas: Filas procesadas en la medición
+            memoria_delta_mb: Variación de RSS durante la medición
+        """
+        with self._lock:
+            datos = self._etapas.setdefault(
+                etapa,
+                {"segundos": 0.0, "filas": 0, "memoria_delta_mb": None, "llamadas": 0},
+            )
+            datos["segundos"] += segundos
+            datos["filas"] += filas
+            datos["llamadas"] += 1
+            if memoria_delta_mb is not None:
+                datos["memoria_delta_mb"] = (
+                    datos["memoria_delta_mb"] or 0.0
+                ) + memoria_delta_mb
+
+    @contextmanager
+    def medir(self, etapa: str, filas: int = 0) -> Iterator[Dict[str, int]]:
+        """
+        Mide el bloque `with` como una ejecución de `etapa`.
+
+        Si las filas no se conocen de antemano, se asignan dentro del bloque:
+
+            with metricas.medir("lectura") as medicion:
+                df = pd.read_csv(archivo)
+                medicion["filas"] = len(df)
+
+        Args:
+            etapa: Nombre de la etapa
+            filas: Filas procesadas (si ya se conocen)
+
+        Yields:
+            Dict[str, int]: Medición en curso, con la clave "filas"
+        """
+        medicion = {"filas": filas}
+        memoria_inicial = memoria_actual_mb()
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            segundos = time.perf_counter() - inicio
+            memoria_final = memoria_actual_mb()
+            self.registrar(
+                etapa,
+                segundos,
+                medicion["filas"],
+                None if memoria_inicial is None or memoria_final is None
+                else memoria_final - memoria_inicial,
+            )
+
+    def medir_iterador(
+        self, etapa: str, iterable: Iterable[T], contar=len
+    ) -> Iterator[T]:
+        """
+        Mide el tiempo que tarda cada elemento de un iterador en producirse.
+
+        Args:
+            etapa: Nombre de la etapa
+            iterable: Iterador a medir (por ejemplo, un lector por bloques)
+            contar: Función que da las filas de cada elemento
+
+        Yields:
+            Los elementos de `iterable`
+        """
+        iterador = iter(iterable)
+        while True:
+            with self.medir(etapa) as medicion:
+                try:
+                    elemento = next(iterador)
+                except StopIteration:
+                    return
+                medicion["filas"] = contar(elemento)
+            yield elemento
+
+    def segundos(self, etapa: str) -> float:
+        """Segundos acumulados de una etapa (0 si no se ha medido)."""
+        with self._lock:
+            return self._etapas.get(etapa, {}).get("segundos", 0.0)
+
+    def resumen(self) -> Dict[str, Any]:
+        """
+        Devuelve las métricas acumuladas.
+
+        Returns:
+            Dict[str, Any]: {"etapas": {etapa: {segundos, filas,
+                filas_por_segundo, memoria_delta_mb, llamadas}},
+                "total_segundos", "memoria_pico_mb"}
+        """
+        with self._lock:
+            etapas = {}
+            for nombre, datos in self._etapas.items():
+                segundos = datos["segundos"]
+                delta = datos["memoria_delta_mb"]
+                etapas[nombre] = {
+                    "segundos": round(segundos, 6),
+                    "filas": datos["filas"],
+                    "filas_por_segundo": (
+                        round(datos["filas"] / segundos, 1)
+                        if segundos > 0 and datos["filas"] else None
+                    ),
+                    "memoria_delta_mb": None if delta is None else round(delta, 1),
+                    "llamadas": datos["llamadas"],
+                }
+            pico = memoria_pico_mb()
+            return {
+                "etapas": etapas,
+                "total_segundos": round(time.perf_counter() - self._inicio, 6),
+                "memoria_pico_mb": None if pico is None else round(pico, 1),
+            }
+
+
+# Métricas del proceso actual
+metricas = Metricas()
+
+
+def _nombre_funcion(funcion: tuple) -> str:
+    archivo, linea, nombre = funcion
+    if archivo == "~":
+        # Funciones integradas, p. ej. "<built-in method time.sleep>"
+        texto = nombre
+    else:
+        texto = f"{os.path.basename(archivo)}:{linea}({nombre})"
+    return texto.replace(";", ",").replace(" ", "_")
+
+
+def escribir_pilas_colapsadas(estadisticas: pstats.Stats, archivo_salida: str) -> None:
+    """
+    Escribe las estadísticas de cProfile como pilas colapsadas.
+
+    Cada línea es `raiz;...;funcion microsegundos`, el formato que aceptan
+    flamegraph.pl y speedscope. cProfile solo guarda relaciones
+    llamador-llamado, así que el tiempo propio de cada función se reparte
+    entre sus llamadores en proporción al tiempo acumulado de cada llamada;
+    es una aproximación, no un muestreo real de pilas.
+
+    Args:
+        estadisticas: Estadísticas de cProfile
+        archivo_salida: Ruta del archivo de salida
+    """
+    datos = estadisticas.stats
+    llamados = defaultdict(list)
+    for funcion, (_, _, _, _, llamadores) in datos.items():
+        for llamador, (_, _, _, tiempo_acumulado) in llamadores.items():
+            llamados[llamador].append((funcion, tiempo_acumulado))
+
+    pilas: Dict[str, float] = defaultdict(float)
+
+    def recorrer(funcion, pila, fraccion):
+        _, _, tiempo_propio, tiempo_acumulado, _ = datos[funcion]
+        if tiempo_propio * fraccion * 1e6 >= MICROSEGUNDOS_MINIMOS_PILA:
+            pilas[";".join(pila)] += tiempo_propio * fraccion * 1e6
+        if len(pila) >= PROFUNDIDAD_MAXIMA_PILA:
+            return
+        for hijo, tiempo_por_llamador in llamados.get(funcion, ()):
+            tiempo_hijo = datos[hijo][3]
+            if tiempo_hijo <= 0 or hijo in en_pila:
+                continue
+            fraccion_hijo = fraccion * tiempo_por_llamador / tiempo_hijo
+            if tiempo_hijo * fraccion_hijo * 1e6 < MICROSEGUNDOS_MINIMOS_PILA:
+                continue
+            en_pila.add(hijo)
+            recorrer(hijo, pila + [_nombre_funcion(hijo)], fraccion_hijo)
+            en_pila.discard(hijo)
+
+    for funcion, (_, _, _, _, llamadores) in datos.items():
+        if not llamadores:
+            en_pila = {funcion}
+            recorrer(funcion, [_nombre_funcion(funcion)], 1.0)
+
+    with open(archivo_salida, "w", encoding="utf-8") as archivo:
+        for pila, microsegundos in pilas.items():
+            if round(microsegundos) > 0:
+                archivo.write(f"{pila} {round(microsegundos)}\n")
+
+
+@contextmanager
+def perfilar(archivo_pstats: Optional[str]) -> Iterator[None]:
+    """
+    Perfila el bloque `with` con cProfile si se indica un archivo.
+
+    Escribe las estadísticas en `archivo_pstats` (para `python -m pstats` o
+    snakeviz) y las pilas colapsadas en el mismo nombre con extensión
+    `.collapsed` (para flamegraph.pl o speedscope). Solo se perfila el
+    proceso principal, no los workers.
+
+    Args:
+        archivo_pstats: Ruta del archivo pstats, o None para no perfilar
+    """
+    if not archivo_pstats:
+        yield
+        return
+
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield
+    finally:
+        perfilador.disable()
+        perfilador.dump_stats(archivo_pstats)
+        archivo_pilas = os.path.splitext(archivo_pstats)[0] + ".collapsed"
+        escribir_pilas_colapsadas(pstats.Stats(perfilador), archivo_pilas)
+        logger.info(
+            f"Perfil guardado en '{archivo_pstats}' y '{archivo_pilas}'"
+        )
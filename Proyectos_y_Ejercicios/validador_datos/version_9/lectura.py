@@ -0,0 +1,209 @@
+"""
+Lectura del archivo CSV de entrada.
+
+`procesamiento.lectura.motor` elige el lector:
+
+- "pandas" (por defecto): `pd.read_csv`. En el modo completo infiere el
+  tipo de cada columna; en el modo por bloques lee todo como texto.
+- "pyarrow": el lector CSV de pyarrow. El archivo no se copia a objetos
+  de Python: pyarrow lo divide en bloques que terminan en un salto de
+  línea y los analiza en varios hilos. Todas las columnas se leen como
+  texto, así que no hay inferencia de tipos. Las columnas pasan a pandas
+  como arreglos de cadenas de Arrow, sin crear un objeto `str` por valor;
+  las reglas vectorizadas trabajan directamente sobre ellos.
+
+En el modo completo los dos motores no dan los mismos tipos: con pandas
+una columna numérica se exporta con el número convertido ("1e3" sale como
+"1000.0"), con pyarrow se exporta el texto leído. En el modo por bloques
+ambos leen texto y las salidas coinciden.
+
+Con `procesamiento.lectura.mapear_memoria` pyarrow lee el archivo mapeado
+en memoria (`pa.memory_map`) en lugar de con lecturas normales. La
+velocidad es la misma, pero las páginas mapeadas cuentan en la memoria
+residente del proceso. Por eso no está activado por omisión.
+
+Los archivos .gz, .bz2, .xz y .zst se descomprimen mientras se leen, con
+cualquiera de los dos motores (ver `compresion.abrir_entrada`). No se
+pueden mapear en memoria.
+"""
+import csv
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from compresion import abrir_entrada, formato_de_ruta
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+
+logger = logging.getLogger(__name__)
+
+MOTORES_LECTURA = ("pandas", "pyarrow")
+
+# Valores que pd.read_csv interpreta como vacíos por omisión
+VALORES_NULOS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+
+# Bytes que pyarrow analiza a la vez en el modo por bloques
+TAMANO_BLOQUE_BYTES = 1 << 20
+
+
+def _motor(config_lectura: Optional[Dict[str, Any]]) -> str:
+    """
+    Obtiene y comprueba el motor de lectura configurado.
+
+    Raises:
+        ValueError: Si el motor no existe
+        ImportError: Si se pide pyarrow y no está instalado
+    """
+    motor = (config_lectura or {}).get("motor", "pandas")
+    if motor not in MOTORES_LECTURA:
+        raise ValueError(
+            f"Motor de lectura desconocido: {motor!r} "
+            f"(opciones: {', '.join(MOTORES_LECTURA)})"
+        )
+    if motor == "pyarrow" and pa is None:
+        raise ImportError(
+            "El motor de lectura pyarrow requiere pyarrow (pip install pyarrow)"
+        )
+    return motor
+
+
+def _abrir(archivo: str, config_lectura: Optional[Dict[str, Any]]):
+    """Abre el archivo para pyarrow, mapeado en memoria si se configuró."""
+    if formato_de_ruta(archivo) is not None:
+        return abrir_entrada(archivo)
+    if (config_lectura or {}).get("mapear_memoria", False):
+        return pa.memory_map(archivo)
+    return pa.OSFile(archivo)
+
+
+def _columnas(archivo: str) -> List[str]:
+    """Nombres de columna de la primera línea del archivo."""
+    with abrir_entrada(archivo, texto=True) as entrada:
+        return next(csv.reader(entrada), [])
+
+
+def _opciones_pyarrow(
+    archivo: str, tamano_bloque: Optional[int] = None
+) -> Dict[str, Any]:
+    """Opciones de lectura, análisis y conversión de pyarrow: todo como texto."""
+    opciones_lectura = pa_csv.ReadOptions()
+    if tamano_bloque:
+        opciones_lectura.block_size = tamano_bloque
+    # Admite saltos de línea entre comillas, como pd.read_csv; sin esto,
+    # un valor así que cae en el borde de un bloque se analiza mal
+    opciones_analisis = pa_csv.ParseOptions(newlines_in_values=True)
+    opciones_conversion = pa_csv.ConvertOptions(
+        column_types={columna: pa.string() for columna in _columnas(archivo)},
+        null_values=VALORES_NULOS,
+        strings_can_be_null=True,
+    )
+    return {
+        "read_options": opciones_lectura,
+        "parse_options": opciones_analisis,
+        "convert_options": opciones_conversion,
+    }
+
+
+def _a_pandas(tabla: "pa.Table", inicio: int = 0) -> pd.DataFrame:
+    """Convierte una tabla de Arrow con índice desde `inicio`."""
+    df = tabla.to_pandas()
+    df.index = pd.RangeIndex(inicio, inicio + len(df))
+    return df
+
+
+def leer_csv(
+    archivo: str, config_lectura: Optional[Dict[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    Lee el archivo completo.
+
+    Args:
+        archivo: Ruta del CSV
+        config_lectura: Sección `procesamiento.lectura` de la configuración
+
+    Returns:
+        pd.DataFrame: Datos del archivo
+
+    Raises:
+        ValueError: Si el motor no existe
+        ImportError: Si se pide pyarrow y no está instalado
+    """
+    if _motor(config_lectura) == "pandas":
+        # pd.read_csv también descomprime por extensión, pero .zst solo
+        # con zstandard; abrir_entrada admite además el códec de pyarrow
+        if formato_de_ruta(archivo) is None:
+            return pd.read_csv(archivo)
+        with abrir_entrada(archivo) as entrada:
+            return pd.read_csv(entrada)
+
+    opciones = _opciones_pyarrow(archivo)
+    with _abrir(archivo, config_lectura) as entrada:
+        tabla = pa_csv.read_csv(entrada, **opciones)
+    return _a_pandas(tabla)
+
+
+def leer_csv_por_bloques(
+    archivo: str,
+    tamano_chunk: int,
+    config_lectura: Optional[Dict[str, Any]] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Lee el archivo en bloques de `tamano_chunk` filas, todo como texto.
+
+    Los bloques tienen un índice continuo, igual que los de
+    `pd.read_csv(chunksize=...)`.
+
+    Args:
+        archivo: Ruta del CSV
+        tamano_chunk: Filas por bloque
+        config_lectura: Sección `procesamiento.lectura` de la configuración
+
+    Yields:
+        pd.DataFrame: Cada bloque
+
+    Raises:
+        ValueError: Si el motor no existe
+        ImportError: Si se pide pyarrow y no está instalado
+    """
+    if _motor(config_lectura) == "pandas":
+        if formato_de_ruta(archivo) is None:
+            yield from pd.read_csv(archivo, chunksize=tamano_chunk, dtype=str)
+            return
+        with abrir_entrada(archivo) as entrada:
+            yield from pd.read_csv(entrada, chunksize=tamano_chunk, dtype=str)
+        return
+
+    opciones = _opciones_pyarrow(archivo, TAMANO_BLOQUE_BYTES)
+    with _abrir(archivo, config_lectura) as entrada:
+        lector = pa_csv.open_csv(entrada, **opciones)
+        # pyarrow entrega lotes de tamaño variable (según los bytes de cada
+        # bloque); se juntan y se cortan en bloques de tamano_chunk filas
+        pendientes: List["pa.RecordBatch"] = []
+        filas_pendientes = 0
+        inicio = 0
+        for lote in lector:
+            pendientes.append(lote)
+            filas_pendientes += lote.num_rows
+            if filas_pendientes < tamano_chunk:
+                continue
+            tabla = pa.Table.from_batches(pendientes, schema=lector.schema)
+            while len(tabla) >= tamano_chunk:
+                yield _a_pandas(tabla.slice(0, tamano_chunk), inicio)
+                inicio += tamano_chunk
+                tabla = tabla.slice(tamano_chunk)
+            pendientes = tabla.to_batches()
+            filas_pendientes = len(tabla)
+        if filas_pendientes:
+            yield _a_pandas(
+                pa.Table.from_batches(pendientes, schema=lector.schema), inicio
+            )
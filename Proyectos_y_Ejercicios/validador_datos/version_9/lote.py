@@ -0,0 +1,294 @@
+"""
+Modo por lotes: valida varios archivos de entrada en una sola ejecución.
+
+`python main.py --lote RUTA` recibe un directorio (se toman sus archivos
+.csv, también comprimidos) o un patrón glob ("regiones/*.csv.gz"). Cada
+archivo se procesa igual que en una ejecución normal. Sus salidas se
+escriben en `lote.directorio_salida/<nombre del archivo>/`, con los nombres
+de `archivos` en config.yaml. Al final se escribe `resumen_lote.json`
+con el resultado de cada archivo y los totales.
+
+La configuración se carga una sola vez. Con `lote.workers` mayor que 1
+los archivos se reparten entre procesos; cada worker compila las
+validaciones una vez (`compilar_validaciones` las memoriza) y las reutiliza
+en todos sus archivos. Los archivos se envían de mayor a menor tamaño, así
+que los grandes empiezan primero y los pequeños rellenan al final; la carga
+queda repartida aunque los tamaños sean muy distintos.
+"""
+import dataclasses
+import glob
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from compresion import ruta_sin_compresion
+from config import Configuracion
+from incremental import DIRECTORIO_CACHE
+from procesador import exportar_resultados, procesar_archivo, procesar_en_bloques
+from validadores import compilar_validaciones, configurar_cache
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_SALIDA_LOTE = "resultados_lote"
+ARCHIVO_RESUMEN_LOTE = "resumen_lote.json"
+
+
+def expandir_entradas(ruta: str) -> List[str]:
+    """
+    Lista los archivos de entrada de un directorio o patrón glob.
+
+    Args:
+        ruta: Directorio (se toman sus archivos .csv, .csv.gz, etc.) o
+            patrón glob (admite `**`)
+
+    Returns:
+        List[str]: Rutas ordenadas
+    """
+    if os.path.isdir(ruta):
+        candidatos = [
+            os.path.join(ruta, nombre) for nombre in os.listdir(ruta)
+        ]
+        return sorted(
+            candidato for candidato in candidatos
+            if os.path.isfile(candidato)
+            and ruta_sin_compresion(candidato).lower().endswith(".csv")
+        )
+    return sorted(
+        candidato for candidato in glob.glob(ruta, recursive=True)
+        if os.path.isfile(candidato)
+    )
+
+
+def _nombres_salida(entradas: List[str]) -> List[str]:
+    """Nombre del directorio de salida de cada archivo, sin repetir."""
+    nombres = []
+    usados: Dict[str, int] = {}
+    for entrada in entradas:
+        nombre = os.path.splitext(os.path.basename(ruta_sin_compresion(entrada)))[0]
+        usados[nombre] = usados.get(nombre, 0) + 1
+        nombres.append(nombre if usados[nombre] == 1 else f"{nombre}_{usados[nombre]}")
+    return nombres
+
+
+def config_para_archivo(
+    config: Configuracion, entrada: str, directorio: str, workers_lote: int = 1
+) -> Configuracion:
+    """
+    Configuración de un archivo del lote.
+
+    Las rutas de salida (`archivo_*`) se mueven a `directorio` con el mismo
+    nombre de archivo y la caché incremental, si está habilitada, pasa a un
+    subdirectorio propio (cada archivo tiene sus propias filas).
+
+    Args:
+        config: Configuración cargada de config.yaml
+        entrada: Archivo de entrada
+        directorio: Directorio de salida del archivo
+        workers_lote: Procesos del lote; si es mayor que 1, cada archivo se
+            valida en un solo proceso para no anidar pools
+
+    Returns:
+        Configuracion: Copia de `config` para este archivo
+    """
+    salidas = {
+        campo.name: os.path.join(
+            directorio, os.path.basename(getattr(config, campo.name))
+        )
+        for campo in dataclasses.fields(config)
+        if campo.name.startswith("archivo_") and campo.name != "archivo_entrada"
+    }
+
+    procesamiento = dict(config.procesamiento)
+    if workers_lote > 1:
+        procesamiento["workers"] = 1
+    incremental = procesamiento.get("incremental") or {}
+    if incremental.get("habilitado", False):
+        procesamiento["incremental"] = {
+            **incremental,
+            "directorio_cache": os.path.join(
+                incremental.get("directorio_cache", DIRECTORIO_CACHE),
+                os.path.basename(directorio),
+            ),
+        }
+
+    return dataclasses.replace(
+        config, archivo_entrada=entrada, procesamiento=procesamiento, **salidas
+    )
+
+
+def validar_archivo(config: Configuracion) -> Dict[str, Any]:
+    """
+    Valida y exporta un archivo del lote.
+
+    Un error en el archivo no detiene el lote: se registra en el resultado.
+    Si el directorio de salida se creó para este archivo, se borra con lo
+    que se haya escrito, para no dejar salidas vacías o incompletas.
+
+    Args:
+        config: Configuración del archivo (ver `config_para_archivo`)
+
+    Returns:
+        Dict[str, Any]: `archivo`, `bytes`, `estado` ("ok" o "error"),
+            `segundos` y, según el estado, los totales de filas y errores o
+            el mensaje de error
+    """
+    inicio = time.perf_counter()
+    resultado: Dict[str, Any] = {
+        "archivo": config.archivo_entrada,
+        "bytes": os.path.getsize(config.archivo_entrada),
+    }
+    directorio = os.path.dirname(config.archivo_validos) or "."
+    # En el modo por bloques las salidas se escriben mientras se valida, así
+    # que el directorio tiene que existir desde el principio
+    creado = not os.path.isdir(directorio)
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        if config.procesamiento.get("tamano_chunk"):
+            total_validos, total_invalidos, errores = procesar_en_bloques(config)
+        else:
+            df_validos, df_invalidos, errores = procesar_archivo(config)
+            total_validos, total_invalidos = len(df_validos), len(df_invalidos)
+            exportar_resultados(df_validos, df_invalidos, config)
+        if errores:
+            errores.exportar(
+                config.archivo_errores, config.exportacion.get("compresion")
+            )
+
+        resultado.update(
+            estado="ok",
+            filas=total_validos + total_invalidos,
+            validas=total_validos,
+            invalidas=total_invalidos,
+            errores=len(errores),
+            errores_por_regla=[
+                {
+                    "campo": grupo["campo"],
+                    "mensaje": grupo["mensaje"],
+                    "total": grupo["total"],
+                }
+                for grupo in errores.resumen(0)
+            ],
+        )
+    except Exception as e:
+        logger.error(f"Error al procesar {config.archivo_entrada}: {e}")
+        resultado.update(estado="error", error=str(e))
+        if creado:
+            shutil.rmtree(directorio, ignore_errors=True)
+    resultado["segundos"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+
+def _inicializar_worker(
+    config_cache: Dict[str, Any], validaciones: Dict[str, Any]
+) -> None:
+    """Configura la caché del worker y compila las validaciones una vez."""
+    configurar_cache(**config_cache)
+    compilar_validaciones(validaciones)
+
+
+def _totales(resultados: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Suma los resultados de los archivos del lote."""
+    correctos = [r for r in resultados if r["estado"] == "ok"]
+    por_regla: Dict[tuple, int] = {}
+    for resultado in correctos:
+        for grupo in resultado["errores_por_regla"]:
+            clave = (grupo["campo"], grupo["mensaje"])
+            por_regla[clave] = por_regla.get(clave, 0) + grupo["total"]
+    return {
+        "archivos": len(resultados),
+        "archivos_con_error": len(resultados) - len(correctos),
+        "filas": sum(r["filas"] for r in correctos),
+        "validas": sum(r["validas"] for r in correctos),
+        "invalidas": sum(r["invalidas"] for r in correctos),
+        "errores": sum(r["errores"] for r in correctos),
+        "errores_por_regla": [
+            {"campo": campo, "mensaje": mensaje, "total": total}
+            for (campo, mensaje), total in sorted(
+                por_regla.items(), key=lambda elemento: -elemento[1]
+            )
+        ],
+    }
+
+
+def procesar_lote(
+    config: Configuracion, ruta: str, workers: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Valida todos los archivos de un directorio o patrón glob.
+
+    Args:
+        config: Configuración cargada de config.yaml
+        ruta: Directorio o patrón glob de los archivos de entrada
+        workers: Procesos para repartir los archivos (por defecto,
+            `lote.workers` de config.yaml)
+
+    Returns:
+        Dict[str, Any]: Resumen con `archivos` (el resultado de cada uno,
+            en el orden de las entradas), `totales` y `segundos`; también
+            se escribe en `lote.directorio_salida/resumen_lote.json`
+
+    Raises:
+        FileNotFoundError: Si la ruta no contiene archivos de entrada
+    """
+    inicio = time.perf_counter()
+    entradas = expandir_entradas(ruta)
+    if not entradas:
+        raise FileNotFoundError(f"No hay archivos de entrada en {ruta!r}")
+
+    directorio_salida = config.lote.get("directorio_salida", DIRECTORIO_SALIDA_LOTE)
+    if workers is None:
+        workers = int(config.lote.get("workers") or 1)
+    workers = max(1, min(workers, len(entradas)))
+    configs = [
+        config_para_archivo(
+            config, entrada, os.path.join(directorio_salida, nombre), workers
+        )
+        for entrada, nombre in zip(entradas, _nombres_salida(entradas))
+    ]
+    # De mayor a menor: los archivos grandes empiezan primero
+    orden = sorted(
+        range(len(entradas)),
+        key=lambda posicion: os.path.getsize(entradas[posicion]),
+        reverse=True,
+    )
+    logger.info(
+        f"Procesando lote de {len(entradas)} archivos con {workers} procesos"
+    )
+
+    resultados: List[Optional[Dict[str, Any]]] = [None] * len(entradas)
+    if workers == 1:
+        for posicion in orden:
+            resultados[posicion] = validar_archivo(configs[posicion])
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_inicializar_worker,
+            initargs=(config.procesamiento.get("cache", {}), config.validaciones),
+        ) as executor:
+            futuros = {
+                executor.submit(validar_archivo, configs[posicion]): posicion
+                for posicion in orden
+            }
+            for terminados, futuro in enumerate(as_completed(futuros), 1):
+                resultado = futuro.result()
+                resultados[futuros[futuro]] = resultado
+                logger.info(
+                    f"[{terminados}/{len(entradas)}] {resultado['archivo']}: "
+                    f"{resultado['estado']} ({resultado['segundos']:.2f} s)"
+                )
+
+    resumen = {
+        "archivos": resultados,
+        "totales": _totales(resultados),
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+    os.makedirs(directorio_salida, exist_ok=True)
+    archivo_resumen = os.path.join(directorio_salida, ARCHIVO_RESUMEN_LOTE)
+    with open(archivo_resumen, "w", encoding="utf-8") as archivo:
+        json.dump(resumen, archivo, indent=2, ensure_ascii=False)
+    logger.info(f"Resumen del lote guardado en '{archivo_resumen}'")
+    return resumen
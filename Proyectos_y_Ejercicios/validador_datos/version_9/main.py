@@ -1,18 +1,45 @@
+import argparse
+import atexit
 import logging
 import sys
+from typing import Any, Dict, Optional
 
-from config import cargar_configuracion
-from procesador import exportar_resultados, procesar_archivo
+from config import Configuracion, cargar_configuracion
+from instrumentacion import metricas, perfilar
+from lote import procesar_lote
+from procesador import exportar_resultados, procesar_archivo, procesar_en_bloques
+from registro_asincrono import RegistroAsincrono, crear_registro_asincrono
+from servicio import ejecutar_servicio
+from validadores import TablaErrores, cache_validaciones, configurar_cache
 
 
-def configurar_logging(nivel: str, formato: str):
+def configurar_logging(
+    nivel: str, formato: str, config_cola: Optional[Dict[str, Any]] = None
+) -> Optional[RegistroAsincrono]:
     """
     Configura el sistema de logging.
 
+    Con la cola habilitada, los mensajes se encolan y un hilo de fondo los
+    escribe por lotes en consola y archivo; si no, se escriben directamente.
+
     Args:
         nivel: Nivel de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         formato: Formato de los mensajes de log
+        config_cola: Sección `logging.cola` de config.yaml
+
+    Returns:
+        Optional[RegistroAsincrono]: Canal asíncrono, o None si está
+            deshabilitado
     """
+    config_cola = config_cola or {}
+    if config_cola.get("habilitada", True):
+        registro = crear_registro_asincrono(
+            nivel, formato, "validacion.log", config_cola
+        )
+        # También al salir con sys.exit(), para no perder los últimos mensajes
+        atexit.register(registro.detener)
+        return registro
+
     logging.basicConfig(
         level=getattr(logging, nivel),
         format=formato,
@@ -21,43 +48,250 @@ def configurar_logging(nivel: str, formato: str):
             logging.FileHandler("validacion.log"),
         ],
     )
+    return None
+
+
+def reportar_errores(errores: TablaErrores, config: Configuracion) -> None:
+    """
+    Resume los errores en el log y escribe el detalle completo en un archivo.
+
+    Los errores se agrupan por campo y mensaje, con su total y algunas filas
+    de ejemplo. El detalle de cada error se escribe de una sola vez en
+    `archivos.errores`; solo con `logging.verbosidad_errores: "detalle"` se
+    registra además una entrada de log por error.
+
+    Args:
+        errores: Errores de validación
+        config: Configuración de la aplicación
+    """
+    logger = logging.getLogger(__name__)
+    muestras = config.config_logging.get("muestras_por_grupo", 3)
+
+    logger.warning(f"\nErrores encontrados: {len(errores)}")
+    for grupo in errores.resumen(muestras):
+        ejemplos = ", ".join(
+            f"fila {fila} ({valor!r})" for fila, valor in grupo["ejemplos"]
+        )
+        logger.warning(
+            f"Campo: {grupo['campo']} | Error: {grupo['mensaje']} | "
+            f"Total: {grupo['total']} | Ejemplos: {ejemplos}"
+        )
+
+    errores.exportar(
+        config.archivo_errores, config.exportacion.get("compresion")
+    )
+    logger.info(f"Detalle de errores guardado en '{config.archivo_errores}'")
 
+    if config.config_logging.get("verbosidad_errores", "resumen") == "detalle":
+        for error in errores:
+            logger.warning(f"\nFila {error.fila}:")
+            logger.warning(f"Campo: {error.campo}")
+            logger.warning(f"Valor: {error.valor}")
+            logger.warning(f"Error: {error.mensaje}")
 
-def main():
+
+def parsear_argumentos(argv=None) -> argparse.Namespace:
+    """
+    Lee las opciones de línea de comandos.
+
+    Args:
+        argv: Argumentos a interpretar (por defecto, los de sys.argv)
+
+    Returns:
+        argparse.Namespace: Opciones interpretadas
+    """
+    parser = argparse.ArgumentParser(description="Validador de datos")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Número de procesos para validar en paralelo "
+        "(sustituye a procesamiento.workers de config.yaml)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="perfil.pstats",
+        default=None,
+        metavar="ARCHIVO",
+        help="Perfila la ejecución con cProfile y guarda ARCHIVO (pstats) y "
+        "las pilas colapsadas para flamegraph (por defecto, perfil.pstats)",
+    )
+    parser.add_argument(
+        "--lote",
+        default=None,
+        metavar="RUTA",
+        help="Valida todos los archivos .csv de un directorio o de un patrón "
+        "glob, con salidas por archivo y un resumen consolidado",
+    )
+    parser.add_argument(
+        "--workers-lote",
+        type=int,
+        default=None,
+        help="Procesos para repartir los archivos del lote "
+        "(sustituye a lote.workers de config.yaml)",
+    )
+    parser.add_argument(
+        "--servicio",
+        action="store_true",
+        help="Arranca el servicio de validación (HTTP en localhost o socket "
+        "Unix, según la sección servicio de config.yaml)",
+    )
+    return parser.parse_args(argv)
+
+
+def reportar_lote(resumen: Dict[str, Any]) -> None:
+    """
+    Registra en el log el resultado de cada archivo del lote y los totales.
+
+    Args:
+        resumen: Resumen devuelto por `procesar_lote`
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("\nResultados del lote:")
+    for resultado in resumen["archivos"]:
+        if resultado["estado"] == "ok":
+            logger.info(
+                f"{resultado['archivo']}: {resultado['filas']} filas, "
+                f"{resultado['validas']} válidas, {resultado['invalidas']} "
+                f"inválidas ({resultado['segundos']:.2f} s)"
+            )
+        else:
+            logger.error(f"{resultado['archivo']}: {resultado['error']}")
+
+    totales = resumen["totales"]
+    logger.info(
+        f"Total: {totales['archivos']} archivos, {totales['filas']} filas, "
+        f"{totales['validas']} válidas, {totales['invalidas']} inválidas, "
+        f"{totales['errores']} errores en {resumen['segundos']:.2f} s"
+    )
+    for grupo in totales["errores_por_regla"]:
+        logger.warning(
+            f"Campo: {grupo['campo']} | Error: {grupo['mensaje']} | "
+            f"Total: {grupo['total']}"
+        )
+
+
+def reportar_metricas(resumen: Dict[str, Any]) -> None:
+    """
+    Registra en el log el tiempo, las filas por segundo y la memoria de
+    cada etapa.
+
+    Args:
+        resumen: Métricas devueltas por `metricas.resumen()`
+    """
+    logger = logging.getLogger(__name__)
+    logger.info("\nMétricas por etapa:")
+    for nombre, etapa in resumen["etapas"].items():
+        velocidad = (
+            f"{etapa['filas_por_segundo']:,.0f} filas/s"
+            if etapa["filas_por_segundo"] else "-"
+        )
+        memoria = (
+            f"{etapa['memoria_delta_mb']:+.1f} MB"
+            if etapa["memoria_delta_mb"] is not None else "-"
+        )
+        logger.info(
+            f"{nombre}: {etapa['segundos']:.3f} s | {etapa['filas']} filas | "
+            f"{velocidad} | memoria {memoria}"
+        )
+    logger.info(
+        f"Total: {resumen['total_segundos']:.3f} s | "
+        f"pico de memoria {resumen['memoria_pico_mb']} MB"
+    )
+
+
+def main(argv=None) -> Dict[str, Any]:
+    """
+    Ejecuta la validación completa.
+
+    Args:
+        argv: Argumentos de línea de comandos (por defecto, los de sys.argv)
+
+    Returns:
+        Dict[str, Any]: Métricas de la ejecución (ver `Metricas.resumen`)
+    """
+    args = parsear_argumentos(argv)
+    metricas.reiniciar()
     try:
         # Cargar configuración
         config = cargar_configuracion()
+        if args.workers is not None:
+            config.procesamiento["workers"] = args.workers
 
         # Configurar logging
-        configurar_logging(
+        registro = configurar_logging(
             config.nivel_log,
-            config.validaciones.get(
+            config.config_logging.get(
                 "formato", "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
             ),
+            config.config_logging.get("cola"),
         )
 
         logger = logging.getLogger(__name__)
         logger.info("Iniciando proceso de validación")
 
-        # Procesar el archivo
-        df_validos, df_invalidos, errores = procesar_archivo(config)
-
-        # Mostrar resultados
-        logger.info("\nResultados de la validación:")
-        logger.info(f"Total de filas: {len(df_validos) + len(df_invalidos)}")
-        logger.info(f"Filas válidas: {len(df_validos)}")
-        logger.info(f"Filas inválidas: {len(df_invalidos)}")
-
-        if errores:
-            logger.warning("\nErrores encontrados:")
-            for error in errores:
-                logger.warning(f"\nFila {error.fila}:")
-                logger.warning(f"Campo: {error.campo}")
-                logger.warning(f"Valor: {error.valor}")
-                logger.warning(f"Error: {error.mensaje}")
-
-        # Exportar resultados
-        exportar_resultados(df_validos, df_invalidos, config)
+        # Configurar la caché de validaciones
+        configurar_cache(**config.procesamiento.get("cache", {}))
+
+        if args.servicio:
+            ejecutar_servicio()
+            if registro is not None:
+                registro.detener()
+            return metricas.resumen()
+
+        if args.lote is not None:
+            with perfilar(args.profile):
+                resumen_lote = procesar_lote(config, args.lote, args.workers_lote)
+            reportar_lote(resumen_lote)
+            resumen = metricas.resumen()
+            if registro is not None:
+                registro.detener()
+            if resumen_lote["totales"]["archivos_con_error"]:
+                sys.exit(1)
+            return resumen
+
+        with perfilar(args.profile):
+            # Procesar el archivo (por bloques, exportando sobre la marcha, si
+            # se configuró un tamaño de bloque)
+            por_bloques = bool(config.procesamiento.get("tamano_chunk"))
+            if por_bloques:
+                total_validos, total_invalidos, errores = procesar_en_bloques(
+                    config
+                )
+            else:
+                df_validos, df_invalidos, errores = procesar_archivo(config)
+                total_validos = len(df_validos)
+                total_invalidos = len(df_invalidos)
+
+            # Mostrar resultados
+            logger.info("\nResultados de la validación:")
+            logger.info(f"Total de filas: {total_validos + total_invalidos}")
+            logger.info(f"Filas válidas: {total_validos}")
+            logger.info(f"Filas inválidas: {total_invalidos}")
+
+            if errores:
+                with metricas.medir("reporte_errores", len(errores)):
+                    reportar_errores(errores, config)
+
+            # Exportar resultados
+            if not por_bloques:
+                exportar_resultados(df_validos, df_invalidos, config)
+
+        estadisticas = cache_validaciones.estadisticas()
+        logger.info(
+            f"Caché de validaciones: {estadisticas['aciertos']} aciertos, "
+            f"{estadisticas['fallos']} fallos, "
+            f"{estadisticas['desalojos']} desalojos "
+            f"(tasa de aciertos: {estadisticas['tasa_aciertos']:.1%})"
+        )
+
+        resumen = metricas.resumen()
+        reportar_metricas(resumen)
+
+        if registro is not None:
+            registro.detener()
+        return resumen
 
     except Exception as e:
         logger.error(f"Error al procesar el archivo: {e}", exc_info=True)
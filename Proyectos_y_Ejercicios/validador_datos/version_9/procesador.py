@@ -1,57 +1,309 @@
 import logging
-from typing import Any, Dict, List, Tuple
+import math
+import time
+from collections import deque
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from contextlib import ExitStack
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 import pandas as pd
+from compresion import abrir_salida
 from config import Configuracion
-from exportador_json import exportar_a_json
-from exportador_xml import exportar_a_xml
-from validadores import ErrorValidacion, validar_ip, validar_ruta_script
+from exportador_json import EscritorJSON, exportar_a_json
+from exportador_parquet import (
+    EscritorFeather,
+    EscritorParquet,
+    exportar_a_feather,
+    exportar_a_parquet,
+)
+from exportador_xml import EscritorXML, exportar_a_xml
+from incremental import CacheResultados, DIRECTORIO_CACHE, validar_incremental
+from instrumentacion import memoria_actual_mb, metricas
+from lectura import leer_csv, leer_csv_por_bloques
+from unicidad import DetectorDuplicados, crear_detector
+from validadores import (
+    ErrorValidacion,
+    TablaErrores,
+    ValidadorCompilado,
+    cache_validaciones,
+    compilar_validaciones,
+    configurar_cache,
+)
 
 logger = logging.getLogger(__name__)
 
+MODOS_VALIDACION = ("vectorizado", "fila")
+MODOS_CONCURRENCIA_EXPORTACION = ("hilos", "procesos")
+
 
 def validar_fila(
-    row: pd.Series, config: Dict[str, Any]
+    row: pd.Series, validador: ValidadorCompilado
 ) -> Tuple[bool, List[ErrorValidacion]]:
     """
     Valida una fila completa del DataFrame.
 
+    Las reglas se compilan una vez, fuera del recorrido de las filas:
+
+        validador = compilar_validaciones(config.validaciones)
+        for _, row in df.iterrows():
+            es_valida, errores = validar_fila(row, validador)
+
     Args:
         row: La fila a validar
-        config: Configuración de validaciones
+        validador: Reglas compiladas con `compilar_validaciones`
 
     Returns:
         Tuple[bool, List[ErrorValidacion]]: (es_válida, lista_errores)
     """
-    errores = []
-    ip_valida, mensaje_ip = validar_ip(row["ip"], config["ip"])
-    ruta_valida, mensaje_ruta = validar_ruta_script(
-        row["ruta_script"], config["ruta_script"]
+    errores = validador.validar_fila(row.name + 1, row)
+    return len(errores) == 0, errores
+
+
+def _validar_por_filas(
+    df: pd.DataFrame, validador: ValidadorCompilado
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+    """
+    Valida el DataFrame fila por fila.
+
+    Es el modo de referencia: más lento, pero sirve para comprobar que el
+    modo vectorizado produce exactamente los mismos resultados.
+
+    Args:
+        df: DataFrame a validar
+        validador: Reglas compiladas
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores)
+    """
+    mascara, errores = validador.validar_filas(df)
+    return df[mascara], df[~mascara], errores
+
+
+def _validar_vectorizado(
+    df: pd.DataFrame, validador: ValidadorCompilado
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+    """
+    Valida el DataFrame columna por columna.
+
+    Cada regla produce una máscara booleana sobre la columna completa; las
+    filas se separan con indexación booleana y los errores de cada regla se
+    agregan en bloque a una `TablaErrores`, sin crear un objeto por error.
+
+    Args:
+        df: DataFrame a validar
+        validador: Reglas compiladas
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores)
+    """
+    mascara, errores = validador.validar_columnas(df)
+    return df[mascara], df[~mascara], errores
+
+
+def validar_dataframe(
+    df: pd.DataFrame,
+    validaciones: Union[Dict[str, Any], ValidadorCompilado],
+    modo: str = "vectorizado",
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+    """
+    Separa las filas válidas de las inválidas de un DataFrame.
+
+    Args:
+        df: DataFrame a validar
+        validaciones: Configuración de validaciones o validador ya compilado
+        modo: "vectorizado" (por columnas) o "fila" (modo de referencia)
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores)
+
+    Raises:
+        ValueError: Si el modo de validación no existe o hay reglas
+            desconocidas
+    """
+    validador = compilar_validaciones(validaciones)
+    if modo == "vectorizado":
+        return _validar_vectorizado(df, validador)
+    if modo == "fila":
+        return _validar_por_filas(df, validador)
+    raise ValueError(
+        f"Modo de validación desconocido: {modo!r} "
+        f"(opciones: {', '.join(MODOS_VALIDACION)})"
     )
 
-    if not ip_valida:
-        errores.append(
-            ErrorValidacion(
-                fila=row.name + 1, campo="ip", valor=row["ip"], mensaje=mensaje_ip
+
+def _validar_en_worker(
+    bloque: pd.DataFrame,
+    validaciones: Union[Dict[str, Any], ValidadorCompilado],
+    modo: str,
+) -> Tuple[Tuple[pd.DataFrame, pd.DataFrame, TablaErrores], Tuple[int, int, int]]:
+    """
+    Valida un bloque dentro de un worker y devuelve el uso de su caché.
+
+    Args:
+        bloque: Bloque a validar
+        validaciones: Configuración de validaciones o validador compilado
+        modo: Modo de validación
+
+    Returns:
+        Tuple: (resultado de `validar_dataframe`, (aciertos, fallos, desalojos)
+            de la caché del worker durante este bloque)
+    """
+    antes = (
+        cache_validaciones.aciertos,
+        cache_validaciones.fallos,
+        cache_validaciones.desalojos,
+    )
+    resultado = validar_dataframe(bloque, validaciones, modo)
+    despues = (
+        cache_validaciones.aciertos,
+        cache_validaciones.fallos,
+        cache_validaciones.desalojos,
+    )
+    return resultado, tuple(d - a for d, a in zip(despues, antes))
+
+
+def validar_bloques(
+    bloques: Iterable[pd.DataFrame],
+    validaciones: Union[Dict[str, Any], ValidadorCompilado],
+    modo: str = "vectorizado",
+    workers: int = 1,
+) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]]:
+    """
+    Valida una secuencia de bloques, en serie o en un pool de procesos.
+
+    Con más de un worker cada bloque se envía a un `ProcessPoolExecutor`; los
+    resultados se entregan siempre en el orden de entrada y cada bloque
+    conserva su índice original, así que los números de fila de los errores
+    coinciden con los de una ejecución en serie. Solo se mantienen
+    `2 * workers` bloques en vuelo para no acumular el archivo en memoria.
+    Cada worker tiene su propia caché de validaciones, configurada igual que
+    la del proceso principal; sus estadísticas se suman a esta última.
+
+    Args:
+        bloques: Bloques del DataFrame a validar
+        validaciones: Configuración de validaciones o validador compilado
+        modo: Modo de validación ("vectorizado" o "fila")
+        workers: Número de procesos; 1 o menos valida en el proceso actual
+
+    Yields:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores) de cada bloque
+    """
+    validador = compilar_validaciones(validaciones)
+    if workers <= 1:
+        for bloque in bloques:
+            yield validar_dataframe(bloque, validador, modo)
+        return
+
+    def recibir(futuro) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+        resultado, uso_cache = futuro.result()
+        cache_validaciones.registrar(*uso_cache)
+        return resultado
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=configurar_cache,
+        initargs=(cache_validaciones.tamano_maximo, cache_validaciones.habilitada),
+    ) as executor:
+        pendientes = deque()
+        for bloque in bloques:
+            pendientes.append(
+                executor.submit(_validar_en_worker, bloque, validador, modo)
             )
+            if len(pendientes) >= 2 * workers:
+                yield recibir(pendientes.popleft())
+        while pendientes:
+            yield recibir(pendientes.popleft())
+
+
+def _unir_resultados(
+    resultados: List[Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]]
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+    """
+    Une los resultados de varios bloques en el orden recibido.
+
+    Args:
+        resultados: Lista de (df_validos, df_invalidos, errores) por bloque
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores)
+    """
+    unidos = []
+    for posicion in (0, 1):
+        partes = [r[posicion] for r in resultados if not r[posicion].empty]
+        unidos.append(
+            pd.concat(partes) if partes else resultados[0][posicion]
         )
 
-    if not ruta_valida:
-        errores.append(
-            ErrorValidacion(
-                fila=row.name + 1,
-                campo="ruta_script",
-                valor=row["ruta_script"],
-                mensaje=mensaje_ruta,
-            )
+    errores = TablaErrores()
+    for _, _, errores_bloque in resultados:
+        errores.extender(errores_bloque)
+
+    return unidos[0], unidos[1], errores
+
+
+def _separar_duplicados(
+    resultado: Tuple[pd.DataFrame, pd.DataFrame, TablaErrores],
+    duplicadas: pd.Index,
+    errores_duplicados: TablaErrores,
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+    """
+    Pasa a inválidas las filas duplicadas y agrega sus errores.
+
+    Args:
+        resultado: (df_validos, df_invalidos, errores) de la validación
+        duplicadas: Índices de las filas duplicadas
+        errores_duplicados: Errores de las reglas de unicidad
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores)
+    """
+    df_validos, df_invalidos, errores = resultado
+    mover = df_validos.index.isin(duplicadas)
+    if mover.any():
+        movidas = df_validos[mover]
+        df_validos = df_validos[~mover]
+        df_invalidos = (
+            movidas if df_invalidos.empty
+            else pd.concat([df_invalidos, movidas]).sort_index(kind="stable")
         )
+    errores.extender(errores_duplicados)
+    return df_validos, df_invalidos, errores
 
-    return len(errores) == 0, errores
+
+def _reportar_duplicados(detector: DetectorDuplicados) -> None:
+    """Registra en el log los duplicados encontrados por cada regla."""
+    for regla in detector.resumen():
+        lugar = "en disco" if regla["en_disco"] else "en memoria"
+        logger.info(
+            f"Unicidad de '{regla['campo']}': {regla['duplicados']} "
+            f"duplicados (claves {lugar})"
+        )
 
 
 def procesar_archivo(
     config: Configuracion,
-) -> Tuple[pd.DataFrame, pd.DataFrame, List[ErrorValidacion]]:
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
     """
     Procesa un archivo CSV y separa los datos válidos de los inválidos.
 
@@ -59,28 +311,56 @@ def procesar_archivo(
         config: Configuración de la aplicación
 
     Returns:
-        Tuple[pd.DataFrame, pd.DataFrame, List[ErrorValidacion]]:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
             (df_validos, df_invalidos, errores)
     """
     logger.info(f"Procesando archivo: {config.archivo_entrada}")
-    df = pd.read_csv(config.archivo_entrada)
+    with metricas.medir("lectura") as medicion:
+        df = leer_csv(
+            config.archivo_entrada, config.procesamiento.get("lectura")
+        )
+        medicion["filas"] = len(df)
     logger.info(f"Archivo cargado: {len(df)} filas")
 
-    errores_totales: List[ErrorValidacion] = []
-    filas_validas = []
-    filas_invalidas = []
-
-    for index, row in df.iterrows():
-        es_valida, errores = validar_fila(row, config.validaciones)
-        errores_totales.extend(errores)
-
-        if es_valida:
-            filas_validas.append(row)
-        else:
-            filas_invalidas.append(row)
+    modo = config.procesamiento.get("modo_validacion", "vectorizado")
+    workers = int(config.procesamiento.get("workers") or 1)
+    validador = compilar_validaciones(config.validaciones)
+    incremental = config.procesamiento.get("incremental") or {}
+    if incremental.get("habilitado", False):
+        with metricas.medir("validacion", len(df)), CacheResultados(
+            incremental.get("directorio_cache", DIRECTORIO_CACHE)
+        ) as cache:
+            df_validos, df_invalidos, errores_totales = validar_incremental(
+                df, validador, cache
+            )
+    elif workers > 1 and len(df) > 0:
+        # Varias particiones por worker para repartir mejor la carga
+        tamano = math.ceil(len(df) / (workers * 4))
+        particiones = (
+            df.iloc[inicio:inicio + tamano]
+            for inicio in range(0, len(df), tamano)
+        )
+        logger.info(f"Validando en paralelo con {workers} procesos")
+        with metricas.medir("validacion", len(df)):
+            df_validos, df_invalidos, errores_totales = _unir_resultados(
+                list(validar_bloques(particiones, validador, modo, workers))
+            )
+    else:
+        with metricas.medir("validacion", len(df)):
+            df_validos, df_invalidos, errores_totales = validar_dataframe(
+                df, validador, modo
+            )
 
-    df_validos = pd.DataFrame(filas_validas)
-    df_invalidos = pd.DataFrame(filas_invalidas)
+    with crear_detector(config.unicidad) as detector:
+        if detector:
+            with metricas.medir("unicidad", len(df)):
+                duplicadas, errores_duplicados = detector.revisar(df)
+            df_validos, df_invalidos, errores_totales = _separar_duplicados(
+                (df_validos, df_invalidos, errores_totales),
+                df.index[duplicadas],
+                errores_duplicados,
+            )
+            _reportar_duplicados(detector)
 
     logger.info(
         f"Procesamiento completado: {len(df_validos)} válidas, "
@@ -89,54 +369,489 @@ def procesar_archivo(
     return df_validos, df_invalidos, errores_totales
 
 
+def validar_en_memoria(
+    df: pd.DataFrame,
+    config: Configuracion,
+    validador: Optional[ValidadorCompilado] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+    """
+    Valida un DataFrame ya cargado, incluidas las reglas de unicidad.
+
+    Hace lo mismo que `procesar_archivo` después de leer, pero siempre en
+    el proceso actual y sin métricas por etapa. Está pensada para lotes
+    pequeños, como los del servicio.
+
+    Args:
+        df: Datos a validar
+        config: Configuración de la aplicación
+        validador: Validaciones ya compiladas de `config`; si se omite se
+            compilan (o se toman de la memoria de `compilar_validaciones`)
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame, TablaErrores]:
+            (df_validos, df_invalidos, errores)
+    """
+    modo = config.procesamiento.get("modo_validacion", "vectorizado")
+    if validador is None:
+        validador = compilar_validaciones(config.validaciones)
+    resultado = validar_dataframe(df, validador, modo)
+    with crear_detector(config.unicidad) as detector:
+        if detector:
+            duplicadas, errores_duplicados = detector.revisar(df)
+            resultado = _separar_duplicados(
+                resultado, df.index[duplicadas], errores_duplicados
+            )
+    return resultado
+
+
+class ErrorExportacion(Exception):
+    """Una o más salidas no se pudieron escribir."""
+
+    def __init__(self, errores: Dict[str, Exception]):
+        """
+        Args:
+            errores: Excepción de cada archivo que falló, por ruta
+        """
+        self.errores = errores
+        detalle = "; ".join(
+            f"{archivo}: {error}" for archivo, error in errores.items()
+        )
+        super().__init__(f"Fallaron {len(errores)} exportaciones: {detalle}")
+
+
+def _exportar_a_csv(
+    df: pd.DataFrame,
+    archivo_salida: str,
+    descripcion: str,
+    compresion: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Exporta un DataFrame a CSV si tiene filas.
+
+    Args:
+        df: DataFrame a exportar
+        archivo_salida: Ruta del archivo de salida (.gz, .bz2, .xz o .zst
+            para comprimirlo)
+        descripcion: Descripción para el log ("válidos" o "inválidos")
+        compresion: Nivel e hilos de compresión (`exportacion.compresion`)
+    """
+    with EscritorCSV(archivo_salida, descripcion, compresion) as escritor:
+        escritor.escribir(df)
+
+
+def _ejecutar_exportacion(
+    funcion: Callable[..., None], argumentos: tuple
+) -> Tuple[float, Optional[float]]:
+    """
+    Ejecuta una exportación y mide su duración y su uso de memoria.
+
+    Args:
+        funcion: Función exportadora
+        argumentos: Argumentos de la función
+
+    Returns:
+        Tuple[float, Optional[float]]: (segundos, variación de RSS en MB del
+            proceso que exportó, o None si no se puede medir)
+    """
+    memoria_inicial = memoria_actual_mb()
+    inicio = time.perf_counter()
+    funcion(*argumentos)
+    segundos = time.perf_counter() - inicio
+    memoria_final = memoria_actual_mb()
+    if memoria_inicial is None or memoria_final is None:
+        return segundos, None
+    return segundos, memoria_final - memoria_inicial
+
+
+def _tareas_exportacion(
+    df_validos: pd.DataFrame, df_invalidos: pd.DataFrame, config: Configuracion
+) -> List[Tuple[str, str, Callable[..., None], tuple]]:
+    """
+    Lista las exportaciones habilitadas.
+
+    Returns:
+        List[Tuple[str, str, Callable, tuple]]:
+            (formato, archivo_salida, función, argumentos) por archivo
+    """
+    compresion = config.exportacion.get("compresion")
+    tareas = [
+        ("csv", config.archivo_validos, _exportar_a_csv,
+         (df_validos, config.archivo_validos, "válidos", compresion)),
+        ("csv", config.archivo_invalidos, _exportar_a_csv,
+         (df_invalidos, config.archivo_invalidos, "inválidos", compresion)),
+    ]
+
+    config_xml = config.exportacion.get("xml", {})
+    if config_xml.get("habilitada", False):
+        tareas += [
+            ("xml", config.archivo_xml_validos, exportar_a_xml,
+             (df_validos, config.archivo_xml_validos, config_xml, compresion)),
+            ("xml", config.archivo_xml_invalidos, exportar_a_xml,
+             (df_invalidos, config.archivo_xml_invalidos, config_xml,
+              compresion)),
+        ]
+
+    config_json = config.exportacion.get("json", {})
+    if config_json.get("habilitada", False):
+        tareas += [
+            ("json", config.archivo_json_validos, exportar_a_json,
+             (df_validos, config.archivo_json_validos, config_json, "validos",
+              compresion)),
+            ("json", config.archivo_json_invalidos, exportar_a_json,
+             (df_invalidos, config.archivo_json_invalidos, config_json,
+              "invalidos", compresion)),
+        ]
+
+    config_parquet = config.exportacion.get("parquet", {})
+    if config_parquet.get("habilitada", False):
+        tareas += [
+            ("parquet", config.archivo_parquet_validos, exportar_a_parquet,
+             (df_validos, config.archivo_parquet_validos, config_parquet)),
+            ("parquet", config.archivo_parquet_invalidos, exportar_a_parquet,
+             (df_invalidos, config.archivo_parquet_invalidos, config_parquet)),
+        ]
+        if config_parquet.get("feather", False):
+            tareas += [
+                ("feather", config.archivo_feather_validos, exportar_a_feather,
+                 (df_validos, config.archivo_feather_validos, config_parquet)),
+                ("feather", config.archivo_feather_invalidos, exportar_a_feather,
+                 (df_invalidos, config.archivo_feather_invalidos,
+                  config_parquet)),
+            ]
+
+    return tareas
+
+
 def exportar_resultados(
     df_validos: pd.DataFrame, df_invalidos: pd.DataFrame, config: Configuracion
-) -> None:
+) -> Dict[str, float]:
     """
-    Exporta los resultados a archivos CSV, XML y JSON.
+    Exporta los resultados a archivos CSV, XML, JSON y, si se habilitan,
+    Parquet y Feather.
+
+    Cada archivo es independiente. Con `exportacion.workers` mayor que 1 se
+    escriben en paralelo, en hilos o en procesos según
+    `exportacion.concurrencia`. Si un archivo falla, los demás se terminan
+    de escribir y al final se lanza `ErrorExportacion` con todos los fallos.
 
     Args:
         df_validos: DataFrame con datos válidos
         df_invalidos: DataFrame con datos inválidos
         config: Configuración de la aplicación
+
+    Returns:
+        Dict[str, float]: Segundos de escritura por archivo
+
+    Raises:
+        ErrorExportacion: Si falló al menos una exportación
+        ValueError: Si el modo de concurrencia no existe
     """
-    # Exportar a CSV
-    if not df_validos.empty:
-        df_validos.to_csv(config.archivo_validos, index=False)
-        logger.info(f"Datos válidos guardados en '{config.archivo_validos}'")
-
-    if not df_invalidos.empty:
-        df_invalidos.to_csv(config.archivo_invalidos, index=False)
-        logger.info(f"Datos inválidos guardados en '{config.archivo_invalidos}'")
-
-    # Exportar a XML si está habilitado
-    if config.exportacion.get("xml", {}).get("habilitada", False):
-        try:
-            exportar_a_xml(
-                df_validos, config.archivo_xml_validos, config.exportacion["xml"]
-            )
-            exportar_a_xml(
-                df_invalidos, config.archivo_xml_invalidos, config.exportacion["xml"]
-            )
-        except Exception as e:
-            logger.error(f"Error al exportar a XML: {e}")
-            raise
-
-    # Exportar a JSON si está habilitado
-    if config.exportacion.get("json", {}).get("habilitada", False):
-        try:
-            exportar_a_json(
-                df_validos,
-                config.archivo_json_validos,
-                config.exportacion["json"],
-                "validos",
-            )
-            exportar_a_json(
-                df_invalidos,
-                config.archivo_json_invalidos,
-                config.exportacion["json"],
-                "invalidos",
-            )
-        except Exception as e:
-            logger.error(f"Error al exportar a JSON: {e}")
-            raise
+    tareas = _tareas_exportacion(df_validos, df_invalidos, config)
+    workers = int(config.exportacion.get("workers") or 1)
+    concurrencia = config.exportacion.get("concurrencia", "hilos")
+    if concurrencia not in MODOS_CONCURRENCIA_EXPORTACION:
+        raise ValueError(
+            f"Modo de concurrencia desconocido: {concurrencia!r} "
+            f"(opciones: {', '.join(MODOS_CONCURRENCIA_EXPORTACION)})"
+        )
+
+    mediciones: Dict[str, Tuple[float, Optional[float]]] = {}
+    errores: Dict[str, Exception] = {}
+    inicio = time.perf_counter()
+
+    if workers <= 1:
+        for formato, archivo, funcion, argumentos in tareas:
+            try:
+                mediciones[archivo] = _ejecutar_exportacion(funcion, argumentos)
+            except Exception as e:
+                errores[archivo] = e
+    else:
+        clase_executor = (
+            ThreadPoolExecutor if concurrencia == "hilos" else ProcessPoolExecutor
+        )
+        with clase_executor(max_workers=min(workers, len(tareas))) as executor:
+            futuros = {
+                executor.submit(_ejecutar_exportacion, funcion, argumentos): archivo
+                for _, archivo, funcion, argumentos in tareas
+            }
+            for futuro in as_completed(futuros):
+                archivo = futuros[futuro]
+                try:
+                    mediciones[archivo] = futuro.result()
+                except Exception as e:
+                    errores[archivo] = e
+
+    tiempos = {archivo: segundos for archivo, (segundos, _) in mediciones.items()}
+    for formato, archivo, _, argumentos in tareas:
+        if archivo in tiempos:
+            metricas.registrar(
+                f"exportacion_{formato}",
+                tiempos[archivo],
+                len(argumentos[0]),
+                mediciones[archivo][1],
+            )
+            logger.info(
+                f"Exportación {formato.upper()} '{archivo}': "
+                f"{tiempos[archivo]:.3f} s"
+            )
+        elif archivo in errores:
+            logger.error(
+                f"Error al exportar a {formato.upper()} '{archivo}': "
+                f"{errores[archivo]}"
+            )
+    logger.info(
+        f"Exportación completada en {time.perf_counter() - inicio:.3f} s "
+        f"({len(tareas)} archivos, {workers} workers)"
+    )
+
+    if errores:
+        raise ErrorExportacion(errores)
+    return tiempos
+
+
+class EscritorCSV:
+    """
+    Escribe un CSV por bloques de filas.
+
+    El primer bloque no vacío crea el archivo con encabezado; los siguientes
+    se agregan al final sin repetirlo. El archivo queda abierto entre
+    bloques, así que una salida comprimida es un único flujo.
+    """
+
+    def __init__(
+        self,
+        archivo_salida: str,
+        descripcion: str,
+        compresion: Optional[Dict[str, Any]] = None,
+    ):
+        """
+        Args:
+            archivo_salida: Ruta del archivo de salida (.gz, .bz2, .xz o
+                .zst para comprimirlo)
+            descripcion: Descripción para el log ("válidos" o "inválidos")
+            compresion: Nivel e hilos de compresión (`exportacion.compresion`)
+        """
+        self.archivo_salida = archivo_salida
+        self.descripcion = descripcion
+        self.compresion = compresion
+        self.total_filas = 0
+        self._archivo: Optional[TextIO] = None
+
+    def __enter__(self) -> "EscritorCSV":
+        return self
+
+    def __exit__(self, tipo_excepcion, *exc_info) -> None:
+        if tipo_excepcion is None:
+            self.cerrar()
+        elif self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+    def escribir(self, df: pd.DataFrame) -> None:
+        """
+        Agrega las filas de un bloque al archivo.
+
+        Args:
+            df: Bloque de filas a escribir
+        """
+        if df.empty:
+            return
+
+        if self._archivo is None:
+            # newline="" como cuando to_csv abre la ruta por su cuenta
+            self._archivo = abrir_salida(
+                self.archivo_salida, self.compresion, newline=""
+            )
+        df.to_csv(self._archivo, index=False, header=not self.total_filas)
+        self.total_filas += len(df)
+
+    def cerrar(self) -> None:
+        """Cierra el archivo y lo registra en el log."""
+        if self._archivo is None:
+            return
+        self._archivo.close()
+        self._archivo = None
+        logger.info(
+            f"Datos {self.descripcion} guardados en '{self.archivo_salida}'"
+        )
+
+
+def procesar_en_bloques(
+    config: Configuracion,
+) -> Tuple[int, int, TablaErrores]:
+    """
+    Procesa el archivo por bloques y exporta cada bloque en cuanto se valida.
+
+    Lee `procesamiento.tamano_chunk` filas a la vez, las valida (en paralelo
+    si `procesamiento.workers` es mayor que 1) y las agrega a las salidas
+    CSV, XML, JSON, Parquet y Feather habilitadas. La memoria usada
+    depende del tamaño del bloque y no del tamaño del archivo; solo se
+    acumulan los errores de validación y, si hay reglas de unicidad, las
+    claves vistas (que pasan a disco cuando son demasiadas).
+
+    Todas las columnas se leen como texto, para que cada bloque tenga los
+    mismos tipos. `procesar_archivo` con el motor pandas infiere los tipos
+    del archivo completo, así que con columnas numéricas las salidas de los
+    dos modos difieren ("1e3" frente a "1000.0").
+
+    Args:
+        config: Configuración de la aplicación
+
+    Returns:
+        Tuple[int, int, TablaErrores]:
+            (total_validos, total_invalidos, errores)
+    """
+    tamano_chunk = int(config.procesamiento["tamano_chunk"])
+    modo = config.procesamiento.get("modo_validacion", "vectorizado")
+    workers = int(config.procesamiento.get("workers") or 1)
+    validador = compilar_validaciones(config.validaciones)
+    config_xml = config.exportacion.get("xml", {})
+    config_json = config.exportacion.get("json", {})
+    config_parquet = config.exportacion.get("parquet", {})
+    compresion = config.exportacion.get("compresion")
+
+    logger.info(
+        f"Procesando archivo por bloques de {tamano_chunk} filas: "
+        f"{config.archivo_entrada}"
+    )
+
+    errores_totales = TablaErrores()
+    with ExitStack() as pila:
+        # (formato, escritor) de cada salida habilitada
+        escritores_validos: List[Tuple[str, Any]] = []
+        escritores_invalidos: List[Tuple[str, Any]] = []
+
+        def agregar(formato: str, validos: Any, invalidos: Any) -> None:
+            escritores_validos.append((formato, pila.enter_context(validos)))
+            escritores_invalidos.append((formato, pila.enter_context(invalidos)))
+
+        agregar(
+            "csv",
+            EscritorCSV(config.archivo_validos, "válidos", compresion),
+            EscritorCSV(config.archivo_invalidos, "inválidos", compresion),
+        )
+        if config_xml.get("habilitada", False):
+            agregar(
+                "xml",
+                EscritorXML(config.archivo_xml_validos, config_xml, compresion),
+                EscritorXML(
+                    config.archivo_xml_invalidos, config_xml, compresion
+                ),
+            )
+        if config_json.get("habilitada", False):
+            agregar(
+                "json",
+                EscritorJSON(
+                    config.archivo_json_validos, config_json, "validos",
+                    compresion,
+                ),
+                EscritorJSON(
+                    config.archivo_json_invalidos, config_json, "invalidos",
+                    compresion,
+                ),
+            )
+        if config_parquet.get("habilitada", False):
+            agregar(
+                "parquet",
+                EscritorParquet(config.archivo_parquet_validos, config_parquet),
+                EscritorParquet(config.archivo_parquet_invalidos, config_parquet),
+            )
+            if config_parquet.get("feather", False):
+                agregar(
+                    "feather",
+                    EscritorFeather(config.archivo_feather_validos, config_parquet),
+                    EscritorFeather(
+                        config.archivo_feather_invalidos, config_parquet
+                    ),
+                )
+
+        # Todas las columnas se leen como texto: inferir tipos por bloque haría
+        # que un mismo valor (p. ej. ".5000") se escribiera distinto según el
+        # bloque en que cae.
+        lector = metricas.medir_iterador(
+            "lectura",
+            leer_csv_por_bloques(
+                config.archivo_entrada,
+                tamano_chunk,
+                config.procesamiento.get("lectura"),
+            ),
+        )
+
+        # La unicidad depende de los bloques anteriores, así que se revisa
+        # aquí, en orden, y no en los workers; los resultados de
+        # validar_bloques llegan en el mismo orden que los bloques
+        detector = pila.enter_context(
+            crear_detector(config.unicidad, por_bloques=True)
+        )
+        duplicados_pendientes = deque()
+
+        def revisar_unicidad(bloques: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+            for bloque in bloques:
+                with metricas.medir("unicidad", len(bloque)):
+                    duplicadas, errores_duplicados = detector.revisar(bloque)
+                duplicados_pendientes.append(
+                    (bloque.index[duplicadas], errores_duplicados)
+                )
+                yield bloque
+
+        if detector:
+            lector = revisar_unicidad(lector)
+
+        incremental = config.procesamiento.get("incremental") or {}
+        if incremental.get("habilitado", False):
+            # Solo se validan las filas que no están en la caché, en este
+            # proceso
+            cache = pila.enter_context(
+                CacheResultados(incremental.get("directorio_cache", DIRECTORIO_CACHE))
+            )
+            resultados = (
+                validar_incremental(bloque, validador, cache) for bloque in lector
+            )
+        else:
+            resultados = iter(validar_bloques(lector, validador, modo, workers))
+        total_validos = total_invalidos = 0
+        while True:
+            # La lectura y la unicidad del bloque ocurren dentro de
+            # validar_bloques; se descuentan para que "validacion" mida solo
+            # la validación
+            previas = metricas.segundos("lectura") + metricas.segundos("unicidad")
+            inicio = time.perf_counter()
+            try:
+                df_validos, df_invalidos, errores = next(resultados)
+            except StopIteration:
+                break
+            metricas.registrar(
+                "validacion",
+                time.perf_counter() - inicio
+                - (metricas.segundos("lectura") + metricas.segundos("unicidad") - previas),
+                len(df_validos) + len(df_invalidos),
+            )
+            if detector:
+                df_validos, df_invalidos, errores = _separar_duplicados(
+                    (df_validos, df_invalidos, errores),
+                    *duplicados_pendientes.popleft(),
+                )
+
+            errores_totales.extender(errores)
+            total_validos += len(df_validos)
+            total_invalidos += len(df_invalidos)
+
+            for formato, escritor in escritores_validos:
+                with metricas.medir(f"exportacion_{formato}", len(df_validos)):
+                    escritor.escribir(df_validos)
+            for formato, escritor in escritores_invalidos:
+                with metricas.medir(f"exportacion_{formato}", len(df_invalidos)):
+                    escritor.escribir(df_invalidos)
+
+            logger.debug(
+                f"Bloque procesado: {total_validos + total_invalidos} filas"
+            )
+
+        if detector:
+            _reportar_duplicados(detector)
+
+    logger.info(
+        f"Procesamiento completado: {total_validos} válidas, "
+        f"{total_invalidos} inválidas"
+    )
+    return total_validos, total_invalidos, errores_totales
@@ -0,0 +1,219 @@
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List
+
+POLITICAS_COLA = ("bloquear", "descartar_debug", "muestrear")
+
+
+class _VaciadoDiferido:
+    """
+    Evita que un handler vacíe su flujo después de cada registro.
+
+    `StreamHandler.emit` llama a `flush()` por cada mensaje; aquí ese
+    `flush()` no hace nada y el oyente llama a `vaciar()` una vez por lote.
+    """
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> None:
+        super().flush()
+
+
+class ManejadorConsola(_VaciadoDiferido, logging.StreamHandler):
+    """`StreamHandler` que se vacía por lotes."""
+
+
+class ManejadorArchivo(_VaciadoDiferido, logging.FileHandler):
+    """`FileHandler` que se vacía por lotes."""
+
+
+class ManejadorColaAcotada(QueueHandler):
+    """
+    Envía los registros a una cola acotada aplicando una política de
+    contrapresión cuando la cola está llena.
+
+    - "bloquear": espera a que haya espacio (no se pierde nada).
+    - "descartar_debug": descarta los registros DEBUG; los demás esperan.
+    - "muestrear": de los registros DEBUG e INFO conserva uno de cada
+      `muestreo`; WARNING y superiores esperan.
+
+    En un proceso hijo creado con fork no existe el hilo del oyente, así que
+    allí los registros se escriben directamente en `destinos`.
+    """
+
+    def __init__(
+        self, cola: "queue.Queue", politica: str = "bloquear", muestreo: int = 10
+    ):
+        """
+        Args:
+            cola: Cola acotada compartida con el oyente
+            politica: Política cuando la cola está llena
+            muestreo: Con "muestrear", se conserva 1 de cada `muestreo`
+
+        Raises:
+            ValueError: Si la política no existe
+        """
+        if politica not in POLITICAS_COLA:
+            raise ValueError(
+                f"Política de cola desconocida: {politica!r} "
+                f"(opciones: {', '.join(POLITICAS_COLA)})"
+            )
+        super().__init__(cola)
+        self.politica = politica
+        self.muestreo = max(int(muestreo), 1)
+        self.descartados = 0
+        self.destinos: List[logging.Handler] = []
+        self._contador_muestreo = 0
+        self._pid = os.getpid()
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if os.getpid() != self._pid:
+            for handler in self.destinos:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+                    getattr(handler, "vaciar", handler.flush)()
+            return
+
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.politica == "descartar_debug" and record.levelno < logging.INFO:
+            self.descartados += 1
+            return
+        if self.politica == "muestrear" and record.levelno < logging.WARNING:
+            self._contador_muestreo += 1
+            if self._contador_muestreo % self.muestreo:
+                self.descartados += 1
+                return
+
+        self.queue.put(record)
+
+
+class OyenteLotes(QueueListener):
+    """
+    `QueueListener` que atiende los registros por lotes.
+
+    Toma hasta `tamano_lote` registros disponibles de la cola, los pasa a los
+    handlers y solo entonces vacía sus flujos, en lugar de hacerlo por cada
+    mensaje.
+    """
+
+    def __init__(
+        self, cola: "queue.Queue", *handlers: logging.Handler, tamano_lote: int = 500
+    ):
+        super().__init__(cola, *handlers, respect_handler_level=True)
+        self.tamano_lote = max(int(tamano_lote), 1)
+
+    def enqueue_sentinel(self) -> None:
+        # La cola es acotada: se espera a que haya sitio para la marca de fin
+        self.queue.put(self._sentinel)
+
+    def _vaciar(self) -> None:
+        for handler in self.handlers:
+            getattr(handler, "vaciar", handler.flush)()
+
+    def _monitor(self) -> None:
+        cola = self.queue
+        terminar = False
+        while not terminar:
+            lote = [self.dequeue(True)]
+            while len(lote) < self.tamano_lote:
+                try:
+                    lote.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+
+            for record in lote:
+                if record is self._sentinel:
+                    terminar = True
+                else:
+                    self.handle(record)
+                cola.task_done()
+            self._vaciar()
+
+
+class RegistroAsincrono:
+    """
+    Canal de logging asíncrono: `ManejadorColaAcotada` -> cola -> `OyenteLotes`.
+
+    Las llamadas de log del programa solo encolan el registro; un hilo de
+    fondo lo formatea y lo escribe en consola y archivo.
+    """
+
+    def __init__(self, handlers: List[logging.Handler], config: Dict[str, Any]):
+        """
+        Args:
+            handlers: Handlers de destino (consola, archivo)
+            config: Sección `logging.cola` de config.yaml
+        """
+        self.cola: "queue.Queue" = queue.Queue(config.get("tamano_maximo", 10_000))
+        self.manejador = ManejadorColaAcotada(
+            self.cola,
+            config.get("politica", "bloquear"),
+            config.get("muestreo", 10),
+        )
+        self.manejador.destinos = handlers
+        self.oyente = OyenteLotes(
+            self.cola, *handlers, tamano_lote=config.get("tamano_lote", 500)
+        )
+        # detener() se llama también desde atexit; así solo actúa una vez
+        self.activo = False
+
+    def iniciar(self) -> None:
+        """Arranca el hilo que escribe los registros."""
+        if self.activo:
+            return
+        self.oyente.start()
+        self.activo = True
+
+    def detener(self) -> None:
+        """Escribe los registros pendientes y detiene el hilo."""
+        if not self.activo:
+            return
+        self.activo = False
+        self.oyente.stop()
+        if self.manejador.descartados:
+            aviso = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"Se descartaron {self.manejador.descartados} registros de log "
+                f"por cola llena (política '{self.manejador.politica}')",
+                None, None,
+            )
+            self.oyente.handle(aviso)
+            self.oyente._vaciar()
+
+
+def crear_registro_asincrono(
+    nivel: str, formato: str, archivo_log: str, config: Dict[str, Any]
+) -> RegistroAsincrono:
+    """
+    Configura el logging raíz para que pase por una cola y un hilo de fondo.
+
+    Args:
+        nivel: Nivel de logging (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+        formato: Formato de los mensajes de log
+        archivo_log: Ruta del archivo de log
+        config: Sección `logging.cola` de config.yaml
+
+    Returns:
+        RegistroAsincrono: Canal ya iniciado; hay que llamar a `detener()` al
+            terminar
+    """
+    formateador = logging.Formatter(formato)
+    handlers = [ManejadorConsola(sys.stdout), ManejadorArchivo(archivo_log)]
+    for handler in handlers:
+        handler.setFormatter(formateador)
+
+    registro = RegistroAsincrono(handlers, config)
+    raiz = logging.getLogger()
+    raiz.setLevel(getattr(logging, nivel))
+    raiz.addHandler(registro.manejador)
+    registro.iniciar()
+    return registro
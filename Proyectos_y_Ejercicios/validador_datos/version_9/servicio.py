@@ -0,0 +1,549 @@
+"""
+Servicio de validación residente, por HTTP en localhost o en un socket Unix.
+
+`python main.py --servicio` carga la configuración y compila las
+validaciones una sola vez. Después atiende peticiones con asyncio:
+
+- POST /validar: el cuerpo puede ser CSV (`Content-Type: text/csv`), JSON
+  o NDJSON (`application/x-ndjson`). El JSON es un arreglo de registros o
+  un objeto con `datos`, como la exportación JSON. Responde con
+  `validos`, `invalidos`, `errores` y las `metricas` de latencia de la
+  petición.
+- GET /salud: estado, versión de la configuración y latencias recientes.
+
+Las conexiones se atienden de forma concurrente en el bucle de eventos. El
+análisis del cuerpo, la validación y la serialización de la respuesta se
+hacen en un único hilo aparte (`ThreadPoolExecutor(max_workers=1)`), para
+no bloquear el bucle. Un solo hilo porque la caché de validaciones no es
+segura entre hilos.
+
+config.yaml y los archivos que leen las reglas (`archivo_permitidas`,
+`archivo_denegadas`) se revisan cada `servicio.intervalo_recarga` segundos.
+Si alguno cambió, la configuración se carga y compila de nuevo en ese mismo
+hilo, entre dos peticiones. Si la nueva configuración tiene errores, se sigue usando la
+anterior. La dirección de escucha solo cambia al reiniciar el servicio.
+"""
+import asyncio
+import dataclasses
+import io
+import json
+import logging
+import os
+import signal
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Configuracion, cargar_configuracion
+from exportador_json import MotorJSON, obtener_motor_json
+from procesador import validar_en_memoria
+from validadores import (
+    TablaErrores,
+    ValidadorCompilado,
+    compilar_validaciones,
+    configurar_cache,
+    sellos_archivos,
+)
+
+logger = logging.getLogger(__name__)
+
+HOST_PREDETERMINADO = "127.0.0.1"
+PUERTO_PREDETERMINADO = 8765
+MAX_CUERPO_MB = 16
+# Cabeceras por petición; cada línea está limitada además por el límite del
+# StreamReader (64 KiB)
+MAX_CABECERAS = 100
+INTERVALO_RECARGA = 1.0
+
+# Latencias que se conservan para los percentiles de /salud
+LATENCIAS_RECIENTES = 1000
+
+TIPOS_CSV = ("text/csv", "application/csv")
+TIPOS_NDJSON = ("application/x-ndjson", "application/ndjson")
+
+
+class ErrorSolicitud(Exception):
+    """Error atribuible a la petición; se responde con su código HTTP."""
+
+    def __init__(self, estado: HTTPStatus, mensaje: str):
+        """
+        Args:
+            estado: Código HTTP de la respuesta
+            mensaje: Descripción del error
+        """
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+@dataclasses.dataclass
+class EstadoServicio:
+    """Configuración en uso; al recargar se reemplaza entera."""
+    config: Configuracion
+    motor: MotorJSON
+    version: int
+    # Validaciones compiladas una vez por carga y usadas en cada petición
+    validador: ValidadorCompilado
+    # Fecha de config.yaml y `sellos_archivos` de sus validaciones
+    sellos: Tuple[int, List[Tuple[str, Any]]]
+
+
+def _texto_json(valor: Any) -> Optional[str]:
+    """Valor JSON como texto, como aparecería en un CSV (null sigue vacío)."""
+    if valor is None or isinstance(valor, str):
+        return valor
+    # 5 -> "5", 2.5 -> "2.5", true -> "true", listas y objetos como JSON
+    return json.dumps(valor, ensure_ascii=False)
+
+
+def leer_carga(cuerpo: bytes, tipo_contenido: str) -> pd.DataFrame:
+    """
+    Convierte el cuerpo de una petición en un DataFrame.
+
+    Todo se lee como texto, igual que en el modo por bloques. Los valores
+    JSON que no son cadenas se convierten a su texto JSON (`5` -> "5",
+    `true` -> "true") y los null quedan vacíos, así que los mismos datos
+    dan el mismo resultado enviados como CSV o como JSON.
+
+    Args:
+        cuerpo: Cuerpo de la petición
+        tipo_contenido: Cabecera Content-Type (vacía se trata como JSON)
+
+    Returns:
+        pd.DataFrame: Registros recibidos
+
+    Raises:
+        ErrorSolicitud: Si el tipo no se admite o el cuerpo no es válido
+    """
+    tipo = tipo_contenido.split(";")[0].strip().lower()
+    try:
+        if tipo in TIPOS_CSV:
+            return pd.read_csv(io.BytesIO(cuerpo), dtype=str)
+        if tipo in TIPOS_NDJSON:
+            registros = [
+                json.loads(linea) for linea in cuerpo.splitlines() if linea.strip()
+            ]
+        elif tipo in ("application/json", ""):
+            datos = json.loads(cuerpo)
+            registros = datos.get("datos") if isinstance(datos, dict) else datos
+        else:
+            raise ErrorSolicitud(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                f"Tipo de contenido no admitido: {tipo!r} (use text/csv, "
+                f"application/json o application/x-ndjson)",
+            )
+    except ValueError as e:
+        # json.JSONDecodeError y los errores de pd.read_csv son ValueError
+        raise ErrorSolicitud(HTTPStatus.BAD_REQUEST, f"Cuerpo inválido: {e}")
+
+    if not isinstance(registros, list) or not all(
+        isinstance(registro, dict) for registro in registros
+    ):
+        raise ErrorSolicitud(
+            HTTPStatus.BAD_REQUEST, "Se esperaba un arreglo de objetos JSON"
+        )
+    return pd.DataFrame.from_records(
+        [
+            {campo: _texto_json(valor) for campo, valor in registro.items()}
+            for registro in registros
+        ]
+    ).astype(str)
+
+
+def _registros(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Filas como diccionarios, con None en los valores vacíos."""
+    if df.empty:
+        return []
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _errores(errores: TablaErrores) -> List[Dict[str, Any]]:
+    """Errores como diccionarios serializables."""
+    return [
+        {
+            "fila": int(error.fila),
+            "campo": error.campo,
+            "valor": (
+                error.valor
+                if error.valor is None or isinstance(error.valor, (str, int))
+                else str(error.valor)
+            ),
+            "mensaje": error.mensaje,
+        }
+        for error in errores
+    ]
+
+
+def _milisegundos(segundos: float) -> float:
+    return round(segundos * 1000, 3)
+
+
+class ServicioValidacion:
+    """
+    Servidor HTTP/1.1 mínimo sobre asyncio.
+
+    Admite conexiones persistentes (keep-alive) y cuerpos con
+    Content-Length; no admite `Transfer-Encoding: chunked`.
+    """
+
+    def __init__(self, archivo_config: str = "config.yaml"):
+        """
+        Args:
+            archivo_config: Ruta de config.yaml (se vigila para recargarla)
+
+        Raises:
+            FileNotFoundError: Si no existe el archivo de configuración
+        """
+        self.archivo_config = archivo_config
+        self.estado = self._cargar(version=1)
+        self.solicitudes = 0
+        self.fallidas = 0
+        self.recargas = 0
+        self._latencias: Deque[float] = deque(maxlen=LATENCIAS_RECIENTES)
+        self._inicio = time.monotonic()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="validacion"
+        )
+
+    @property
+    def config_servicio(self) -> Dict[str, Any]:
+        return self.estado.config.servicio
+
+    def _sellos(self, config: Configuracion) -> Tuple[int, List[Tuple[str, Any]]]:
+        """Fecha de config.yaml y sellos de los archivos de `config`."""
+        return (
+            os.stat(self.archivo_config).st_mtime_ns,
+            sellos_archivos(config.validaciones),
+        )
+
+    def _cargar(self, version: int) -> EstadoServicio:
+        """Carga config.yaml, configura la caché y compila las validaciones."""
+        # Las fechas se leen antes que los archivos: si cambian mientras se
+        # leen, la siguiente revisión los vuelve a cargar
+        modificacion = os.stat(self.archivo_config).st_mtime_ns
+        config = cargar_configuracion(self.archivo_config)
+        sellos = (modificacion, sellos_archivos(config.validaciones))
+        configurar_cache(**config.procesamiento.get("cache", {}))
+        # La clave de compilar_validaciones incluye los mismos sellos: un
+        # archivo de redes modificado produce un validador nuevo
+        validador = compilar_validaciones(config.validaciones)
+        motor = obtener_motor_json(
+            config.exportacion.get("json", {}).get("motor", "stdlib")
+        )
+        return EstadoServicio(config, motor, version, validador, sellos)
+
+    async def _vigilar_configuracion(self) -> None:
+        """Recarga la configuración cuando cambian config.yaml o sus archivos."""
+        bucle = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(
+                float(self.config_servicio.get("intervalo_recarga", INTERVALO_RECARGA))
+            )
+            try:
+                sellos = self._sellos(self.estado.config)
+            except OSError as e:
+                logger.warning(f"No se puede revisar {self.archivo_config}: {e}")
+                continue
+            if sellos == self.estado.sellos:
+                continue
+
+            try:
+                estado = await bucle.run_in_executor(
+                    self._executor, self._cargar, self.estado.version + 1
+                )
+            except Exception as e:
+                logger.error(
+                    f"No se pudo recargar {self.archivo_config}: {e}; "
+                    f"se mantiene la configuración anterior"
+                )
+                # No se reintenta hasta el siguiente cambio de los archivos
+                self.estado = dataclasses.replace(self.estado, sellos=sellos)
+                continue
+            self.estado = estado
+            self.recargas += 1
+            logger.info(
+                f"Configuración recargada (versión {estado.version})"
+            )
+
+    def _validar(
+        self, estado: EstadoServicio, cuerpo: bytes, tipo: str, recibida: float
+    ) -> bytes:
+        """
+        Lee, valida y serializa una petición (en el hilo de validación).
+
+        Raises:
+            ErrorSolicitud: Si el cuerpo no es válido o faltan columnas
+        """
+        inicio = time.perf_counter()
+        df = leer_carga(cuerpo, tipo)
+        leida = time.perf_counter()
+        if df.empty:
+            df_validos, df_invalidos, errores = df, df, TablaErrores()
+        else:
+            try:
+                df_validos, df_invalidos, errores = validar_en_memoria(
+                    df, estado.config, estado.validador
+                )
+            except ValueError as e:
+                raise ErrorSolicitud(HTTPStatus.UNPROCESSABLE_ENTITY, str(e))
+        validada = time.perf_counter()
+
+        # Cada parte se serializa por separado y se arma el objeto de la
+        # respuesta al final, así `metricas` incluye el tiempo de serializar
+        partes = {
+            "validos": estado.motor.dumps(_registros(df_validos), None),
+            "invalidos": estado.motor.dumps(_registros(df_invalidos), None),
+            "errores": estado.motor.dumps(_errores(errores), None),
+        }
+        fin = time.perf_counter()
+        metricas = {
+            "filas": len(df),
+            "filas_validas": len(df_validos),
+            "filas_invalidas": len(df_invalidos),
+            "version_config": estado.version,
+            "espera_ms": _milisegundos(inicio - recibida),
+            "lectura_ms": _milisegundos(leida - inicio),
+            "validacion_ms": _milisegundos(validada - leida),
+            "serializacion_ms": _milisegundos(fin - validada),
+            "total_ms": _milisegundos(fin - recibida),
+        }
+        partes["metricas"] = estado.motor.dumps(metricas, None)
+        miembros = ", ".join(
+            f"{json.dumps(nombre)}: {texto.strip()}" for nombre, texto in partes.items()
+        )
+        return ("{" + miembros + "}").encode("utf-8")
+
+    def _salud(self) -> bytes:
+        """Cuerpo de GET /salud."""
+        latencias = np.array(self._latencias) * 1000
+        percentiles = (
+            dict(zip(("p50", "p95", "p99"), np.percentile(latencias, [50, 95, 99])))
+            if len(latencias) else {}
+        )
+        return self.estado.motor.dumps(
+            {
+                "estado": "ok",
+                "version_config": self.estado.version,
+                "recargas": self.recargas,
+                "solicitudes": self.solicitudes,
+                "fallidas": self.fallidas,
+                "activo_s": round(time.monotonic() - self._inicio, 1),
+                "latencia_ms": {
+                    nombre: round(float(valor), 3)
+                    for nombre, valor in percentiles.items()
+                },
+            },
+            None,
+        ).encode("utf-8")
+
+    async def _despachar(
+        self, metodo: str, ruta: str, cabeceras: Dict[str, str], cuerpo: bytes,
+        recibida: float,
+    ) -> Tuple[HTTPStatus, bytes]:
+        """Atiende una petición y devuelve (código, cuerpo JSON)."""
+        ruta = ruta.split("?")[0]
+        if ruta == "/salud":
+            if metodo != "GET":
+                raise ErrorSolicitud(HTTPStatus.METHOD_NOT_ALLOWED, "Use GET")
+            return HTTPStatus.OK, self._salud()
+        if ruta != "/validar":
+            raise ErrorSolicitud(HTTPStatus.NOT_FOUND, f"Ruta desconocida: {ruta}")
+        if metodo != "POST":
+            raise ErrorSolicitud(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+
+        cuerpo_respuesta = await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            self._validar,
+            self.estado,
+            cuerpo,
+            cabeceras.get("content-type", ""),
+            recibida,
+        )
+        return HTTPStatus.OK, cuerpo_respuesta
+
+    @staticmethod
+    def _respuesta(estado: HTTPStatus, cuerpo: bytes, mantener: bool) -> bytes:
+        cabeceras = (
+            f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n"
+        )
+        return cabeceras.encode("latin-1") + cuerpo
+
+    @staticmethod
+    async def _leer_linea(
+        lector: asyncio.StreamReader, estado: HTTPStatus, mensaje: str
+    ) -> bytes:
+        """
+        Lee una línea de la petición.
+
+        Raises:
+            ErrorSolicitud: Con `estado` si la línea supera el límite del
+                StreamReader
+        """
+        try:
+            return await lector.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # readline convierte LimitOverrunError en ValueError
+            raise ErrorSolicitud(estado, mensaje)
+
+    async def _leer_peticion(
+        self, lector: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        """
+        Lee una petición HTTP completa.
+
+        Returns:
+            Optional[Tuple]: (método, ruta, versión, cabeceras, cuerpo), o
+                None si el cliente cerró la conexión
+
+        Raises:
+            ErrorSolicitud: Si la petición está mal formada o es muy grande
+        """
+        linea = await self._leer_linea(
+            lector, HTTPStatus.REQUEST_URI_TOO_LONG, "Línea de petición demasiado larga"
+        )
+        if not linea:
+            return None
+        partes = linea.decode("latin-1").split()
+        if len(partes) != 3:
+            raise ErrorSolicitud(HTTPStatus.BAD_REQUEST, "Línea de petición inválida")
+        metodo, ruta, version = partes
+
+        cabeceras: Dict[str, str] = {}
+        while True:
+            linea = await self._leer_linea(
+                lector,
+                HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                "Cabecera demasiado larga",
+            )
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            if len(cabeceras) >= MAX_CABECERAS:
+                raise ErrorSolicitud(
+                    HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                    f"Más de {MAX_CABECERAS} cabeceras",
+                )
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+
+        if "transfer-encoding" in cabeceras:
+            raise ErrorSolicitud(
+                HTTPStatus.LENGTH_REQUIRED, "Indique Content-Length (sin chunked)"
+            )
+        try:
+            longitud = int(cabeceras.get("content-length", 0))
+        except ValueError:
+            raise ErrorSolicitud(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if longitud < 0:
+            raise ErrorSolicitud(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        maximo = float(self.config_servicio.get("max_cuerpo_mb", MAX_CUERPO_MB))
+        if longitud > maximo * 1024 ** 2:
+            raise ErrorSolicitud(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"El cuerpo supera {maximo} MB",
+            )
+        cuerpo = await lector.readexactly(longitud) if longitud else b""
+        return metodo.upper(), ruta, version, cabeceras, cuerpo
+
+    async def _atender(
+        self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter
+    ) -> None:
+        """Atiende las peticiones de una conexión hasta que se cierre."""
+        try:
+            while True:
+                mantener = False
+                try:
+                    peticion = await self._leer_peticion(lector)
+                    if peticion is None:
+                        break
+                    metodo, ruta, version, cabeceras, cuerpo = peticion
+                    conexion = cabeceras.get("connection", "").lower()
+                    mantener = (
+                        conexion == "keep-alive"
+                        or (version == "HTTP/1.1" and conexion != "close")
+                    )
+                    recibida = time.perf_counter()
+                    self.solicitudes += 1
+                    estado, cuerpo_respuesta = await self._despachar(
+                        metodo, ruta, cabeceras, cuerpo, recibida
+                    )
+                    if ruta.startswith("/validar"):
+                        self._latencias.append(time.perf_counter() - recibida)
+                except ErrorSolicitud as e:
+                    self.fallidas += 1
+                    estado = e.estado
+                    cuerpo_respuesta = json.dumps(
+                        {"error": str(e)}, ensure_ascii=False
+                    ).encode("utf-8")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    logger.error(f"Error al atender la petición: {e}", exc_info=True)
+                    self.fallidas += 1
+                    estado = HTTPStatus.INTERNAL_SERVER_ERROR
+                    cuerpo_respuesta = json.dumps({"error": str(e)}).encode("utf-8")
+                    mantener = False
+
+                escritor.write(self._respuesta(estado, cuerpo_respuesta, mantener))
+                await escritor.drain()
+                if not mantener:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self) -> None:
+        """Escucha en el socket Unix o en host:puerto hasta que se cancele."""
+        socket_unix = self.config_servicio.get("socket_unix")
+        if socket_unix:
+            # Un socket que quedó de una ejecución anterior impide escuchar
+            if os.path.exists(socket_unix) and stat.S_ISSOCK(os.stat(socket_unix).st_mode):
+                os.remove(socket_unix)
+            servidor = await asyncio.start_unix_server(self._atender, path=socket_unix)
+            direccion = f"unix:{socket_unix}"
+        else:
+            host = self.config_servicio.get("host", HOST_PREDETERMINADO)
+            puerto = int(self.config_servicio.get("puerto", PUERTO_PREDETERMINADO))
+            servidor = await asyncio.start_server(self._atender, host, puerto)
+            direccion = f"http://{host}:{puerto}"
+
+        # SIGTERM (systemd, docker stop) detiene el servicio como Ctrl+C.
+        # Las señales solo se pueden atender desde el hilo principal; si el
+        # servicio corre en otro hilo, lo detiene quien lo arrancó
+        if threading.current_thread() is threading.main_thread():
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, asyncio.current_task().cancel
+            )
+        vigilante = asyncio.create_task(self._vigilar_configuracion())
+        logger.info(f"Servicio de validación escuchando en {direccion}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            vigilante.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            if socket_unix and os.path.exists(socket_unix):
+                os.remove(socket_unix)
+
+
+def ejecutar_servicio(archivo_config: str = "config.yaml") -> None:
+    """
+    Arranca el servicio y lo mantiene hasta Ctrl+C o SIGTERM.
+
+    Args:
+        archivo_config: Ruta de config.yaml
+    """
+    servicio = ServicioValidacion(archivo_config)
+    try:
+        asyncio.run(servicio.servir())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.info("Servicio de validación detenido")
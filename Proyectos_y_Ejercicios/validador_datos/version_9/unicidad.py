@@ -0,0 +1,428 @@
+"""
+Reglas de unicidad: filas con un valor (o combinación de valores) repetido.
+
+A diferencia de las reglas de `validadores.py`, que miran cada valor por
+separado, estas necesitan recordar todas las claves vistas. Cada fila se
+reduce a un hash de 64 bits de sus columnas clave
+(`pd.util.hash_pandas_object`) y se guarda la primera fila en que apareció
+cada hash:
+
+- en memoria, en un diccionario, mientras haya menos de
+  `max_claves_memoria` claves;
+- después, en una tabla SQLite temporal en disco indexada por el hash.
+
+En el modo por bloques puede anteponerse un filtro de Bloom: las claves
+que el filtro no ha visto nunca son nuevas con seguridad y se guardan sin
+consultar el almacén, que solo se consulta para los posibles repetidos.
+
+La primera aparición de cada clave es válida; las siguientes se marcan
+como duplicadas y su error indica la fila de la primera. Las filas con
+algún valor vacío en la clave no se comparan (como NULL en SQL). Dos claves
+distintas con el mismo hash se tomarían por duplicadas; con 64 bits la
+probabilidad es de 1 en 3.700 para cien millones de claves distintas.
+"""
+import logging
+import math
+import os
+import sqlite3
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from validadores import TablaErrores
+
+logger = logging.getLogger(__name__)
+
+MAX_CLAVES_MEMORIA = 5_000_000
+
+
+class FiltroBloom:
+    """
+    Filtro de Bloom sobre hashes de 64 bits.
+
+    Responde "seguro que no está" o "puede que esté"; la tasa de falsos
+    positivos se mantiene cerca de `tasa_falsos_positivos` mientras no se
+    agreguen más de `capacidad` claves. Las `k` posiciones de cada clave se
+    derivan del propio hash (h1 + i * h2), sin volver a calcularlo.
+    """
+
+    def __init__(self, capacidad: int, tasa_falsos_positivos: float = 0.01):
+        """
+        Args:
+            capacidad: Número de claves previsto
+            tasa_falsos_positivos: Probabilidad de falso positivo (0 a 1)
+
+        Raises:
+            ValueError: Si algún parámetro está fuera de rango
+        """
+        if capacidad < 1:
+            raise ValueError(f"La capacidad debe ser positiva: {capacidad}")
+        if not 0 < tasa_falsos_positivos < 1:
+            raise ValueError(
+                f"La tasa de falsos positivos debe estar entre 0 y 1: "
+                f"{tasa_falsos_positivos}"
+            )
+        bits = math.ceil(
+            -capacidad * math.log(tasa_falsos_positivos) / math.log(2) ** 2
+        )
+        self.bits = np.uint64(max(bits, 64))
+        self.funciones = max(1, round(int(self.bits) / capacidad * math.log(2)))
+        self._arreglo = np.zeros((int(self.bits) + 7) // 8, dtype=np.uint8)
+
+    def _posiciones(self, hashes: np.ndarray) -> np.ndarray:
+        h1 = hashes & np.uint64(0xFFFFFFFF)
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        incrementos = np.arange(self.funciones, dtype=np.uint64)
+        return (h1[:, None] + incrementos[None, :] * h2[:, None]) % self.bits
+
+    def comprobar_y_agregar(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Consulta y agrega claves (distintas entre sí) en una sola pasada.
+
+        Args:
+            hashes: Hashes `uint64` sin repetidos
+
+        Returns:
+            np.ndarray: Máscara de claves que quizá ya estaban; las demás
+                eran nuevas con seguridad
+        """
+        posiciones = self._posiciones(hashes)
+        bytes_ = (posiciones >> np.uint64(3)).astype(np.int64)
+        bits = np.left_shift(1, (posiciones & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+        posibles = ((self._arreglo[bytes_] & bits) != 0).all(axis=1)
+        np.bitwise_or.at(self._arreglo, bytes_.ravel(), bits.ravel())
+        return posibles
+
+
+class _ClavesEnMemoria:
+    """Primera fila de cada hash en un diccionario."""
+
+    def __init__(self):
+        self._primeras: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._primeras)
+
+    def registrar(self, hashes: np.ndarray, filas: np.ndarray) -> np.ndarray:
+        primeras = map(self._primeras.setdefault, hashes.tolist(), filas.tolist())
+        return np.fromiter(primeras, dtype=np.int64, count=len(hashes))
+
+    def agregar(self, hashes: np.ndarray, filas: np.ndarray) -> None:
+        self._primeras.update(zip(hashes.tolist(), filas.tolist()))
+
+    def elementos(self):
+        return self._primeras.items()
+
+    def cerrar(self) -> None:
+        self._primeras.clear()
+
+
+class _ClavesEnDisco:
+    """
+    Primera fila de cada hash en una tabla SQLite temporal.
+
+    El hash es la clave primaria de la tabla (un B-tree en disco), así que
+    cada bloque se resuelve con una inserción y una consulta en lote.
+    """
+
+    def __init__(self, directorio: Optional[str] = None):
+        descriptor, self.archivo = tempfile.mkstemp(
+            prefix="unicidad_", suffix=".sqlite", dir=directorio
+        )
+        os.close(descriptor)
+        self._conexion = sqlite3.connect(self.archivo)
+        self._conexion.executescript(
+            """
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            PRAGMA cache_size = -65536;
+            CREATE TABLE claves (hash INTEGER PRIMARY KEY, fila INTEGER NOT NULL);
+            CREATE TEMP TABLE bloque (posicion INTEGER PRIMARY KEY, hash INTEGER);
+            """
+        )
+        self._total = 0
+
+    def __len__(self) -> int:
+        return self._total
+
+    def registrar(self, hashes: np.ndarray, filas: np.ndarray) -> np.ndarray:
+        claves = hashes.view(np.int64).tolist()
+        with self._conexion:
+            self._conexion.execute("DELETE FROM bloque")
+            self._conexion.executemany(
+                "INSERT INTO bloque VALUES (?, ?)", enumerate(claves)
+            )
+            cursor = self._conexion.executemany(
+                "INSERT OR IGNORE INTO claves VALUES (?, ?)",
+                zip(claves, filas.tolist()),
+            )
+            self._total += max(cursor.rowcount, 0)
+            primeras = self._conexion.execute(
+                "SELECT claves.fila FROM bloque JOIN claves USING (hash) "
+                "ORDER BY bloque.posicion"
+            ).fetchall()
+        return np.array([fila for fila, in primeras], dtype=np.int64)
+
+    def agregar(self, hashes: np.ndarray, filas: np.ndarray) -> None:
+        with self._conexion:
+            cursor = self._conexion.executemany(
+                "INSERT OR IGNORE INTO claves VALUES (?, ?)",
+                zip(hashes.view(np.int64).tolist(), filas.tolist()),
+            )
+            self._total += max(cursor.rowcount, 0)
+
+    def cerrar(self) -> None:
+        self._conexion.close()
+        try:
+            os.remove(self.archivo)
+        except OSError:
+            pass
+
+
+class ReglaUnicidad:
+    """
+    Una clave (una o varias columnas) que no puede repetirse.
+
+    Guarda las claves vistas entre llamadas, así que los bloques deben
+    revisarse en el orden del archivo.
+    """
+
+    def __init__(
+        self,
+        columnas: Sequence[str],
+        mensaje: Optional[str] = None,
+        max_claves_memoria: int = MAX_CLAVES_MEMORIA,
+        directorio_temporal: Optional[str] = None,
+        filtro_bloom: Optional[FiltroBloom] = None,
+    ):
+        """
+        Args:
+            columnas: Columnas que forman la clave
+            mensaje: Mensaje de error (por defecto, según el número de columnas)
+            max_claves_memoria: Claves en memoria antes de pasar a disco
+            directorio_temporal: Directorio de la tabla en disco
+            filtro_bloom: Filtro previo opcional
+
+        Raises:
+            ValueError: Si no se indica ninguna columna
+        """
+        if not columnas:
+            raise ValueError("La regla de unicidad necesita 'columnas'")
+        self.columnas = list(columnas)
+        self.campo = ",".join(self.columnas)
+        self.mensaje = mensaje or (
+            "Valor duplicado" if len(self.columnas) == 1 else "Combinación duplicada"
+        )
+        self.max_claves_memoria = max_claves_memoria
+        self.directorio_temporal = directorio_temporal
+        self.filtro_bloom = filtro_bloom
+        self.duplicados = 0
+        self._almacen: Any = _ClavesEnMemoria()
+
+    def __repr__(self) -> str:
+        return f"ReglaUnicidad(columnas={self.columnas!r})"
+
+    @property
+    def en_disco(self) -> bool:
+        return isinstance(self._almacen, _ClavesEnDisco)
+
+    def _pasar_a_disco(self) -> None:
+        logger.info(
+            f"Unicidad de '{self.campo}': {len(self._almacen)} claves, "
+            f"se pasan a disco"
+        )
+        disco = _ClavesEnDisco(self.directorio_temporal)
+        elementos = self._almacen.elementos()
+        claves = np.fromiter((clave for clave, _ in elementos), dtype=np.uint64)
+        filas = np.fromiter((fila for _, fila in elementos), dtype=np.int64)
+        disco.agregar(claves, filas)
+        self._almacen.cerrar()
+        self._almacen = disco
+
+    def revisar(self, df: pd.DataFrame) -> Tuple[np.ndarray, TablaErrores]:
+        """
+        Busca filas cuya clave ya apareció, en este bloque o en anteriores.
+
+        Args:
+            df: Bloque a revisar; su índice da el número de fila (base 0)
+
+        Returns:
+            Tuple[np.ndarray, TablaErrores]: (máscara de filas duplicadas,
+                errores con la fila de la primera aparición)
+        """
+        duplicadas = np.zeros(len(df), dtype=bool)
+        errores = TablaErrores()
+        claves = df[self.columnas]
+        completas = claves.notna().all(axis=1).to_numpy()
+        if not completas.any():
+            return duplicadas, errores
+
+        posiciones = np.flatnonzero(completas)
+        # Sin categorize: con claves casi todas distintas, factorizar antes
+        # de calcular el hash cuesta más de lo que ahorra
+        hashes = pd.util.hash_pandas_object(
+            claves.iloc[posiciones], index=False, categorize=False
+        ).to_numpy(dtype=np.uint64)
+        filas = np.asarray(df.index[posiciones], dtype=np.int64) + 1
+
+        # Primera fila de cada clave dentro del bloque y luego en el almacén
+        codigos, unicos = pd.factorize(hashes)
+        unicos = np.asarray(unicos, dtype=np.uint64)
+        primeras_bloque = np.full(len(unicos), np.iinfo(np.int64).max)
+        np.minimum.at(primeras_bloque, codigos, filas)
+
+        if self.filtro_bloom is not None:
+            primeras = primeras_bloque.copy()
+            posibles = self.filtro_bloom.comprobar_y_agregar(unicos)
+            self._almacen.agregar(unicos[~posibles], primeras_bloque[~posibles])
+            if posibles.any():
+                primeras[posibles] = self._almacen.registrar(
+                    unicos[posibles], primeras_bloque[posibles]
+                )
+        else:
+            primeras = self._almacen.registrar(unicos, primeras_bloque)
+
+        primera_por_fila = primeras[codigos]
+        repetidas = primera_por_fila != filas
+        if repetidas.any():
+            duplicadas[posiciones[repetidas]] = True
+            self.duplicados += int(repetidas.sum())
+            valores = claves.iloc[posiciones[repetidas]].astype(str)
+            texto = valores.iloc[:, 0]
+            for columna in valores.columns[1:]:
+                texto = texto + ", " + valores[columna]
+            # La fila de la primera aparición va en el valor y no en el
+            # mensaje para que el catálogo de mensajes no crezca
+            errores.agregar_bloque(
+                filas[repetidas],
+                self.campo,
+                [
+                    f"{valor} (primera aparición: fila {primera})"
+                    for valor, primera in zip(texto.tolist(), primera_por_fila[repetidas].tolist())
+                ],
+                self.mensaje,
+            )
+
+        if not self.en_disco and len(self._almacen) > self.max_claves_memoria:
+            self._pasar_a_disco()
+        return duplicadas, errores
+
+    def cerrar(self) -> None:
+        """Libera las claves guardadas (y borra la tabla en disco, si la hay)."""
+        self._almacen.cerrar()
+
+
+class DetectorDuplicados:
+    """
+    Aplica todas las reglas de unicidad a los bloques de un archivo.
+
+    Se usa como gestor de contexto para que la tabla temporal en disco se
+    borre al terminar.
+    """
+
+    def __init__(self, reglas: Sequence[ReglaUnicidad]):
+        """
+        Args:
+            reglas: Reglas de unicidad habilitadas
+        """
+        self.reglas = list(reglas)
+
+    def __bool__(self) -> bool:
+        return bool(self.reglas)
+
+    def __enter__(self) -> "DetectorDuplicados":
+        return self
+
+    def __exit__(self, *excepcion) -> None:
+        self.cerrar()
+
+    def revisar(self, df: pd.DataFrame) -> Tuple[np.ndarray, TablaErrores]:
+        """
+        Revisa un bloque con todas las reglas.
+
+        Args:
+            df: Bloque a revisar, en el orden del archivo
+
+        Returns:
+            Tuple[np.ndarray, TablaErrores]: (máscara de filas duplicadas en
+                alguna regla, errores de todas las reglas)
+
+        Raises:
+            ValueError: Si falta alguna columna de una clave
+        """
+        faltantes = [
+            columna for regla in self.reglas for columna in regla.columnas
+            if columna not in df.columns
+        ]
+        if faltantes:
+            raise ValueError(
+                f"Faltan columnas con reglas de unicidad: {', '.join(faltantes)}"
+            )
+
+        duplicadas = np.zeros(len(df), dtype=bool)
+        errores = TablaErrores()
+        for regla in self.reglas:
+            duplicadas_regla, errores_regla = regla.revisar(df)
+            duplicadas |= duplicadas_regla
+            errores.extender(errores_regla)
+        return duplicadas, errores
+
+    def resumen(self) -> List[Dict[str, Any]]:
+        """
+        Duplicados encontrados por regla.
+
+        Returns:
+            List[Dict[str, Any]]: `campo`, `duplicados` y `en_disco` por regla
+        """
+        return [
+            {"campo": regla.campo, "duplicados": regla.duplicados, "en_disco": regla.en_disco}
+            for regla in self.reglas
+        ]
+
+    def cerrar(self) -> None:
+        """Libera los almacenes de todas las reglas."""
+        for regla in self.reglas:
+            regla.cerrar()
+
+
+def crear_detector(config: Dict[str, Any], por_bloques: bool = False) -> DetectorDuplicados:
+    """
+    Crea el detector a partir de la sección `unicidad` de config.yaml.
+
+    Args:
+        config: Sección `unicidad` (`habilitada`, `reglas`,
+            `max_claves_memoria`, `directorio_temporal`, `bloom`)
+        por_bloques: Si el archivo se procesa por bloques; el filtro de
+            Bloom solo se usa en ese modo
+
+    Returns:
+        DetectorDuplicados: Detector sin reglas si la sección está
+            deshabilitada o vacía
+
+    Raises:
+        ValueError: Si una regla no indica sus columnas
+    """
+    if not config or not config.get("habilitada", True):
+        return DetectorDuplicados([])
+
+    config_bloom = config.get("bloom") or {}
+    usar_bloom = por_bloques and config_bloom.get("habilitado", False)
+    reglas = []
+    for config_regla in config.get("reglas") or []:
+        if not config_regla.get("habilitada", True):
+            continue
+        reglas.append(
+            ReglaUnicidad(
+                config_regla.get("columnas") or [],
+                config_regla.get("mensaje_error"),
+                int(config.get("max_claves_memoria", MAX_CLAVES_MEMORIA)),
+                config.get("directorio_temporal"),
+                FiltroBloom(
+                    int(config_bloom.get("capacidad", 10_000_000)),
+                    float(config_bloom.get("tasa_falsos_positivos", 0.01)),
+                ) if usar_bloom else None,
+            )
+        )
+    return DetectorDuplicados(reglas)
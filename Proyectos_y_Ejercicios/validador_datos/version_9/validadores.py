@@ -1,24 +1,643 @@
+import csv
+import hashlib
 import ipaddress
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Tuple
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+import pandas as pd
+
+from compresion import abrir_salida, ruta_sin_compresion
+
+# Equivalente a lo que acepta ipaddress.IPv4Address con una cadena: cuatro
+# octetos decimales de 0 a 255, solo dígitos ASCII y sin ceros a la izquierda.
+_OCTETO = r"(?:25[0-5]|2[0-4][0-9]|1[0-9]{2}|[1-9][0-9]|[0-9])"
+PATRON_IPV4 = re.compile(rf"{_OCTETO}(?:\.{_OCTETO}){{3}}")
+MAXIMO_IPV4 = 0xFFFFFFFF
+
+
+def ipv4_a_entero(valor: Any) -> Optional[int]:
+    """
+    Convierte una dirección IPv4 a entero sin lanzar excepciones.
+
+    Acepta exactamente lo mismo que `ipaddress.IPv4Address`: enteros de 0 a
+    2**32 - 1 (también `bool`), `bytes` de longitud 4, objetos
+    `IPv4Address` y, para cualquier otro valor, su `str()` en notación
+    decimal con puntos (`PATRON_IPV4`). Es mucho más rápida que construir
+    el objeto y capturar `AddressValueError` cuando abundan los inválidos.
+
+    Args:
+        valor: Valor a convertir
+
+    Returns:
+        Optional[int]: La dirección como entero, o None si no es válida
+    """
+    if isinstance(valor, str):
+        if PATRON_IPV4.fullmatch(valor) is None:
+            return None
+        a, b, c, d = valor.split(".")
+        return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+    if isinstance(valor, int):
+        return valor if 0 <= valor <= MAXIMO_IPV4 else None
+    if isinstance(valor, bytes):
+        return int.from_bytes(valor, "big") if len(valor) == 4 else None
+    if isinstance(valor, ipaddress.IPv4Address):
+        return int(valor)
+    try:
+        texto = str(valor)
+    except Exception:
+        return None
+    return ipv4_a_entero(texto)
+
+
+def es_ipv4(valor: Any) -> bool:
+    """
+    Indica si un valor es una dirección IPv4 válida (ver `ipv4_a_entero`).
+
+    Args:
+        valor: Valor a validar
+
+    Returns:
+        bool: True si `ipaddress.IPv4Address(valor)` lo aceptaría
+    """
+    if isinstance(valor, str):
+        return PATRON_IPV4.fullmatch(valor) is not None
+    return ipv4_a_entero(valor) is not None
+
+
+def ipv4_a_uint32(valores: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convierte una columna de direcciones IPv4 a `uint32` en bloque.
+
+    Args:
+        valores: Columna con las direcciones
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (direcciones como uint32, máscara de
+            válidas); en las posiciones inválidas la dirección es 0
+    """
+    direcciones = np.zeros(len(valores), dtype=np.uint32)
+    if not pd.api.types.is_string_dtype(valores):
+        # Valores no textuales: misma semántica que ipaddress, valor a valor
+        enteros = [ipv4_a_entero(valor) for valor in valores]
+        validas = np.fromiter(
+            (entero is not None for entero in enteros), dtype=bool, count=len(enteros)
+        )
+        direcciones[validas] = [entero for entero in enteros if entero is not None]
+        return direcciones, validas
+
+    validas = valores.str.fullmatch(PATRON_IPV4.pattern, na=False).to_numpy(dtype=bool)
+    if validas.any():
+        direcciones[validas] = _textos_ipv4_a_uint32(valores[validas])
+    return direcciones, validas
+
+
+def _textos_ipv4_a_uint32(textos: pd.Series) -> np.ndarray:
+    """
+    Convierte direcciones ya validadas con `PATRON_IPV4` a `uint32`.
+
+    Son ASCII de hasta 15 caracteres, así que se tratan como una matriz de
+    bytes y se recorren columna a columna: cada dígito se acumula en el
+    octeto actual y cada punto lo incorpora a la dirección. Es unas diez
+    veces más rápido que `str.split(".", expand=True)`.
+    """
+    matriz = (
+        textos.to_numpy(dtype=object).astype("S15").view(np.uint8).reshape(-1, 15)
+    )
+    direcciones = np.zeros(len(matriz), dtype=np.uint32)
+    octeto = np.zeros(len(matriz), dtype=np.uint32)
+    for columna in matriz.T:
+        caracter = columna.astype(np.uint32)
+        punto = caracter == ord(".")
+        digito = (caracter >= ord("0")) & (caracter <= ord("9"))
+        direcciones = np.where(punto, (direcciones << 8) | octeto, direcciones)
+        octeto = np.where(
+            punto, 0, np.where(digito, octeto * 10 + caracter - ord("0"), octeto)
+        )
+    return (direcciones << 8) | octeto
+
+
+class CacheValidacion:
+    """
+    Caché LRU acotada con los resultados de validación ya calculados.
+
+    Las claves son `(regla, tipo, valor, huella_de_configuración)` (ver
+    `clave_cache`): si cambia la configuración de una regla (por ejemplo
+    `extension`), cambia la huella y los resultados anteriores dejan de
+    usarse; el LRU los desaloja después.
+    """
+
+    def __init__(self, tamano_maximo: int = 100_000, habilitada: bool = True):
+        """
+        Args:
+            tamano_maximo: Número máximo de resultados guardados
+            habilitada: Si es False, la caché no guarda ni devuelve nada
+        """
+        self.tamano_maximo = tamano_maximo
+        self.habilitada = habilitada
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self._datos: "OrderedDict[Hashable, Tuple[bool, str]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+    def obtener(self, clave: Hashable) -> Optional[Tuple[bool, str]]:
+        """
+        Busca un resultado y lo marca como usado recientemente.
+
+        Args:
+            clave: Clave de `clave_cache`
+
+        Returns:
+            Optional[Tuple[bool, str]]: El resultado guardado o None
+        """
+        if not self.habilitada:
+            return None
+        resultado = self._datos.get(clave)
+        if resultado is None:
+            self.fallos += 1
+            return None
+        self._datos.move_to_end(clave)
+        self.aciertos += 1
+        return resultado
+
+    def guardar(self, clave: Hashable, resultado: Tuple[bool, str]) -> None:
+        """
+        Guarda un resultado, desalojando el menos usado si la caché está llena.
+
+        Args:
+            clave: Clave de `clave_cache`
+            resultado: (es_válida, mensaje_error)
+        """
+        if not self.habilitada or self.tamano_maximo <= 0:
+            return
+        self._datos[clave] = resultado
+        self._datos.move_to_end(clave)
+        while len(self._datos) > self.tamano_maximo:
+            self._datos.popitem(last=False)
+            self.desalojos += 1
+
+    def configurar(self, tamano_maximo: int = 100_000, habilitada: bool = True) -> None:
+        """
+        Cambia el tamaño y el estado de la caché, desalojando lo que sobre.
+
+        Args:
+            tamano_maximo: Número máximo de resultados guardados
+            habilitada: Si la caché se usa
+        """
+        self.tamano_maximo = tamano_maximo
+        self.habilitada = habilitada
+        if not habilitada:
+            self._datos.clear()
+        while len(self._datos) > max(tamano_maximo, 0):
+            self._datos.popitem(last=False)
+            self.desalojos += 1
+
+    def limpiar(self) -> None:
+        """Vacía la caché y reinicia las estadísticas."""
+        self._datos.clear()
+        self.aciertos = self.fallos = self.desalojos = 0
+
+    def registrar(self, aciertos: int, fallos: int, desalojos: int = 0) -> None:
+        """
+        Suma estadísticas de otra caché (por ejemplo, la de un worker).
+
+        Args:
+            aciertos: Aciertos a sumar
+            fallos: Fallos a sumar
+            desalojos: Desalojos a sumar
+        """
+        self.aciertos += aciertos
+        self.fallos += fallos
+        self.desalojos += desalojos
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """
+        Resume el uso de la caché.
+
+        Returns:
+            Dict[str, Any]: Aciertos, fallos, desalojos, tamaño y tasa de aciertos
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tamano": len(self._datos),
+            "tamano_maximo": self.tamano_maximo,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+        }
+
+
+# Caché compartida por las validaciones por fila y por columnas
+cache_validaciones = CacheValidacion()
+
+
+def configurar_cache(tamano_maximo: int = 100_000, habilitada: bool = True) -> None:
+    """
+    Configura la caché de validaciones del proceso actual.
+
+    Args:
+        tamano_maximo: Número máximo de resultados guardados
+        habilitada: Si la caché se usa
+    """
+    cache_validaciones.configurar(tamano_maximo, habilitada)
+
+
+def huella_configuracion(config: dict) -> Hashable:
+    """
+    Calcula una huella de la configuración de una regla.
+
+    Args:
+        config: Configuración de validación
+
+    Returns:
+        Hashable: Valor que cambia cuando cambia cualquier parámetro
+    """
+    try:
+        huella = tuple(sorted(config.items()))
+        hash(huella)
+        return huella
+    except TypeError:
+        # Parámetros no hashables (listas, diccionarios anidados)
+        return json.dumps(config, sort_keys=True, default=str)
+
+
+def clave_cache(regla: str, valor: Any, huella: Hashable) -> Optional[Hashable]:
+    """
+    Clave de la caché para un valor, o None si el valor no se guarda.
+
+    El tipo forma parte de la clave: `5`, `5.0` y `True` son la misma clave
+    de diccionario, pero no validan igual. Los nulos (None, NaN, pd.NA) no
+    se guardan: NaN no es igual a sí mismo, nunca acertaría y solo ocuparía
+    sitio en el LRU.
+
+    Args:
+        regla: Nombre de la regla ("ip", "ruta_script", ...)
+        valor: Valor validado
+        huella: Huella de la configuración de la regla
+
+    Returns:
+        Optional[Hashable]: Clave, o None para valores nulos
+    """
+    if (
+        valor is None
+        or valor is pd.NA
+        or valor is pd.NaT
+        or (isinstance(valor, float) and valor != valor)
+    ):
+        return None
+    return (regla, type(valor), valor, huella)
+
+
+def factorizar(valores: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Codifica una columna como (códigos, valores únicos).
+
+    Args:
+        valores: Columna a codificar
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Códigos por fila y valores únicos
+            (como objetos), de modo que `unicos[codigos]` reconstruye la
+            columna
+    """
+    codigos, unicos = pd.factorize(valores, use_na_sentinel=False)
+    return codigos, np.asarray(unicos, dtype=object)
+
+
+def _mascara_con_cache(
+    valores: pd.Series,
+    regla: str,
+    huella: Hashable,
+    mensaje: str,
+    calcular: Callable[[pd.Series], pd.Series],
+    factorizacion: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> pd.Series:
+    """
+    Calcula una máscara de validez consultando la caché por valor único.
+
+    Solo los valores únicos que no están en la caché se validan (de forma
+    vectorizada con `calcular`); el resultado se expande a toda la columna
+    con los códigos de `pd.factorize`.
+
+    Args:
+        valores: Columna a validar
+        regla: Nombre de la regla ("ip", "ruta_script", ...)
+        huella: Huella de la configuración de la regla
+        mensaje: Mensaje de error de la regla
+        calcular: Validación vectorizada sin caché
+        factorizacion: (códigos, únicos) de `factorizar`, si ya se
+            calcularon para otra regla de la misma columna
+
+    Returns:
+        pd.Series: Máscara de válidos con el índice de `valores`
+    """
+    if not cache_validaciones.habilitada:
+        return calcular(valores)
+
+    codigos, unicos = factorizacion or factorizar(valores)
+    # Los valores repetidos dentro de la columna se resuelven sin validar
+    cache_validaciones.registrar(aciertos=len(valores) - len(unicos), fallos=0)
+    validos = np.empty(len(unicos), dtype=bool)
+    pendientes = []
+    claves = [clave_cache(regla, valor, huella) for valor in unicos]
+    for posicion, clave in enumerate(claves):
+        resultado = None if clave is None else cache_validaciones.obtener(clave)
+        if resultado is None:
+            pendientes.append(posicion)
+        else:
+            validos[posicion] = resultado[0]
+
+    if pendientes:
+        calculados = calcular(pd.Series(unicos[pendientes], dtype=valores.dtype))
+        for posicion, es_valido in zip(pendientes, calculados):
+            validos[posicion] = es_valido
+            if claves[posicion] is not None:
+                cache_validaciones.guardar(
+                    claves[posicion],
+                    (bool(es_valido), "" if es_valido else mensaje),
+                )
+
+    return pd.Series(validos[codigos], index=valores.index)
 
 
 @dataclass
 class ErrorValidacion:
     """Representa un error de validación."""
+    __slots__ = ("fila", "campo", "valor", "mensaje")
     fila: int
     campo: str
     valor: str
     mensaje: str
 
 
-def validar_ip(ip: str, config: dict) -> Tuple[bool, str]:
+class TablaErrores:
+    """
+    Almacén compacto y columnar de errores de validación.
+
+    En lugar de un objeto por error guarda tres columnas: el número de fila
+    (`array` de enteros), el identificador de la regla (`array` de enteros que
+    indexa un catálogo de pares `(campo, mensaje)`) y el valor rechazado. Se
+    recorre como una secuencia de `ErrorValidacion`, ordenada por fila, y
+    puede convertirse a DataFrame o escribirse directamente en CSV o JSON.
+    """
+
+    COLUMNAS = ("fila", "campo", "valor", "mensaje")
+
+    def __init__(self, errores: Iterable[ErrorValidacion] = ()):
+        """
+        Args:
+            errores: Errores iniciales (opcional)
+        """
+        self._filas = array("q")
+        self._reglas = array("i")
+        self._valores: List[Any] = []
+        self._catalogo: List[Tuple[str, str]] = []
+        self._ids_reglas: Dict[Tuple[str, str], int] = {}
+        self._ordenada = True
+        for error in errores:
+            self.agregar(error.fila, error.campo, error.valor, error.mensaje)
+
+    def __len__(self) -> int:
+        return len(self._filas)
+
+    def __bool__(self) -> bool:
+        return len(self._filas) > 0
+
+    def __iter__(self) -> Iterator[ErrorValidacion]:
+        self._ordenar()
+        catalogo = self._catalogo
+        for fila, regla, valor in zip(self._filas, self._reglas, self._valores):
+            campo, mensaje = catalogo[regla]
+            yield ErrorValidacion(fila=fila, campo=campo, valor=valor, mensaje=mensaje)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        self._ordenar()
+        return self.__dict__
+
+    def _id_regla(self, campo: str, mensaje: str) -> int:
+        """Devuelve (y registra si hace falta) el id de una regla."""
+        clave = (campo, mensaje)
+        id_regla = self._ids_reglas.get(clave)
+        if id_regla is None:
+            id_regla = len(self._catalogo)
+            self._catalogo.append(clave)
+            self._ids_reglas[clave] = id_regla
+        return id_regla
+
+    def _ordenar(self) -> None:
+        """Ordena los errores por fila (orden estable) si hace falta."""
+        if self._ordenada:
+            return
+        filas = np.frombuffer(self._filas, dtype=np.int64)
+        orden = np.argsort(filas, kind="stable")
+        self._filas = array("q", filas[orden].tobytes())
+        self._reglas = array(
+            "i", np.frombuffer(self._reglas, dtype=np.int32)[orden].tobytes()
+        )
+        self._valores = [self._valores[i] for i in orden]
+        self._ordenada = True
+
+    def agregar(self, fila: int, campo: str, valor: Any, mensaje: str) -> None:
+        """
+        Agrega un error.
+
+        Args:
+            fila: Número de fila (base 1)
+            campo: Campo que falló
+            valor: Valor rechazado
+            mensaje: Mensaje de error
+        """
+        if self._filas and fila < self._filas[-1]:
+            self._ordenada = False
+        self._filas.append(fila)
+        self._reglas.append(self._id_regla(campo, mensaje))
+        self._valores.append(valor)
+
+    def agregar_bloque(
+        self, filas: Sequence[int], campo: str, valores: Sequence[Any], mensaje: str
+    ) -> None:
+        """
+        Agrega de una vez los errores de una misma regla.
+
+        Args:
+            filas: Números de fila (base 1), en orden creciente
+            campo: Campo que falló
+            valores: Valores rechazados, alineados con `filas`
+            mensaje: Mensaje de error
+        """
+        if len(filas) == 0:
+            return
+        if self._filas and filas[0] < self._filas[-1]:
+            self._ordenada = False
+        self._filas.frombytes(np.asarray(filas, dtype=np.int64).tobytes())
+        self._reglas.extend([self._id_regla(campo, mensaje)] * len(filas))
+        self._valores.extend(valores)
+
+    def extender(self, errores: Iterable[ErrorValidacion]) -> None:
+        """
+        Agrega todos los errores de otra tabla o de una lista.
+
+        Args:
+            errores: `TablaErrores` o iterable de `ErrorValidacion`
+        """
+        if not isinstance(errores, TablaErrores):
+            for error in errores:
+                self.agregar(error.fila, error.campo, error.valor, error.mensaje)
+            return
+
+        errores._ordenar()
+        if not errores:
+            return
+        if self._filas and errores._filas[0] < self._filas[-1]:
+            self._ordenada = False
+        traduccion = [self._id_regla(*regla) for regla in errores._catalogo]
+        self._filas.extend(errores._filas)
+        self._reglas.extend(traduccion[regla] for regla in errores._reglas)
+        self._valores.extend(errores._valores)
+
+    def _columnas(self) -> Iterator[Tuple[int, str, Any, str]]:
+        """Recorre los errores como tuplas (fila, campo, valor, mensaje)."""
+        self._ordenar()
+        catalogo = self._catalogo
+        for fila, regla, valor in zip(self._filas, self._reglas, self._valores):
+            campo, mensaje = catalogo[regla]
+            yield fila, campo, valor, mensaje
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Convierte los errores a un DataFrame.
+
+        Returns:
+            pd.DataFrame: Columnas fila, campo, valor y mensaje
+        """
+        self._ordenar()
+        reglas = np.frombuffer(self._reglas, dtype=np.int32)
+        campos = np.array([c for c, _ in self._catalogo] or [""], dtype=object)
+        mensajes = np.array([m for _, m in self._catalogo] or [""], dtype=object)
+        return pd.DataFrame({
+            "fila": np.frombuffer(self._filas, dtype=np.int64).copy(),
+            "campo": campos[reglas],
+            "valor": pd.Series(self._valores, dtype=object),
+            "mensaje": mensajes[reglas],
+        })
+
+    def resumen(self, muestras: int = 3) -> List[Dict[str, Any]]:
+        """
+        Agrupa los errores por campo y mensaje.
+
+        Args:
+            muestras: Número máximo de filas de ejemplo por grupo
+
+        Returns:
+            List[Dict[str, Any]]: Un diccionario por grupo con `campo`,
+                `mensaje`, `total` y `ejemplos` (lista de (fila, valor)),
+                ordenados de mayor a menor número de errores
+        """
+        self._ordenar()
+        reglas = np.frombuffer(self._reglas, dtype=np.int32)
+        totales = np.bincount(reglas, minlength=len(self._catalogo))
+        grupos = []
+        for id_regla, (campo, mensaje) in enumerate(self._catalogo):
+            if not totales[id_regla]:
+                continue
+            posiciones = np.flatnonzero(reglas == id_regla)[:max(muestras, 0)]
+            grupos.append({
+                "campo": campo,
+                "mensaje": mensaje,
+                "total": int(totales[id_regla]),
+                "ejemplos": [
+                    (self._filas[i], self._valores[i]) for i in posiciones
+                ],
+            })
+        grupos.sort(key=lambda grupo: grupo["total"], reverse=True)
+        return grupos
+
+    def exportar(
+        self, archivo_salida: str, compresion: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Escribe los errores en CSV o JSON según la extensión del archivo.
+
+        Args:
+            archivo_salida: Ruta del archivo (".json" para JSON; cualquier
+                otra extensión, CSV; con .gz, .bz2, .xz o .zst al final se
+                comprime)
+            compresion: Nivel e hilos de compresión (`exportacion.compresion`)
+        """
+        if ruta_sin_compresion(archivo_salida).lower().endswith(".json"):
+            self.exportar_json(archivo_salida, compresion)
+        else:
+            self.exportar_csv(archivo_salida, compresion)
+
+    def exportar_csv(
+        self, archivo_salida: str, compresion: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Escribe los errores en un CSV sin pasar por un DataFrame.
+
+        Args:
+            archivo_salida: Ruta del archivo de salida
+            compresion: Nivel e hilos de compresión (`exportacion.compresion`)
+        """
+        with abrir_salida(archivo_salida, compresion, newline="") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(self.COLUMNAS)
+            escritor.writerows(self._columnas())
+
+    def exportar_json(
+        self, archivo_salida: str, compresion: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Escribe los errores como un arreglo JSON, un objeto por línea.
+
+        Args:
+            archivo_salida: Ruta del archivo de salida
+            compresion: Nivel e hilos de compresión (`exportacion.compresion`)
+        """
+        with abrir_salida(archivo_salida, compresion) as archivo:
+            archivo.write("[")
+            for posicion, fila in enumerate(self._columnas()):
+                registro = json.dumps(
+                    dict(zip(self.COLUMNAS, fila)), ensure_ascii=False, default=str
+                )
+                archivo.write(("," if posicion else "") + "\n" + registro)
+            archivo.write("\n]\n")
+
+
+def validar_ip(
+    ip: str, config: dict, huella: Optional[Hashable] = None
+) -> Tuple[bool, str]:
     """
     Valida una dirección IP.
 
     Args:
         ip: Dirección IP a validar
         config: Configuración de validación
+        huella: `huella_configuracion(config)`, si ya se calculó (al validar
+            muchos valores con la misma configuración)
 
     Returns:
         Tuple[bool, str]: (es_válida, mensaje_error)
@@ -26,20 +645,33 @@ def validar_ip(ip: str, config: dict) -> Tuple[bool, str]:
     if not config.get('habilitada', True):
         return True, ""
 
-    try:
-        ipaddress.IPv4Address(ip)
-        return True, ""
-    except ipaddress.AddressValueError:
-        return False, config.get('mensaje_error', 'IP inválida')
+    if huella is None:
+        huella = huella_configuracion(config)
+    clave = clave_cache("ip", ip, huella)
+    resultado = None if clave is None else cache_validaciones.obtener(clave)
+    if resultado is not None:
+        return resultado
+
+    if es_ipv4(ip):
+        resultado = True, ""
+    else:
+        resultado = False, config.get('mensaje_error', 'IP inválida')
+
+    if clave is not None:
+        cache_validaciones.guardar(clave, resultado)
+    return resultado
 
 
-def validar_ruta_script(ruta: str, config: dict) -> Tuple[bool, str]:
+def validar_ruta_script(
+    ruta: str, config: dict, huella: Optional[Hashable] = None
+) -> Tuple[bool, str]:
     """
     Valida que la ruta termine con la extensión correcta.
 
     Args:
         ruta: Ruta a validar
         config: Configuración de validación
+        huella: `huella_configuracion(config)`, si ya se calculó
 
     Returns:
         Tuple[bool, str]: (es_válida, mensaje_error)
@@ -47,10 +679,1073 @@ def validar_ruta_script(ruta: str, config: dict) -> Tuple[bool, str]:
     if not config.get('habilitada', True):
         return True, ""
 
+    if huella is None:
+        huella = huella_configuracion(config)
+    clave = clave_cache("ruta_script", ruta, huella)
+    resultado = None if clave is None else cache_validaciones.obtener(clave)
+    if resultado is not None:
+        return resultado
+
     extension = config.get('extension', '.sh')
     if not ruta.endswith(extension):
-        return False, config.get(
+        resultado = False, config.get(
             'mensaje_error', f'Debe terminar en {extension}'
         )
+    else:
+        resultado = True, ""
+
+    if clave is not None:
+        cache_validaciones.guardar(clave, resultado)
+    return resultado
+
+
+def validar_ip_vectorizado(
+    ips: pd.Series, config: dict
+) -> Tuple[pd.Series, str]:
+    """
+    Valida una columna completa de direcciones IP.
+
+    Versión vectorizada de `validar_ip`: aplica la expresión regular
+    `PATRON_IPV4` sobre toda la columna en lugar de construir un
+    `IPv4Address` por valor.
+
+    Args:
+        ips: Columna con las direcciones IP
+        config: Configuración de validación
+
+    Returns:
+        Tuple[pd.Series, str]: (máscara_de_válidos, mensaje_error)
+    """
+    mensaje = config.get('mensaje_error', 'IP inválida')
+    if not config.get('habilitada', True):
+        return pd.Series(True, index=ips.index), mensaje
+
+    huella = huella_configuracion(config)
+    if pd.api.types.is_numeric_dtype(ips):
+        # Columnas no textuales: se conserva la semántica de ipaddress
+        mascara = ips.map(lambda ip: validar_ip(ip, config, huella)[0])
+        return mascara.astype(bool), mensaje
+
+    def calcular(valores: pd.Series) -> pd.Series:
+        return valores.str.fullmatch(PATRON_IPV4.pattern, na=False).astype(bool)
+
+    return _mascara_con_cache(ips, "ip", huella, mensaje, calcular), mensaje
+
+
+def validar_ruta_script_vectorizado(
+    rutas: pd.Series, config: dict
+) -> Tuple[pd.Series, str]:
+    """
+    Valida que todas las rutas de una columna terminen con la extensión.
+
+    Args:
+        rutas: Columna con las rutas a validar
+        config: Configuración de validación
+
+    Returns:
+        Tuple[pd.Series, str]: (máscara_de_válidos, mensaje_error)
+    """
+    extension = config.get('extension', '.sh')
+    mensaje = config.get('mensaje_error', f'Debe terminar en {extension}')
+    if not config.get('habilitada', True):
+        return pd.Series(True, index=rutas.index), mensaje
+
+    def calcular(valores: pd.Series) -> pd.Series:
+        return valores.str.endswith(extension, na=False).astype(bool)
+
+    return (
+        _mascara_con_cache(
+            rutas, "ruta_script", huella_configuracion(config), mensaje, calcular
+        ),
+        mensaje,
+    )
+
+
+class Regla(ABC):
+    """
+    Regla de validación compilada para una columna.
+
+    Los parámetros, el mensaje y la huella de la configuración se leen una
+    sola vez al compilar; `es_valido` y `calcular_mascara` trabajan solo con
+    atributos. Cada tipo de regla es una subclase que define `tipo`,
+    `es_valido` (un valor) y `calcular_mascara` (una columna completa), y se
+    registra con `registrar_tipo_regla`.
+    """
+
+    tipo = ""
+    mensaje_predeterminado = "Valor inválido"
+
+    def __init__(self, campo: str, config: dict):
+        """
+        Args:
+            campo: Columna a la que se aplica la regla
+            config: Configuración de la regla en config.yaml
+        """
+        self.campo = campo
+        self.mensaje = config.get("mensaje_error", self.mensaje_predeterminado)
+        self.huella = huella_configuracion(config)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(campo={self.campo!r})"
+
+    @abstractmethod
+    def es_valido(self, valor: Any) -> bool:
+        """Valida un valor sin consultar la caché."""
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        """Valida una columna sin consultar la caché."""
+        return valores.map(self.es_valido).astype(bool)
+
+    def validar(self, valor: Any) -> bool:
+        """
+        Valida un valor consultando la caché de validaciones.
+
+        Args:
+            valor: Valor a validar
+
+        Returns:
+            bool: True si el valor es válido
+        """
+        clave = clave_cache(self.tipo, valor, self.huella)
+        resultado = None if clave is None else cache_validaciones.obtener(clave)
+        if resultado is None:
+            valido = bool(self.es_valido(valor))
+            resultado = (valido, "" if valido else self.mensaje)
+            if clave is not None:
+                cache_validaciones.guardar(clave, resultado)
+        return resultado[0]
+
+    def mascara(
+        self,
+        valores: pd.Series,
+        factorizacion: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> pd.Series:
+        """
+        Valida una columna completa consultando la caché por valor único.
+
+        Args:
+            valores: Columna a validar
+            factorizacion: Resultado de `factorizar(valores)`, si ya se tiene
+
+        Returns:
+            pd.Series: Máscara de válidos con el índice de `valores`
+        """
+        return _mascara_con_cache(
+            valores,
+            self.tipo,
+            self.huella,
+            self.mensaje,
+            self.calcular_mascara,
+            factorizacion,
+        )
+
+
+# Tipo de regla ("ip", "puerto", ...) -> clase
+TIPOS_REGLA: Dict[str, type] = {}
+
+# Claves de config.yaml anteriores al campo `tipo`: columna -> tipo de regla
+REGLAS_LEGADAS = {"ip": "ip", "ruta_script": "extension"}
+
+
+def registrar_tipo_regla(clase: type) -> type:
+    """
+    Registra una subclase de `Regla` con su atributo `tipo`.
+
+    Se usa como decorador; después, config.yaml puede usar ese tipo:
+
+        @registrar_tipo_regla
+        class ReglaMac(Regla):
+            tipo = "mac"
+            ...
+
+    Args:
+        clase: Subclase de `Regla`
+
+    Returns:
+        type: La misma clase
+    """
+    TIPOS_REGLA[clase.tipo] = clase
+    return clase
+
+
+def _es_texto(valores: pd.Series) -> bool:
+    return pd.api.types.is_string_dtype(valores)
+
+
+@registrar_tipo_regla
+class ReglaIP(Regla):
+    """Dirección IPv4 válida."""
+
+    tipo = "ip"
+    mensaje_predeterminado = "IP inválida"
+
+    def es_valido(self, valor: Any) -> bool:
+        return es_ipv4(valor)
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        return valores.str.fullmatch(PATRON_IPV4.pattern, na=False).astype(bool)
+
+    def mascara(
+        self,
+        valores: pd.Series,
+        factorizacion: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> pd.Series:
+        if pd.api.types.is_numeric_dtype(valores):
+            # Columnas no textuales: se conserva la semántica de ipaddress
+            return valores.map(self.validar).astype(bool)
+        return super().mascara(valores, factorizacion)
+
+
+@registrar_tipo_regla
+class ReglaExtension(Regla):
+    """
+    Ruta que termina con una extensión.
+
+    Parámetros: `extension` (por defecto ".sh").
+    """
+
+    tipo = "extension"
+
+    def __init__(self, campo: str, config: dict):
+        self.extension = config.get("extension", ".sh")
+        self.mensaje_predeterminado = f"Debe terminar en {self.extension}"
+        super().__init__(campo, config)
+
+    def es_valido(self, valor: Any) -> bool:
+        return isinstance(valor, str) and valor.endswith(self.extension)
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        return valores.str.endswith(self.extension, na=False).astype(bool)
+
+
+PATRON_NUMERO = re.compile(r"[+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?")
+
+
+@registrar_tipo_regla
+class ReglaRango(Regla):
+    """
+    Número dentro de un rango.
+
+    Parámetros: `minimo` y `maximo` (opcionales, incluidos) y `entero`
+    (por defecto False). Acepta números o texto con formato numérico
+    (`PATRON_NUMERO`); NaN y texto vacío no son válidos.
+    """
+
+    tipo = "rango"
+    patron = PATRON_NUMERO
+
+    def __init__(self, campo: str, config: dict):
+        self.minimo = config.get("minimo")
+        self.maximo = config.get("maximo")
+        self.entero = config.get("entero", False)
+        self.mensaje_predeterminado = (
+            f"Debe ser un número entre {self.minimo} y {self.maximo}"
+        )
+        super().__init__(campo, config)
+
+    def _numero(self, valor: Any) -> Optional[float]:
+        if isinstance(valor, bool):
+            return None
+        if isinstance(valor, (int, float, np.number)):
+            return float(valor)
+        if isinstance(valor, str) and self.patron.fullmatch(valor):
+            return float(valor)
+        return None
+
+    def es_valido(self, valor: Any) -> bool:
+        numero = self._numero(valor)
+        if numero is None or numero != numero:
+            return False
+        if self.entero and not numero.is_integer():
+            return False
+        if self.minimo is not None and numero < self.minimo:
+            return False
+        if self.maximo is not None and numero > self.maximo:
+            return False
+        return True
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        if pd.api.types.is_bool_dtype(valores):
+            return pd.Series(False, index=valores.index)
+        if pd.api.types.is_numeric_dtype(valores):
+            numeros = valores.astype(float)
+        elif _es_texto(valores):
+            formato = valores.str.fullmatch(self.patron.pattern, na=False)
+            numeros = pd.to_numeric(
+                valores.where(formato.astype(bool)), errors="coerce"
+            ).astype(float)
+        else:
+            return super().calcular_mascara(valores)
+
+        mascara = numeros.notna()
+        if self.entero:
+            mascara &= numeros % 1 == 0
+        if self.minimo is not None:
+            mascara &= numeros >= self.minimo
+        if self.maximo is not None:
+            mascara &= numeros <= self.maximo
+        return mascara.astype(bool)
+
+
+@registrar_tipo_regla
+class ReglaPuerto(ReglaRango):
+    """
+    Puerto TCP/UDP: entero entre `minimo` (1) y `maximo` (65535).
+
+    En texto solo se aceptan dígitos ("8080", no "+8080" ni "8e3").
+    """
+
+    tipo = "puerto"
+    patron = re.compile(r"[0-9]+")
+
+    def __init__(self, campo: str, config: dict):
+        super().__init__(
+            campo, {"minimo": 1, "maximo": 65535, **config, "entero": True}
+        )
+        if "mensaje_error" not in config:
+            self.mensaje = "Puerto inválido"
+
+
+@registrar_tipo_regla
+class ReglaEnum(Regla):
+    """
+    Valor dentro de una lista cerrada.
+
+    Parámetros: `valores` (obligatorio) y `sensible_mayusculas` (por
+    defecto True).
+    """
+
+    tipo = "enum"
+
+    def __init__(self, campo: str, config: dict):
+        if not config.get("valores"):
+            raise ValueError(
+                f"La regla 'enum' de '{campo}' necesita una lista 'valores'"
+            )
+        self.sensible_mayusculas = config.get("sensible_mayusculas", True)
+        valores = config["valores"]
+        if not self.sensible_mayusculas:
+            valores = [str(valor).lower() for valor in valores]
+        self.valores = frozenset(valores)
+        self.mensaje_predeterminado = (
+            f"Debe ser uno de: {', '.join(map(str, config['valores']))}"
+        )
+        super().__init__(campo, config)
+
+    def es_valido(self, valor: Any) -> bool:
+        if self.sensible_mayusculas:
+            return valor in self.valores
+        return isinstance(valor, str) and valor.lower() in self.valores
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        if self.sensible_mayusculas:
+            return valores.isin(self.valores).astype(bool)
+        if not _es_texto(valores):
+            return super().calcular_mascara(valores)
+        return valores.str.lower().isin(self.valores).fillna(False).astype(bool)
+
+
+# Nombre de host según RFC 1123: etiquetas de 1 a 63 caracteres
+# alfanuméricos o guiones, sin guion al inicio ni al final, 253 en total
+PATRON_HOSTNAME = re.compile(
+    r"(?=.{1,253}$)(?!-)[A-Za-z0-9-]{1,63}(?<!-)"
+    r"(?:\.(?!-)[A-Za-z0-9-]{1,63}(?<!-))*"
+)
+
+
+@registrar_tipo_regla
+class ReglaHostname(Regla):
+    """
+    Nombre de host válido (RFC 1123).
+
+    Parámetros: `sufijo` (opcional), dominio al que debe pertenecer, sin
+    distinguir mayúsculas: con "pythoncdmx.org" se aceptan
+    "pythoncdmx.org" y "curso.pythoncdmx.org", pero no "otropythoncdmx.org".
+    """
+
+    tipo = "hostname"
+    mensaje_predeterminado = "Nombre de host inválido"
+
+    def __init__(self, campo: str, config: dict):
+        self.sufijo = (config.get("sufijo") or "").lower().lstrip(".")
+        super().__init__(campo, config)
+
+    def es_valido(self, valor: Any) -> bool:
+        if not isinstance(valor, str) or PATRON_HOSTNAME.fullmatch(valor) is None:
+            return False
+        if not self.sufijo:
+            return True
+        valor = valor.lower()
+        return valor == self.sufijo or valor.endswith("." + self.sufijo)
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        if not _es_texto(valores):
+            return super().calcular_mascara(valores)
+        mascara = valores.str.fullmatch(PATRON_HOSTNAME.pattern, na=False)
+        if self.sufijo:
+            minusculas = valores.str.lower()
+            pertenece = minusculas.str.endswith("." + self.sufijo, na=False)
+            mascara &= pertenece | minusculas.eq(self.sufijo).fillna(False)
+        return mascara.astype(bool)
+
+
+PATRON_CIDR = re.compile(rf"({PATRON_IPV4.pattern})/(3[0-2]|[12][0-9]|[0-9])")
+
+
+@registrar_tipo_regla
+class ReglaCIDR(Regla):
+    """
+    Red IPv4 en notación CIDR ("10.0.0.0/8").
+
+    Parámetros: `estricto` (por defecto True), que además exige que los
+    bits de host sean cero, como `ipaddress.IPv4Network(..., strict=True)`.
+    """
+
+    tipo = "cidr"
+    mensaje_predeterminado = "Red CIDR inválida"
+
+    def __init__(self, campo: str, config: dict):
+        self.estricto = config.get("estricto", True)
+        super().__init__(campo, config)
+
+    def es_valido(self, valor: Any) -> bool:
+        if not isinstance(valor, str):
+            return False
+        coincidencia = PATRON_CIDR.fullmatch(valor)
+        if coincidencia is None:
+            return False
+        if not self.estricto:
+            return True
+        direccion = ipv4_a_entero(coincidencia.group(1))
+        prefijo = int(coincidencia.group(2))
+        return direccion & (0xFFFFFFFF >> prefijo) == 0
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        if not _es_texto(valores):
+            return super().calcular_mascara(valores)
+        mascara = valores.str.fullmatch(PATRON_CIDR.pattern, na=False).astype(bool)
+        if not self.estricto or not mascara.any():
+            return mascara
+
+        partes = valores[mascara].str.split("/", n=1, expand=True)
+        direcciones, _ = ipv4_a_uint32(partes[0])
+        prefijos = partes[1].astype(np.uint32).to_numpy()
+        # Con prefijo 32 el desplazamiento deja 0 bits de host
+        bits_host = (np.uint64(MAXIMO_IPV4) >> prefijos.astype(np.uint64)).astype(np.uint32)
+        mascara[mascara] = (direcciones & bits_host) == 0
+        return mascara
+
+
+def rango_red(texto: str) -> Tuple[int, int]:
+    """
+    Convierte una red a su rango de direcciones (inicio y fin incluidos).
+
+    Args:
+        texto: Red CIDR ("10.0.0.0/8"; los bits de host se ignoran), dirección
+            suelta ("10.0.0.1") o rango ("10.0.0.1-10.0.0.9")
+
+    Returns:
+        Tuple[int, int]: Primera y última dirección como enteros
+
+    Raises:
+        ValueError: Si el texto no es una red, dirección o rango IPv4
+    """
+    texto = texto.strip()
+    if "-" in texto:
+        inicio, fin = (ipv4_a_entero(parte.strip()) for parte in texto.split("-", 1))
+        if inicio is None or fin is None or inicio > fin:
+            raise ValueError(f"Rango IPv4 inválido: {texto!r}")
+        return inicio, fin
+    coincidencia = PATRON_CIDR.fullmatch(texto)
+    if coincidencia is not None:
+        bits_host = MAXIMO_IPV4 >> int(coincidencia.group(2))
+        inicio = ipv4_a_entero(coincidencia.group(1)) & ~bits_host
+        return inicio, inicio | bits_host
+    direccion = ipv4_a_entero(texto)
+    if direccion is not None:
+        return direccion, direccion
+    try:
+        # Otras notaciones de ipaddress, como "10.0.0.0/255.0.0.0"
+        red = ipaddress.IPv4Network(texto, strict=False)
+    except ValueError as e:
+        raise ValueError(f"Red IPv4 inválida: {texto!r}") from e
+    return int(red.network_address), int(red.broadcast_address)
+
+
+def leer_redes(archivo: str) -> List[str]:
+    """
+    Lee una lista de redes, una por línea.
+
+    Las líneas vacías y lo que sigue a "#" se ignoran.
+
+    Args:
+        archivo: Ruta del archivo
+
+    Returns:
+        List[str]: Redes en el orden del archivo
+    """
+    redes = []
+    with open(archivo, encoding="utf-8") as entrada:
+        for linea in entrada:
+            linea = linea.split("#", 1)[0].strip()
+            if linea:
+                redes.append(linea)
+    return redes
+
+
+class IndiceRedes:
+    """
+    Conjunto de redes IPv4 con búsqueda de pertenencia en O(log n).
+
+    Las redes se convierten a rangos `[inicio, fin]`, se ordenan y se
+    fusionan las que se solapan o son contiguas, así que los rangos quedan
+    disjuntos y ordenados en dos arreglos `uint32`. Una dirección pertenece
+    al conjunto si el último rango que empieza antes de ella (búsqueda
+    binaria) termina después.
+    """
+
+    def __init__(self, redes: Iterable[str] = ()):
+        """
+        Args:
+            redes: Redes en cualquier formato aceptado por `rango_red`
+        """
+        inicios: List[int] = []
+        fines: List[int] = []
+        for inicio, fin in sorted(rango_red(red) for red in redes):
+            if fines and inicio <= fines[-1] + 1:
+                fines[-1] = max(fines[-1], fin)
+            else:
+                inicios.append(inicio)
+                fines.append(fin)
+        self._inicios = inicios
+        self._fines = fines
+        self.inicios = np.array(inicios, dtype=np.uint32)
+        self.fines = np.array(fines, dtype=np.uint32)
+
+    def __len__(self) -> int:
+        return len(self._inicios)
+
+    def __repr__(self) -> str:
+        return f"IndiceRedes({len(self)} rangos)"
+
+    def huella(self) -> str:
+        """Resumen del contenido, igual para conjuntos de redes equivalentes."""
+        resumen = hashlib.blake2b(digest_size=16)
+        resumen.update(self.inicios.tobytes())
+        resumen.update(self.fines.tobytes())
+        return resumen.hexdigest()
+
+    def contiene(self, direccion: int) -> bool:
+        """
+        Indica si una dirección pertenece a alguna red.
+
+        Args:
+            direccion: Dirección IPv4 como entero
+
+        Returns:
+            bool: True si está dentro de algún rango
+        """
+        posicion = bisect_right(self._inicios, direccion) - 1
+        return posicion >= 0 and direccion <= self._fines[posicion]
+
+    def contiene_arreglo(self, direcciones: np.ndarray) -> np.ndarray:
+        """
+        Versión vectorizada de `contiene` con `np.searchsorted`.
+
+        Args:
+            direcciones: Direcciones como `uint32`
+
+        Returns:
+            np.ndarray: Máscara booleana, True si la dirección pertenece
+        """
+        if not len(self):
+            return np.zeros(len(direcciones), dtype=bool)
+        posiciones = np.searchsorted(self.inicios, direcciones, side="right") - 1
+        fines = self.fines[np.maximum(posiciones, 0)]
+        return (posiciones >= 0) & (direcciones <= fines)
+
+
+@registrar_tipo_regla
+class ReglaRedIP(Regla):
+    """
+    Dirección IPv4 dentro de las redes permitidas y fuera de las denegadas.
+
+    Parámetros:
+        - `permitidas` y `archivo_permitidas`: redes aceptadas (lista en
+          config.yaml y archivo con una red por línea; se usan ambas). Sin
+          ninguna, se acepta cualquier dirección que no esté denegada
+        - `denegadas` y `archivo_denegadas`: redes rechazadas, con
+          prioridad sobre las permitidas
+
+    Las redes pueden ser CIDR, direcciones sueltas o rangos
+    "inicio-fin" (ver `rango_red`). Se cargan una sola vez al compilar la
+    regla en un `IndiceRedes`. Los valores que no son IPv4 no son válidos.
+    """
+
+    tipo = "red_ip"
+    mensaje_predeterminado = "IP no permitida"
+
+    def __init__(self, campo: str, config: dict):
+        self.permitidas = self._cargar_indice(campo, config, "permitidas")
+        self.denegadas = self._cargar_indice(campo, config, "denegadas")
+        self.restringir = bool(
+            config.get("permitidas") or config.get("archivo_permitidas")
+        )
+        super().__init__(campo, config)
+        # La huella depende de las redes cargadas y no de la configuración,
+        # así un cambio en los archivos invalida la caché y las listas largas
+        # no alargan cada clave
+        self.huella = (
+            self.restringir,
+            self.permitidas.huella(),
+            self.denegadas.huella(),
+            self.mensaje,
+        )
+
+    @staticmethod
+    def _cargar_indice(campo: str, config: dict, nombre: str) -> IndiceRedes:
+        redes = list(config.get(nombre) or [])
+        archivo = config.get(f"archivo_{nombre}")
+        if archivo:
+            redes.extend(leer_redes(archivo))
+        try:
+            return IndiceRedes(redes)
+        except ValueError as e:
+            raise ValueError(f"Redes '{nombre}' de '{campo}': {e}") from e
+
+    def es_valido(self, valor: Any) -> bool:
+        direccion = ipv4_a_entero(valor)
+        if direccion is None or self.denegadas.contiene(direccion):
+            return False
+        return not self.restringir or self.permitidas.contiene(direccion)
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        direcciones, validas = ipv4_a_uint32(valores)
+        mascara = validas & ~self.denegadas.contiene_arreglo(direcciones)
+        if self.restringir:
+            mascara &= self.permitidas.contiene_arreglo(direcciones)
+        return pd.Series(mascara, index=valores.index)
+
+
+MODOS_REGEX = ("coincidir", "prohibir")
+
+# Referencias a grupos: un patrón con ellas no puede unirse a otros en una
+# alternancia porque los números de grupo cambiarían
+_REFERENCIA_GRUPO = re.compile(r"\\[1-9]|\(\?P=")
+
+
+@lru_cache(maxsize=None)
+def compilar_patron(patron: str) -> "re.Pattern":
+    """
+    Compila una expresión regular una sola vez por proceso.
+
+    Args:
+        patron: Expresión regular
+
+    Returns:
+        re.Pattern: Patrón compilado
+
+    Raises:
+        ValueError: Si la expresión no es válida
+    """
+    try:
+        return re.compile(patron)
+    except re.error as e:
+        raise ValueError(f"Expresión regular inválida {patron!r}: {e}") from e
+
+
+def combinar_patrones(patrones: Sequence[str]) -> Optional[str]:
+    """
+    Une varios patrones en una sola alternancia `(?:p1)|(?:p2)|...`.
+
+    Así la columna se recorre una vez en lugar de una vez por patrón.
+
+    Args:
+        patrones: Expresiones regulares
+
+    Returns:
+        Optional[str]: Patrón combinado, o None si algún patrón usa
+            referencias a grupos o flags globales que impiden combinarlos
+    """
+    if len(patrones) == 1:
+        return patrones[0]
+    if any(_REFERENCIA_GRUPO.search(patron) for patron in patrones):
+        return None
+    combinado = "|".join(f"(?:{patron})" for patron in patrones)
+    try:
+        compilar_patron(combinado)
+    except ValueError:
+        return None
+    return combinado
+
+
+@registrar_tipo_regla
+class ReglaRegex(Regla):
+    """
+    Valor que coincide (o no) con una o varias expresiones regulares.
+
+    Parámetros:
+        - `patron` o `patrones`: una expresión o una lista
+        - `modo`: "coincidir" (por defecto) exige que algún patrón coincida
+          desde el inicio del valor (`re.match`); "prohibir" rechaza el
+          valor si algún patrón aparece en cualquier posición (`re.search`)
+        - `completo`: con "coincidir", el patrón debe cubrir todo el valor
+          (`re.fullmatch`)
+        - `ignorar_mayusculas`: por defecto False
+
+    Los patrones se compilan una vez; si son varios se combinan en una sola
+    alternancia siempre que sea posible.
+    """
+
+    tipo = "regex"
+
+    def __init__(self, campo: str, config: dict):
+        patrones = config.get("patrones") or [config.get("patron")]
+        if not all(isinstance(patron, str) and patron for patron in patrones):
+            raise ValueError(
+                f"La regla 'regex' de '{campo}' necesita 'patron' o 'patrones'"
+            )
+        self.modo = config.get("modo", "coincidir")
+        if self.modo not in MODOS_REGEX:
+            raise ValueError(
+                f"Modo de regex desconocido en '{campo}': {self.modo!r} "
+                f"(opciones: {', '.join(MODOS_REGEX)})"
+            )
+        self.completo = config.get("completo", False) and self.modo == "coincidir"
+        if config.get("ignorar_mayusculas", False):
+            patrones = [f"(?i:{patron})" for patron in patrones]
+
+        self.patrones = tuple(patrones)
+        combinado = combinar_patrones(self.patrones)
+        self._textos = (combinado,) if combinado is not None else self.patrones
+        self._compilados = tuple(compilar_patron(texto) for texto in self._textos)
+        self.mensaje_predeterminado = (
+            "Contiene un patrón no permitido" if self.modo == "prohibir"
+            else "No coincide con el patrón esperado"
+        )
+        super().__init__(campo, config)
+
+    def es_valido(self, valor: Any) -> bool:
+        if not isinstance(valor, str):
+            return False
+        if self.modo == "prohibir":
+            return not any(patron.search(valor) for patron in self._compilados)
+        if self.completo:
+            return any(patron.fullmatch(valor) for patron in self._compilados)
+        return any(patron.match(valor) for patron in self._compilados)
+
+    def calcular_mascara(self, valores: pd.Series) -> pd.Series:
+        if not _es_texto(valores):
+            return super().calcular_mascara(valores)
+
+        texto = valores.str
+        if self.modo == "prohibir":
+            encontrado = pd.Series(False, index=valores.index)
+            for patron in self._textos:
+                encontrado |= texto.contains(patron, regex=True, na=True).astype(bool)
+            return ~encontrado
+
+        coincidir = texto.fullmatch if self.completo else texto.match
+        mascara = pd.Series(False, index=valores.index)
+        for patron in self._textos:
+            mascara |= coincidir(patron, na=False).astype(bool)
+        return mascara
+
+
+class ValidadorCompilado:
+    """
+    Conjunto de reglas listo para validar filas o columnas.
+
+    Se obtiene con `compilar_validaciones`; las reglas deshabilitadas ya no
+    forman parte de él. Solo contiene datos simples, así que puede enviarse
+    a procesos worker.
+    """
+
+    def __init__(self, reglas: Sequence[Regla]):
+        """
+        Args:
+            reglas: Reglas habilitadas, en el orden en que se aplican
+        """
+        self.reglas = tuple(reglas)
+        self.campos = tuple(dict.fromkeys(regla.campo for regla in self.reglas))
+
+    def __repr__(self) -> str:
+        return f"ValidadorCompilado({list(self.reglas)!r})"
+
+    def _verificar_columnas(self, df: pd.DataFrame) -> None:
+        faltantes = [campo for campo in self.campos if campo not in df.columns]
+        if faltantes:
+            raise ValueError(
+                f"Faltan columnas con reglas de validación: {', '.join(faltantes)}"
+            )
+
+    def validar_fila(self, numero_fila: int, fila: Any) -> List[ErrorValidacion]:
+        """
+        Valida una fila.
+
+        Args:
+            numero_fila: Número de fila (base 1) para los errores
+            fila: Fila indexable por nombre de columna (p. ej. `pd.Series`)
+
+        Returns:
+            List[ErrorValidacion]: Errores de la fila (vacía si es válida)
+        """
+        errores = []
+        for regla in self.reglas:
+            valor = fila[regla.campo]
+            if not regla.validar(valor):
+                errores.append(
+                    ErrorValidacion(numero_fila, regla.campo, valor, regla.mensaje)
+                )
+        return errores
+
+    def validar_filas(self, df: pd.DataFrame) -> Tuple[np.ndarray, TablaErrores]:
+        """
+        Valida un DataFrame recorriéndolo fila por fila.
+
+        Las posiciones de las columnas se resuelven antes del recorrido; el
+        bucle solo indexa tuplas y llama a las reglas.
+
+        Args:
+            df: DataFrame a validar
+
+        Returns:
+            Tuple[np.ndarray, TablaErrores]: (máscara de filas válidas, errores)
+
+        Raises:
+            ValueError: Si falta alguna columna con reglas
+        """
+        self._verificar_columnas(df)
+        comprobaciones = [
+            (df.columns.get_loc(regla.campo), regla.validar, regla.campo, regla.mensaje)
+            for regla in self.reglas
+        ]
+        errores = TablaErrores()
+        agregar = errores.agregar
+        mascara = np.ones(len(df), dtype=bool)
+
+        filas = zip(df.index, df.itertuples(index=False, name=None))
+        for posicion_fila, (indice, fila) in enumerate(filas):
+            for posicion, validar, campo, mensaje in comprobaciones:
+                valor = fila[posicion]
+                if not validar(valor):
+                    agregar(indice + 1, campo, valor, mensaje)
+                    mascara[posicion_fila] = False
+
+        return mascara, errores
+
+    def validar_columnas(self, df: pd.DataFrame) -> Tuple[np.ndarray, TablaErrores]:
+        """
+        Valida un DataFrame columna por columna.
+
+        Cada regla produce una máscara sobre su columna completa y sus errores
+        se agregan en bloque a la tabla. Cuando varias reglas comparten
+        columna, la columna se factoriza una sola vez para todas.
+
+        Args:
+            df: DataFrame a validar
+
+        Returns:
+            Tuple[np.ndarray, TablaErrores]: (máscara de filas válidas, errores)
+
+        Raises:
+            ValueError: Si falta alguna columna con reglas
+        """
+        fallidas = [~valida for valida in self._mascaras_reglas(df)]
+        mascara = np.ones(len(df), dtype=bool)
+        for fallida in fallidas:
+            mascara &= ~fallida
+        return mascara, self._tabla_errores(df, fallidas)
+
+    def fallos_por_regla(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Valida por columnas y resume cada fila en un entero.
+
+        El bit `i` está encendido si la fila no cumple `reglas[i]`; 0 indica
+        una fila válida. Con `resultado_desde_fallos` se obtiene de nuevo la
+        máscara y los errores, así que el entero basta para guardar el
+        resultado de una fila.
+
+        Args:
+            df: DataFrame a validar
+
+        Returns:
+            np.ndarray: Un `uint64` por fila
+
+        Raises:
+            ValueError: Si hay más de 64 reglas o falta alguna columna
+        """
+        if len(self.reglas) > 64:
+            raise ValueError(
+                f"Solo se pueden resumir hasta 64 reglas por fila: {len(self.reglas)}"
+            )
+        fallos = np.zeros(len(df), dtype=np.uint64)
+        for bit, valida in enumerate(self._mascaras_reglas(df)):
+            fallos |= (~valida).astype(np.uint64) << np.uint64(bit)
+        return fallos
+
+    def resultado_desde_fallos(
+        self, df: pd.DataFrame, fallos: np.ndarray
+    ) -> Tuple[np.ndarray, TablaErrores]:
+        """
+        Reconstruye el resultado de `validar_columnas` a partir de los bits.
+
+        Args:
+            df: DataFrame validado (de él salen los valores de los errores)
+            fallos: Resultado de `fallos_por_regla` para esas filas
+
+        Returns:
+            Tuple[np.ndarray, TablaErrores]: (máscara de filas válidas, errores)
+        """
+        fallidas = [
+            (fallos >> np.uint64(bit)) & np.uint64(1) == 1
+            for bit in range(len(self.reglas))
+        ]
+        return fallos == 0, self._tabla_errores(df, fallidas)
+
+    def huella(self) -> str:
+        """
+        Resumen de las reglas y sus parámetros.
+
+        Cambia si cambia cualquier regla habilitada, su orden o sus
+        parámetros (incluido el contenido de los archivos que carga).
+
+        Returns:
+            str: Huella hexadecimal
+        """
+        resumen = hashlib.blake2b(digest_size=16)
+        for regla in self.reglas:
+            resumen.update(repr((regla.tipo, regla.campo, regla.huella)).encode())
+        return resumen.hexdigest()
+
+    def _mascaras_reglas(self, df: pd.DataFrame) -> List[np.ndarray]:
+        """Máscara de valores válidos de cada regla, en el orden de `reglas`."""
+        self._verificar_columnas(df)
+        reglas_por_campo: Dict[str, int] = {}
+        for regla in self.reglas:
+            reglas_por_campo[regla.campo] = reglas_por_campo.get(regla.campo, 0) + 1
+        factorizaciones: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+        mascaras = []
+        for regla in self.reglas:
+            columna = df[regla.campo]
+            factorizacion = None
+            if reglas_por_campo[regla.campo] > 1 and cache_validaciones.habilitada:
+                factorizacion = factorizaciones.get(regla.campo)
+                if factorizacion is None:
+                    factorizacion = factorizaciones[regla.campo] = factorizar(columna)
+            mascaras.append(regla.mascara(columna, factorizacion).to_numpy(dtype=bool))
+        return mascaras
+
+    def _tabla_errores(
+        self, df: pd.DataFrame, fallidas: Sequence[np.ndarray]
+    ) -> TablaErrores:
+        """Errores de las filas que fallan cada regla, agregados en bloque."""
+        # La tabla devuelve los errores ordenados por fila y, dentro de cada
+        # fila, en el orden de las reglas: el mismo orden que el modo por filas
+        errores = TablaErrores()
+        for regla, fallida in zip(self.reglas, fallidas):
+            errores.agregar_bloque(
+                df.index[fallida] + 1,
+                regla.campo,
+                df[regla.campo][fallida].tolist(),
+                regla.mensaje,
+            )
+        return errores
+
+
+# Validadores memorizados por `compilar_validaciones`, del menos al más usado.
+# El límite evita que un proceso largo (el servicio recargando config.yaml o
+# los archivos de redes) acumule versiones que ya no usa.
+MAX_VALIDADORES_COMPILADOS = 8
+_validadores_compilados: "OrderedDict[str, ValidadorCompilado]" = OrderedDict()
+
+
+def sellos_archivos(validaciones: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """
+    Tamaño y fecha de modificación de los archivos que leen las reglas.
+
+    Las reglas leen sus archivos (`archivo_permitidas`, `archivo_denegadas`,
+    ...) al compilarse. Por eso estos sellos forman parte de la clave de
+    `compilar_validaciones`: si un archivo cambia, la regla se vuelve a
+    compilar aunque config.yaml siga igual.
+
+    Args:
+        validaciones: Sección `validaciones` de config.yaml
+
+    Returns:
+        List[Tuple[str, Any]]: (ruta, (tamaño, mtime_ns)) por archivo, o
+            (ruta, None) si no se puede leer (la compilación dará el error)
+    """
+    sellos = []
+    for configuracion in validaciones.values():
+        lista = configuracion if isinstance(configuracion, list) else [configuracion]
+        for config in lista:
+            for nombre, ruta in sorted(config.items()):
+                if not nombre.startswith("archivo_") or not ruta:
+                    continue
+                try:
+                    estado = os.stat(ruta)
+                    sellos.append((ruta, (estado.st_size, estado.st_mtime_ns)))
+                except OSError:
+                    sellos.append((ruta, None))
+    return sellos
+
+
+def compilar_validaciones(validaciones: Dict[str, Any]) -> ValidadorCompilado:
+    """
+    Compila la sección `validaciones` de config.yaml.
+
+    Cada clave es una columna y su valor, una regla o una lista de reglas.
+    Cada regla indica su `tipo` (ver `TIPOS_REGLA`) y sus parámetros; en las
+    claves `ip` y `ruta_script` el tipo puede omitirse (`REGLAS_LEGADAS`).
+    Las reglas deshabilitadas se descartan y los parámetros de las demás
+    quedan fijados en objetos `Regla`. El resultado se memoriza por
+    configuración y por el tamaño y la fecha de los archivos de redes que
+    lee (`sellos_archivos`), así que compilar varias veces la misma es
+    barato y un archivo modificado se vuelve a leer. Solo se conservan las
+    `MAX_VALIDADORES_COMPILADOS` configuraciones usadas más recientemente.
+
+    Args:
+        validaciones: Configuración de validaciones (o un validador ya
+            compilado, que se devuelve tal cual)
+
+    Returns:
+        ValidadorCompilado: Validador con las reglas habilitadas
+
+    Raises:
+        ValueError: Si una regla no indica su tipo, el tipo no existe o sus
+            parámetros no son válidos
+    """
+    if isinstance(validaciones, ValidadorCompilado):
+        return validaciones
+
+    clave = json.dumps(
+        [validaciones, sellos_archivos(validaciones)], sort_keys=True, default=str
+    )
+    validador = _validadores_compilados.get(clave)
+    if validador is not None:
+        _validadores_compilados.move_to_end(clave)
+        return validador
+
+    reglas = []
+    for campo, configuracion in validaciones.items():
+        lista = configuracion if isinstance(configuracion, list) else [configuracion]
+        for config in lista:
+            if not config.get("habilitada", True):
+                continue
+            tipo = config.get("tipo", REGLAS_LEGADAS.get(campo))
+            if tipo is None:
+                raise ValueError(f"La regla de '{campo}' no indica su 'tipo'")
+            if tipo not in TIPOS_REGLA:
+                raise ValueError(
+                    f"Tipo de regla desconocido en '{campo}': {tipo!r} "
+                    f"(opciones: {', '.join(TIPOS_REGLA)})"
+                )
+            reglas.append(TIPOS_REGLA[tipo](campo, config))
 
-    return True, ""
+    validador = ValidadorCompilado(reglas)
+    _validadores_compilados[clave] = validador
+    while len(_validadores_compilados) > MAX_VALIDADORES_COMPILADOS:
+        _validadores_compilados.popitem(last=False)
+    return validador